@@ -0,0 +1,87 @@
+"""Bursts of identical story requests with request coalescing off and on, on the offline fake LLM.
+
+    python benchmarks/bench_coalescing.py [--burst 16] [--distinct 1] [--latency 0.2]
+
+Sends ``--burst`` concurrent POST /generate_story requests spread over
+``--distinct`` different settings through the FastAPI app (in-process ASGI
+transport), once with ``SYNAPSE_COALESCE`` behaviour off and once on. Reports
+the time until every briefing was served, until every pipeline finished, the
+number of pipelines and LLM calls made, and the requests served per second.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+os.environ.setdefault("SYNAPSE_FAKE_LLM", "1")
+os.environ.setdefault("SYNAPSE_PROFILE", "production")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SYNAPSE_MAX_ACTIVE_STORIES", "64")
+
+import httpx  # noqa: E402
+
+from synapse import api, pipeline  # noqa: E402
+from synapse.utils.metrics import registry  # noqa: E402
+
+LOCATIONS = ["Luxury Flat in Kochi", "Tea Estate in Munnar", "Houseboat in Alleppey", "Temple Town in Madurai"]
+
+
+def llm_calls() -> int:
+    lines = registry.render().splitlines()
+    return int(sum(float(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("synapse_llm_calls_total")))
+
+
+async def drain() -> None:
+    while pipeline.running_pipelines():
+        await asyncio.sleep(0.05)
+
+
+async def run(burst: int, distinct: int, coalesce: bool) -> dict:
+    api.coalescer.enabled = coalesce
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def story(index: int) -> str:
+            location = LOCATIONS[index % distinct % len(LOCATIONS)]
+            settings = {"location": location, "crimeType": "Theft", "region": "kerala", "use_cache": False}
+            response = await client.post("/generate_story", json=settings)
+            response.raise_for_status()
+            return response.json()["case_id"]
+
+        calls = llm_calls()
+        started = time.perf_counter()
+        cases = await asyncio.gather(*(story(index) for index in range(burst)))
+        briefings = time.perf_counter() - started
+        await drain()
+        elapsed = time.perf_counter() - started
+    return {
+        "coalesce": "on" if coalesce else "off",
+        "briefings_s": briefings,
+        "pipelines_s": elapsed,
+        "pipelines": len(set(cases)),
+        "llm_calls": llm_calls() - calls,
+        "requests_per_s": burst / elapsed,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for coalesce in (False, True):
+            rows.append(await run(args.burst, args.distinct, coalesce))
+    columns = ["coalesce", "briefings_s", "pipelines_s", "pipelines", "llm_calls", "requests_per_s"]
+    print("".join(f"{name:>16}" for name in columns))
+    for row in rows:
+        print("".join(f"{row[name]:>16.2f}" if isinstance(row[name], float) else f"{row[name]:>16}" for name in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=16, help="concurrent POST /generate_story requests")
+    parser.add_argument("--distinct", type=int, default=1, help="how many different settings the burst uses")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per call in seconds")
+    args = parser.parse_args()
+    os.environ["SYNAPSE_FAKE_LLM_LATENCY"] = str(args.latency)
+    asyncio.run(main(args))
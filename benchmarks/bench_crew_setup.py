@@ -0,0 +1,80 @@
+"""Per-request crew setup time, with and without compiled crew templates and pooled LLM clients.
+
+    python benchmarks/bench_crew_setup.py [iterations]
+
+"Before" re-parses the YAML configs and creates new LLM clients for every
+crew, as each request used to; "after" is the current behaviour. No LLM
+calls are made.
+"""
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+import yaml
+
+from synapse.crews.briefing_crew import briefing_crew
+from synapse.crews.crime_crew import crime_crew
+from synapse.crews.narrative_crew import narrative_crew
+from synapse.crews.plot_crew import plot_crew
+from synapse.crews.solution_crew import solution_crew
+
+CREWS = [
+    (plot_crew, plot_crew.PlotCrew),
+    (briefing_crew, briefing_crew.BriefingCrew),
+    (crime_crew, crime_crew.CrimeCrew),
+    (solution_crew, solution_crew.SolutionCrew),
+    (narrative_crew, narrative_crew.NarrativeCrew),
+]
+FACTORIES = ("gemini_creative", "gemini", "azure_mini")
+
+
+def parse_yaml(config_path):
+    with open(config_path, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file)
+
+
+@contextmanager
+def uncompiled():
+    """Temporarily restore per-instance YAML parsing and unpooled LLM factories."""
+    saved = []
+    for module, crew_class in CREWS:
+        saved.append((crew_class, "load_yaml", crew_class.__dict__["load_yaml"]))
+        crew_class.load_yaml = staticmethod(parse_yaml)
+        for name in FACTORIES:
+            if hasattr(module, name):
+                saved.append((module, name, getattr(module, name)))
+                setattr(module, name, getattr(module, name).__wrapped__)
+    try:
+        yield
+    finally:
+        for owner, name, value in reversed(saved):
+            setattr(owner, name, value)
+
+
+def measure(crew_class, iterations):
+    crew_class().crew()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        crew_class().crew()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'crew':<16}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    totals = [0.0, 0.0]
+    for _, crew_class in CREWS:
+        with uncompiled():
+            before = measure(crew_class, iterations)
+        after = measure(crew_class, iterations)
+        totals[0] += before
+        totals[1] += after
+        print(f"{crew_class._crew_name:<16}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+    print(f"{'per request':<16}{totals[0]:>12.2f}{totals[1]:>12.2f}{totals[0] / totals[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
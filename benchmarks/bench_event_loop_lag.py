@@ -0,0 +1,119 @@
+"""Event loop responsiveness while stories are being generated, on the offline fake LLM.
+
+    python benchmarks/bench_event_loop_lag.py [--stories 20] [--latency 0.5] [--crew-workers 5,64]
+
+Starts ``--stories`` POST /generate_story requests at once through the FastAPI
+app (in-process ASGI transport) and, until every pipeline has finished,
+probes GET /suspects_list every 50 ms. For each crew pool size it reports the
+time until every briefing was served and every pipeline finished, the
+/suspects_list latency and the event loop lag measured by ``loop_lag``
+(the lag an SSE heartbeat would see), after one unmeasured warm-up batch.
+A crew pool of ``min(32, CPUs + 4)``
+threads is what crewAI's ``kickoff_async()`` gets from asyncio's default
+executor.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+os.environ.setdefault("SYNAPSE_FAKE_LLM", "1")
+os.environ.setdefault("SYNAPSE_PROFILE", "production")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SYNAPSE_MAX_ACTIVE_STORIES", "64")
+
+import httpx  # noqa: E402
+
+from synapse import api, pipeline  # noqa: E402
+from synapse.utils import executor  # noqa: E402
+
+SETTINGS = {"location": "Luxury Flat in Kochi", "crimeType": "Theft", "region": "kerala", "use_cache": False}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))] if ordered else 0.0
+
+
+async def generate(client: httpx.AsyncClient, stories: int) -> float:
+    """Start ``stories`` stories at once; returns when every briefing has been served."""
+    async def story() -> None:
+        response = await client.post("/generate_story", json=SETTINGS)
+        response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(story() for _ in range(stories)))
+    return time.perf_counter() - started
+
+
+async def drain() -> None:
+    # The rest of each pipeline keeps running after its briefing was served.
+    while pipeline.running_pipelines():
+        await asyncio.sleep(0.05)
+
+
+async def run(stories: int, workers: int) -> dict:
+    executor.crew_executor = ThreadPoolExecutor(workers, thread_name_prefix="synapse-crew")
+    probes: List[float] = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm-up batch: starts the pool threads and crewAI's one-off console setup.
+        await generate(client, stories)
+        await drain()
+
+        async def probe(done: asyncio.Event) -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                # 404 until the latest case has its dossiers; only the latency matters here.
+                await client.get("/suspects_list")
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        executor.loop_lag.recent.clear()
+        executor.loop_lag.start()
+        done = asyncio.Event()
+        prober = asyncio.create_task(probe(done))
+        started = time.perf_counter()
+        briefings = await generate(client, stories)
+        await drain()
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    await executor.loop_lag.stop()
+    executor.crew_executor.shutdown(wait=False)
+    lag = executor.loop_lag.stats()
+    return {
+        "workers": workers,
+        "briefings_s": briefings,
+        "pipelines_s": elapsed,
+        "probe_p50_ms": percentile(probes, 50) * 1000,
+        "probe_p99_ms": percentile(probes, 99) * 1000,
+        "lag_p99_ms": lag["p99"] * 1000,
+        "lag_max_ms": lag["max"] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for workers in args.crew_workers:
+            rows.append(await run(args.stories, workers))
+    columns = ["workers", "briefings_s", "pipelines_s", "probe_p50_ms", "probe_p99_ms", "lag_p99_ms", "lag_max_ms"]
+    print("".join(f"{name:>14}" for name in columns))
+    for row in rows:
+        print("".join(f"{row[name]:>14.2f}" if isinstance(row[name], float) else f"{row[name]:>14}" for name in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=20, help="concurrent POST /generate_story requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency per call in seconds")
+    parser.add_argument("--crew-workers", type=lambda value: [int(v) for v in value.split(",")], default=[5, 64])
+    args = parser.parse_args()
+    os.environ["SYNAPSE_FAKE_LLM_LATENCY"] = str(args.latency)
+    asyncio.run(main(args))
@@ -0,0 +1,77 @@
+"""JSON extraction from large LLM outputs: regex-based cleaner vs. the single-pass scanner.
+
+    python benchmarks/bench_json_extraction.py [iterations]
+
+Inputs are the sample narrative case file (Narrative.json in the repository
+root) wrapped the way crew agents answer ("Thought: ... Final Answer:" plus a
+markdown fence), at its natural size and scaled up by repeating its lists.
+
+    regex       the previous path: two fence re.sub passes, a greedy DOTALL search,
+                json.loads, a pretty-printed json.dumps, and the json.loads every
+                downstream stage ran on that string
+    scanner     JSONCleaner.parse_json_content (JSONScanner over the full text)
+    streamed    JSONScanner fed 16-character chunks, as streamed by the LLM
+"""
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from synapse.utils.json_cleaner import JSONCleaner
+from synapse.utils.json_scanner import JSONScanner
+
+SAMPLE = Path(__file__).resolve().parents[1] / "Narrative.json"
+
+
+def regex_extract(raw: str):
+    content = re.sub(r'```json', '', raw, flags=re.IGNORECASE)
+    content = re.sub(r'```', '', content)
+    match = re.search(r'(\{.*\}|\[.*\])', content, flags=re.DOTALL)
+    cleaned = json.dumps(json.loads(match.group(0).strip()), indent=2)
+    return json.loads(cleaned)
+
+
+def streamed_extract(raw: str):
+    scanner = JSONScanner()
+    for i in range(0, len(raw), 16):
+        if scanner.feed(raw[i:i + 16]):
+            return scanner.value
+    raise ValueError("No JSON object found")
+
+
+def llm_output(case_file: dict, scale: int) -> str:
+    scaled = {key: value * scale if isinstance(value, list) else value for key, value in case_file.items()}
+    return (
+        "Thought: I now can give a great answer\nFinal Answer: ```json\n"
+        + json.dumps(scaled, indent=2)
+        + "\n```\nThe case file above contains every dossier, clue and timeline entry."
+    )
+
+
+def measure(extract, raw: str, iterations: int) -> float:
+    extract(raw)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        extract(raw)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    case_file = json.loads(SAMPLE.read_text(encoding="utf-8"))
+    print(f"{'input KB':>9}{'regex ms':>11}{'scanner ms':>12}{'streamed ms':>13}{'speedup':>9}")
+    for scale in (1, 4, 16):
+        raw = llm_output(case_file, scale)
+        assert regex_extract(raw) == JSONCleaner.parse_json_content(raw) == streamed_extract(raw)
+        old = measure(regex_extract, raw, iterations)
+        new = measure(JSONCleaner.parse_json_content, raw, iterations)
+        streamed = measure(streamed_extract, raw, iterations)
+        print(f"{len(raw) / 1024:>9.1f}{old:>11.3f}{new:>12.3f}{streamed:>13.3f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""End-to-end pipeline benchmark against the offline fake LLM (no network needed).
+
+    python benchmarks/bench_pipeline.py [--concurrency 1,4,16] [--requests 32] [--latency 0.05]
+                                        [--targets flow,pipeline,http]
+
+Targets:
+    flow      api.flow(): settings in, briefing out (the rest keeps running in the background)
+    pipeline  all five stages to completion through StageScheduler.run()
+    http      POST /generate_story through the FastAPI app (in-process ASGI transport)
+
+For every target and concurrency level it reports p50/p95/p99 latency,
+throughput and the peak RSS of the process so far. Crew console output is
+discarded while the benchmark runs.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import resource
+import time
+from typing import Awaitable, Callable, List
+
+os.environ.setdefault("SYNAPSE_FAKE_LLM", "1")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import httpx  # noqa: E402
+
+from synapse import api, pipeline  # noqa: E402
+from synapse.main import Settings, States  # noqa: E402
+from synapse.utils.case_store import open_case_store  # noqa: E402
+
+SETTINGS = {"location": "Luxury Flat in Kochi", "crimeType": "Theft", "region": "kerala"}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_flow() -> None:
+    await api.flow(Settings(**SETTINGS))
+
+
+async def run_pipeline() -> None:
+    store = open_case_store()
+    await pipeline.StageScheduler(store, States(settings=Settings(**SETTINGS), case_id=store.case_id)).run()
+
+
+def http_target(client: httpx.AsyncClient) -> Callable[[], Awaitable[None]]:
+    async def run_http() -> None:
+        response = await client.post("/generate_story", json=SETTINGS)
+        response.raise_for_status()
+    return run_http
+
+
+async def measure(target: Callable[[], Awaitable[None]], concurrency: int, requests: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await target()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    # Let background stages started by flow/http finish before the next level.
+    while pipeline.running_pipelines():
+        await asyncio.sleep(0.01)
+    return {
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "throughput": requests / elapsed,
+        "rss": peak_rss_mb(),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    os.environ["SYNAPSE_FAKE_LLM_LATENCY"] = str(args.latency)
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench") as client:
+        targets = {"flow": run_flow, "pipeline": run_pipeline, "http": http_target(client)}
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            await measure(targets[args.targets[0]], 1, 1)  # warm-up
+            for name in args.targets:
+                for concurrency in args.concurrency:
+                    rows.append((name, concurrency, await measure(targets[name], concurrency, args.requests)))
+
+    print(f"fake LLM latency {args.latency * 1000:.0f} ms/call, {args.requests} requests per level")
+    print(f"{'target':<10}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'peak RSS MB':>13}")
+    for name, concurrency, r in rows:
+        print(
+            f"{name:<10}{concurrency:>6}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}"
+            f"{r['throughput']:>9.2f}{r['rss']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call, in seconds")
+    parser.add_argument("--targets", type=lambda v: v.split(","), default=["flow", "pipeline", "http"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""Prompt tokens per crew task with and without prompt compaction, on the offline fake LLM.
+
+    python benchmarks/bench_prompt_compaction.py [--budget 6000]
+
+The fake LLM answers with the sample case in the repository root (Plot.json,
+Execution_plan.json, Solution.json, Suspect_dossiers.json, ...), so every
+prompt carries artifacts of realistic size. The pipeline runs once per
+compaction setting and the script prints the rendered prompt tokens of each
+task as recorded by ``prompt_stats``:
+
+    off         prompts as rendered from the task YAML (pretty-printed JSON)
+    minify      SYNAPSE_PROMPT_COMPACTION={"*": {}}
+    budget      minify, plus a token budget on every task
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+from pathlib import Path
+
+os.environ.setdefault("SYNAPSE_FAKE_LLM", "1")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ["SYNAPSE_CHECKPOINTS"] = "off"
+
+from synapse import pipeline  # noqa: E402
+from synapse.main import Settings, States  # noqa: E402
+from synapse.utils import fake_llm, prompt_compaction  # noqa: E402
+from synapse.utils.case_store import open_case_store  # noqa: E402
+from synapse.utils.json_cleaner import JSONCleaner  # noqa: E402
+from synapse.utils.prompt_stats import prompt_stats  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+SAMPLES = {
+    "Generate_bullseye": "Plot.json",
+    "Crime_execution_design": "Execution_plan.json",
+    "Crime_coverup_plan": "Coverup_plan.json",
+    "Generate_solution": "Solution.json",
+    "Suspect_dossiers": "Suspect_dossiers.json",
+    "Clue_manifest": "Clue_manifest.json",
+    "Master_timeline": "Master_timeline.json",
+    "Final_case_file": "Narrative.json",
+}
+
+
+def use_sample_case() -> None:
+    fixtures = fake_llm.task_fixtures()
+    for task, name in SAMPLES.items():
+        fixtures[task] = JSONCleaner.parse_json_content((ROOT / name).read_text(encoding="utf-8"))
+
+
+async def run_case(compaction: dict) -> dict:
+    os.environ["SYNAPSE_PROMPT_COMPACTION"] = json.dumps(compaction)
+    prompt_compaction._policies = None
+    prompt_stats.reset()
+    store = open_case_store()
+    state = States(settings=Settings(location="Luxury Flat in Kochi", crimeType="Theft", region="kerala"), case_id=store.case_id)
+    await pipeline.StageScheduler(store, state, use_llm_cache=False).run()
+    return prompt_stats.snapshot()
+
+
+async def main(args: argparse.Namespace) -> None:
+    use_sample_case()
+    settings = {
+        "off": {},
+        "minify": {"*": {}},
+        "budget": {"*": {"token_budget": args.budget}},
+    }
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, compaction in settings.items():
+            results[name] = await run_case(compaction)
+
+    tasks = list(results["off"])
+    print(f"{'task':<24}" + "".join(f"{name:>10}" for name in settings))
+    for task in tasks:
+        print(f"{task:<24}" + "".join(f"{results[name].get(task, {}).get('prompt_tokens', 0):>10}" for name in settings))
+    totals = {name: sum(stats["prompt_tokens"] for stats in results[name].values()) for name in settings}
+    print(f"{'total':<24}" + "".join(f"{totals[name]:>10}" for name in settings))
+    print("saved vs off" + " " * 12 + "".join(f"{1 - totals[name] / totals['off']:>10.1%}" for name in settings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=6000, help="token budget per task for the 'budget' run")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot even be queued; the API answers 429 with Retry-After."""
+
+    def __init__(self, message: str, retry_after: int, waiting: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.waiting = waiting
+
+
+class Ticket:
+    """A request's place in the admission queue."""
+
+    def __init__(self, gate: "AdmissionGate") -> None:
+        self.gate = gate
+        self.admitted = False
+        self.released = False
+        self.started: Optional[float] = None
+        self._event = asyncio.Event()
+
+    @property
+    def position(self) -> int:
+        """1-based position among the waiting requests, or 0 once admitted."""
+        if self.admitted:
+            return 0
+        return self.gate._waiting.index(self) + 1 if self in self.gate._waiting else 0
+
+    def _admit(self) -> None:
+        self.admitted = True
+        self.started = time.perf_counter()
+        self._event.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until admitted; returns False if ``timeout`` passed first."""
+        try:
+            await asyncio.wait_for(asyncio.shield(self._event.wait()), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def release(self) -> None:
+        """Give up the slot, or the place in the queue. Safe to call more than once."""
+        if not self.released:
+            self.released = True
+            self.gate._release(self)
+
+
+class AdmissionGate:
+    """Bounds how many interactive story requests generate at the same time.
+
+    Up to ``max_active`` requests hold a slot; the next ``max_waiting`` wait
+    for one in FIFO order and anything beyond that is rejected with
+    ``Overloaded`` right away, carrying a Retry-After estimate from the
+    average time a slot is held. This keeps a traffic spike from turning into
+    hundreds of concurrent LLM call chains.
+    """
+
+    def __init__(self, max_active: int = 8, max_waiting: int = 32, expected_duration: float = 30.0) -> None:
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.active = 0
+        self.rejected = 0
+        self.average_duration = expected_duration
+        self._waiting: Deque[Ticket] = deque()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.average_duration * (len(self._waiting) + 1) / self.max_active))
+
+    def check(self) -> None:
+        """Raise Overloaded if a request arriving now would be rejected, without taking a place."""
+        if (self.active >= self.max_active or self._waiting) and len(self._waiting) >= self.max_waiting:
+            self.rejected += 1
+            raise Overloaded("Too many stories are being generated right now", self.retry_after(), len(self._waiting))
+
+    def enqueue(self) -> Ticket:
+        """Take a slot or a place in the queue. Raises Overloaded when the queue is full."""
+        ticket = Ticket(self)
+        if self.active < self.max_active and not self._waiting:
+            self.active += 1
+            ticket._admit()
+        else:
+            self.check()
+            self._waiting.append(ticket)
+        return ticket
+
+    def _release(self, ticket: Ticket) -> None:
+        if not ticket.admitted:
+            self._waiting.remove(ticket)
+            return
+        # Moving average of how long a slot is held, for Retry-After estimates.
+        self.average_duration = 0.8 * self.average_duration + 0.2 * (time.perf_counter() - ticket.started)
+        if self._waiting:
+            # Hand the slot straight to the next request in line.
+            self._waiting.popleft()._admit()
+        else:
+            self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": len(self._waiting),
+            "rejected": self.rejected,
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+            "average_seconds": round(self.average_duration, 3),
+        }
+
+
+admission = AdmissionGate(
+    max_active=int(os.getenv("SYNAPSE_MAX_ACTIVE_STORIES", "8")),
+    max_waiting=int(os.getenv("SYNAPSE_MAX_WAITING_STORIES", "32")),
+)
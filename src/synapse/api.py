@@ -1,13 +1,37 @@
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 import asyncio
-from typing import AsyncGenerator, Any, Dict, List
+import hashlib
+from typing import AsyncGenerator, Any, Dict, List, Optional
 import json
 import regex as re
 import os
-import random
+import time
+from collections import OrderedDict
 from pathlib import Path
-from .main import Settings, PlotFlow, BriefingFlow, NarrativeFlow, CrimeFlow, SolutionFlow
+from urllib.parse import quote
+from .admission import Overloaded, Ticket, admission
+from .coalescing import coalescer
+from .interrogation import InterrogationError, interrogations
+from .main import Settings, States
+from .pipeline import StageScheduler, running_pipelines
+from .regeneration import RegenerationError, regenerator
+from .jobs import jobs
+from .story_pool import story_pool
+from .utils.progress import ProgressReporter
+from .utils.briefing_stream import BriefingStreamer, SentenceSegmenter
+from .utils.case_store import new_case_id, open_case_store
+from .utils.dossier_index import DossierIndex
+from .utils.executor import CREW_WORKERS, IO_WORKERS, loop_lag, run_blocking
+from .utils.image_catalog import ImageCatalog
+from .utils.llm_cache import get_llm_cache
+from .utils.logging_config import get_logger
+from .utils.metrics import http_latency, http_requests, registry
+from .utils.prompt_stats import prompt_stats
+from .utils.rate_limiter import rate_limiter_stats
+from .utils.state import get_state
+from .utils.tracing import server_span
 from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
 
@@ -20,8 +44,11 @@ IMAGE_SEQUENCE = [
 
 # --- Pydantic Models for Request and Response ---
 class RunRequest(Settings):
+    # Set to False to skip the LLM response cache for this request.
+    use_cache: bool = True
+
     def to_settings(self) -> Settings:
-        return Settings(**self.model_dump())
+        return Settings(**self.model_dump(exclude={"use_cache"}))
 
 class SuspectModel(BaseModel):
     id: str
@@ -37,12 +64,82 @@ class CrimeScenarioResponse(BaseModel):
     Goal: str
     suspectlist: List[SuspectModel]
 
-# --- In-memory store for the last user settings ---
-# This dictionary will hold the crimeType from the most recent /user_inputs call.
-latest_user_settings: Dict[str, Any] = {}
+# --- Case artifacts exposed by the job API, mapped to their case store names ---
+CASE_ARTIFACTS = {
+    "plot": "Plot.json",
+    "briefing": "Briefing.json",
+    "dossiers": "Suspect_dossiers.json",
+    "clues": "Clue_manifest.json",
+    "timeline": "Master_timeline.json",
+    "solution": "Solution.json",
+}
+
+# --- Sessions ---
+# The crime type and case ID of each client's latest story live in the shared state backend
+# (namespace "sessions"), keyed by the session cookie (or X-Session-ID header) handed out by
+# /generate_story, so every API worker answers /suspects_list for the right story. Clients
+# without a session get the latest story of any client, as before.
+SESSION_COOKIE = "synapse_session"
+LATEST_SESSION = "latest"
+
+
+def session_id(request: Request) -> Optional[str]:
+    # An explicit header wins over a cookie the client may have picked up earlier.
+    return request.headers.get("x-session-id") or request.cookies.get(SESSION_COOKIE)
+
+logger = get_logger(__name__)
 
 app = FastAPI(title="Detective Synapse API", version="0.1.0")
 
+@app.on_event("startup")
+async def start_story_pool() -> None:
+    loop_lag.start()
+    image_catalog.start()
+    if story_pool is not None:
+        story_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_story_pool() -> None:
+    await loop_lag.stop()
+    await image_catalog.stop()
+    if story_pool is not None:
+        await story_pool.stop()
+
+
+registry.gauge("synapse_pipelines_in_flight", "Pipelines currently running in this process.", callback=running_pipelines)
+registry.gauge("synapse_admission_active", "Story requests holding an admission slot.", callback=lambda: admission.stats()["active"])
+registry.gauge("synapse_admission_waiting", "Story requests waiting for an admission slot.", callback=lambda: admission.stats()["waiting"])
+registry.gauge("synapse_jobs_queued", "Background jobs waiting for a worker.", callback=lambda: jobs.queued)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace every request as a span and record its latency and status code per route."""
+    started = time.perf_counter()
+    with server_span(f"{request.method} {request.url.path}", request.headers, **{"http.method": request.method, "http.target": request.url.path}) as current:
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template rather than path so case ids do not explode the series count.
+            route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+            current.update_name(f"{request.method} {route}")
+            current.set_attributes({"http.route": route, "http.status_code": status})
+            http_requests.inc(method=request.method, route=route, status=str(status))
+            http_latency.observe(time.perf_counter() - started, method=request.method, route=route)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "waiting": exc.waiting, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 # --- Create a reliable, absolute path to the static images directory ---
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "Images"
@@ -51,7 +148,17 @@ STATIC_DIR = BASE_DIR / "Images"
 app.mount("/static/images", StaticFiles(directory=STATIC_DIR), name="images")
 
 
-# --- Helper Function to Assign Images Sequentially ---
+# --- Helper Functions to Assign Images Sequentially ---
+def briefing_segment(index: int, sentence: str) -> Dict[str, Any]:
+    """
+    Pairs the sentence at ``index`` with its image from IMAGE_SEQUENCE.
+    """
+    return {
+        "text": sentence,
+        "images": IMAGE_SEQUENCE[min(index, len(IMAGE_SEQUENCE) - 1)]
+    }
+
+
 def process_and_segment_story(parsed_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Splits the story into sentences and assigns images sequentially.
@@ -60,153 +167,254 @@ def process_and_segment_story(parsed_data: Dict[str, Any]) -> List[Dict[str, Any
         return []
 
     full_text = list(parsed_data.values())[0]
-    sentences = re.split(r'(?<!\b(?:Dr|Mr|Mrs|Ms|St|Prof))\.\s+', full_text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-
-    result_list = []
-    for index, sentence in enumerate(sentences):
-        if index < len(sentences) - 1:
-            sentence += "."
-
-        assigned_image = None
-        if index == 0:
-            assigned_image = IMAGE_SEQUENCE[0]
-        elif index == 1:
-            assigned_image = IMAGE_SEQUENCE[1]
-        else:
-            assigned_image = IMAGE_SEQUENCE[2]
-
-        segment_object = {
-            "text": sentence,
-            "images": assigned_image
-        }
-        result_list.append(segment_object)
-
-    return result_list
-
-
-async def flow(settings: Settings) -> str:
-    """Runs the core narrative generation flows."""
-    plot_flow = PlotFlow()
-    briefing_flow = BriefingFlow()
-    crime_flow = CrimeFlow()
-    solution_flow = SolutionFlow()
-    narrative_flow = NarrativeFlow()
-    plot_flow.state.settings = settings
-    await plot_flow.kickoff_async()
-    await briefing_flow.kickoff_async()
-    await crime_flow.kickoff_async()
-    await solution_flow.kickoff_async()
-    await narrative_flow.kickoff_async()
-    return briefing_flow.state.Briefing
-
-
-async def run_plot_flow_stream(settings: Settings) -> AsyncGenerator[str, None]:
-    """Generator function for streaming results."""
-    yield json.dumps({"event": "settings", "data": settings.model_dump()})
+    segmenter = SentenceSegmenter()
+    sentences = segmenter.feed(full_text) + segmenter.flush()
+    return [briefing_segment(index, sentence) for index, sentence in enumerate(sentences)]
+
+
+async def flow(settings: Settings, case_id: Optional[str] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """Runs the core narrative generation flows against the case store of ``case_id``.
+
+    Stages run as a dependency graph over one shared pipeline state. The
+    briefing is returned as soon as its branch (plot -> briefing) finishes;
+    crime, solution and narrative keep running in the background and land in
+    the case store.
+    """
+    store = open_case_store(case_id)
+    scheduler = StageScheduler(store, States(settings=settings, case_id=store.case_id), use_llm_cache=use_cache)
+    state = await scheduler.wait_for("briefing")
+    return state.Briefing.model_dump()
+
+
+async def run_plot_flow_stream(
+    settings: Settings, use_cache: bool = True, ticket: Optional[Ticket] = None
+) -> AsyncGenerator[str, None]:
+    """Generator function for streaming results.
+
+    With an admission ``ticket`` that is still queued, a "queued" event with
+    the queue position is emitted every second until a slot frees up; the
+    slot is given back once the briefing is done.
+
+    Emits a start/finish event for every stage and crew task as it happens,
+    each briefing sentence ("briefing_segment") as soon as its tokens have been
+    streamed, the full segmented briefing ("completed") once the briefing stage
+    is done, and a final "pipeline_finished" event. Closing the generator
+    cancels the case.
+
+    With coalescing on (SYNAPSE_COALESCE), a request identical to one in
+    flight attaches to that case instead: it gives its admission slot back,
+    receives every event of the case from the start, and the case is only
+    cancelled once all of its streams closed.
+    """
+    flight = coalescer.join(settings, use_cache)
+    case_id = flight.case_id if flight is not None else new_case_id()
+    yield json.dumps({"event": "settings", "data": settings.model_dump(), "case_id": case_id})
     await asyncio.sleep(0)
-    result_json_string = await flow(settings)
-    parsed = json.loads(result_json_string)
-    segmented_list = process_and_segment_story(parsed)
-    yield json.dumps({"event": "completed", "data": segmented_list})
+    if flight is None:
+        try:
+            while ticket is not None and not await ticket.wait(timeout=1.0):
+                yield json.dumps({"event": "queued", "position": ticket.position, "case_id": case_id})
+        except BaseException:
+            ticket.release()
+            raise
+        # An identical request may have started generating while this one was queued.
+        flight = coalescer.join(settings, use_cache)
+
+    if flight is not None:
+        if ticket is not None:
+            ticket.release()
+    else:
+        reporter = ProgressReporter(case_id, replay=coalescer.enabled)
+        streamer = BriefingStreamer(
+            lambda index, sentence: reporter.emit(
+                "briefing_segment", stage="briefing", index=index, data=briefing_segment(index, sentence)
+            )
+        )
+        reporter.on_llm_chunk("briefing", streamer.feed)
+        flight = coalescer.lead(settings, case_id, use_cache=use_cache, reporter=reporter)
+    flight.attach()
+    events = flight.reporter.subscribe()
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield json.dumps(event)
+            if event["event"] == "stage_completed" and event["stage"] == "briefing":
+                segmented_list = process_and_segment_story(event["artifact"]["Briefing"])
+                yield json.dumps({"event": "completed", "data": segmented_list, "case_id": flight.case_id})
+                if ticket is not None:
+                    ticket.release()
+    finally:
+        flight.reporter.unsubscribe(events)
+        if ticket is not None:
+            ticket.release()
+        flight.detach()
 
 
 @app.post("/generate_story", tags=["Briefing"])
-async def run_endpoint(payload: RunRequest) -> Dict[str, Any]:
+async def run_endpoint(payload: RunRequest, request: Request, response: Response) -> Dict[str, Any]:
     """
-    Accepts user settings, generates the story, and stores the crime type.
+    Accepts user settings, generates the story, and stores the crime type in the caller's session.
     """
     settings = payload.to_settings()
 
-    # MODIFICATION: Store the crimeType from the current request in our in-memory store.
-    global latest_user_settings
-    latest_user_settings['crimeType'] = settings.crimeType
-
-    result_json_string = await flow(settings)
-    parsed = json.loads(result_json_string)
+    # Serve a pre-generated case when the story pool has one for these settings,
+    # or attach to an identical generation already in flight (SYNAPSE_COALESCE).
+    pooled = await run_blocking(story_pool.take, settings) if story_pool is not None else None
+    flight = coalescer.join(settings, payload.use_cache) if pooled is None else None
+    ticket = None
+    if pooled is None and flight is None:
+        # Live generation holds an admission slot until the briefing is ready (429 when overloaded).
+        ticket = admission.enqueue()
+        try:
+            await ticket.wait()
+            # An identical request may have started generating while this one was queued.
+            flight = coalescer.join(settings, payload.use_cache) or coalescer.lead(
+                settings, new_case_id(), use_cache=payload.use_cache
+            )
+        except BaseException:
+            ticket.release()
+            raise
+    case_id = pooled.case_id if pooled is not None else flight.case_id
+
+    session = session_id(request) or new_case_id()
+    latest = {"crimeType": settings.crimeType, "case_id": case_id}
+    state = get_state()
+    await state.set_async("sessions", session, latest)
+    await state.set_async("sessions", LATEST_SESSION, latest)
+    response.set_cookie(SESSION_COOKIE, session, httponly=True, samesite="lax")
+
+    if pooled is not None:
+        parsed = pooled.Briefing.model_dump()
+    else:
+        # The rest of the case keeps running in the background once the briefing is served.
+        flight.attach(keep_running=True)
+        try:
+            parsed = await flight.briefing()
+        finally:
+            flight.detach()
+            if ticket is not None:
+                ticket.release()
     segmented_list = process_and_segment_story(parsed)
-    return {"result": segmented_list}
+    return {"result": segmented_list, "case_id": case_id}
+
+# --- Suspect list: images and dossiers are indexed in memory, responses cached per ETag ---
+image_catalog = ImageCatalog(STATIC_DIR)
+dossier_index = DossierIndex(BASE_DIR.parent.parent / "Suspect_dossiers.json")
+SUSPECT_LIST_CACHE_SIZE = 256
+# Rendered /suspects_list bodies keyed by their ETag, which changes with any input of the body.
+_suspect_lists: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def case_goal(crime_type: str) -> str:
+    """The player's goal for a crime type."""
+    crime_type_lower = crime_type.lower()
+    if "murder" in crime_type_lower:
+        return "Who is the killer"
+    if "theft" in crime_type_lower or "robbery" in crime_type_lower:
+        return "Who is the thief"
+    return "Solve the crime"
+
+
+def suspect_list_body(crime_type: str, suspects: List[Dict[str, Any]], images: List[Optional[str]], image_base: str) -> bytes:
+    suspect_list = [
+        SuspectModel(
+            id=item.get("characterID", ""),
+            name=item.get("name", ""),
+            gender=item.get("gender", ""),
+            role=item.get("roleInStory", ""),
+            biography=item.get("biography", ""),
+            initialStatement=item.get("initialStatementToPolice", ""),
+            image=f"{image_base}{quote(image)}" if image else "",
+        )
+        for item, image in zip(suspects, images)
+    ]
+    return CrimeScenarioResponse(type=crime_type, Goal=case_goal(crime_type), suspectlist=suspect_list).model_dump_json().encode()
 
-@app.get("/suspects_list", response_model=CrimeScenarioResponse)
-async def run_flow_and_get_dossiers(request: Request):
-    """
-    Generates the suspect list with a goal based on the previously submitted crime type.
-    """
-    MALE_IMAGE_DIR = STATIC_DIR / "Male"
-    FEMALE_IMAGE_DIR = STATIC_DIR / "Female"
 
-    try:
-        if not MALE_IMAGE_DIR.is_dir() or not FEMALE_IMAGE_DIR.is_dir():
-             raise HTTPException(status_code=500, detail="Image directories ('Male', 'Female') not found on the server.")
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
 
-        male_images = [f for f in os.listdir(MALE_IMAGE_DIR) if os.path.isfile(os.path.join(MALE_IMAGE_DIR, f))]
-        female_images = [f for f in os.listdir(FEMALE_IMAGE_DIR) if os.path.isfile(os.path.join(FEMALE_IMAGE_DIR, f))]
 
-        random.shuffle(male_images)
-        random.shuffle(female_images)
+@app.get("/suspects_list", response_model=CrimeScenarioResponse)
+async def run_flow_and_get_dossiers(request: Request, case_id: Optional[str] = None):
+    """
+    Generates the suspect list with a goal based on the crime type of the given case,
+    or of the session's latest story when no case ID is passed.
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading image directories: {e}")
+    Each suspect gets a portrait picked deterministically from the case ID, so repeat
+    calls agree. Responses carry an ETag and a matching If-None-Match gets a 304.
+    While the case's narrative stage has not written the dossiers yet, the answer is
+    a 202 with the stage statuses.
+    """
+    await image_catalog.ensure_indexed()
+    if image_catalog.missing():
+        raise HTTPException(status_code=500, detail="Image directories ('Male', 'Female') not found on the server.")
+
+    crime_type: Optional[str] = None
+    if not case_id:
+        state = get_state()
+        session = session_id(request)
+        latest = (await state.get_async("sessions", session) if session else None) or await state.get_async(
+            "sessions", LATEST_SESSION
+        ) or {}
+        # Default to "Theft" if no story has been generated yet.
+        crime_type = latest.get("crimeType", "Theft")
+        case_id = latest.get("case_id")
 
     try:
-        # MODIFICATION: Get crimeType from the in-memory store, set by the /user_inputs endpoint.
-        global latest_user_settings
-        # Default to "Theft" if /user_inputs hasn't been called yet.
-        crime_type = latest_user_settings.get("crimeType", "Theft")
-        crime_type_lower = crime_type.lower()
-        goal = "Solve the crime" # Default goal
-
-        # Set the goal based on the crime type.
-        if "murder" in crime_type_lower:
-            goal = "Who is the killer"
-        elif "theft" in crime_type_lower or "robbery" in crime_type_lower:
-            goal = "Who is the thief"
-
-        dossier_path = BASE_DIR.parent.parent / "Suspect_dossiers.json"
-
-        with open(dossier_path, "r", encoding="utf-8") as f:
-            raw_data = json.load(f)
-
-        dossiers_data = raw_data.get("suspectDossiers", [])
-
-        formatted_list = []
-        for item in dossiers_data:
-            gender = item.get("gender", "").lower()
-            image_url = ""
-
-            # Assign a random, unique image to each suspect based on gender.
-            if gender == "male" and male_images:
-                image_filename = male_images.pop()
-                image_url = str(request.url_for('images', path=f"Male/{image_filename}"))
-            elif gender == "female" and female_images:
-                image_filename = female_images.pop()
-                image_url = str(request.url_for('images', path=f"Female/{image_filename}"))
-
-            formatted_item = {
-                "id": item.get("characterID", ""),
-                "name": item.get("name", ""),
-                "gender": item.get("gender", ""),
-                "role": item.get("roleInStory", ""),
-                "biography": item.get("biography", ""),
-                "initialStatement": item.get("initialStatementToPolice", ""),
-                "image": image_url
-            }
-            formatted_list.append(formatted_item)
-
-        # Return the response in the new, desired structure.
-        return CrimeScenarioResponse(
-            type=crime_type,
-            Goal=goal,
-            suspectlist=formatted_list
-        )
-
+        if case_id:
+            dossier_path = f"case {case_id}: Suspect_dossiers.json"
+            dossiers = await dossier_index.case(case_id)
+        else:
+            # No story generated yet; fall back to the sample dossiers in the repo.
+            dossier_path = str(dossier_index.sample_path)
+            dossiers = await dossier_index.sample()
     except FileNotFoundError:
+        # The dossiers of a case still generating are written by its narrative stage.
+        progress = await get_state().get_async("progress", case_id) if case_id else None
+        if progress is not None and progress["stages"].get("narrative") in ("pending", "running"):
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "detail": f"The suspects of case {case_id} are still being generated.",
+                    "case_id": case_id,
+                    "status": progress["status"],
+                    "stages": progress["stages"],
+                },
+                headers={"Retry-After": "5"},
+            )
         raise HTTPException(status_code=404, detail=f"File not found: {dossier_path}. Check the location of Suspect_dossiers.json.")
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Failed to decode Suspect_dossiers.json.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
+    crime_type = crime_type or dossiers.crime_type or "Theft"
+
+    image_base = str(request.url_for("images", path=""))
+    # Derived from content only, so every worker (and a restarted one) agrees on it.
+    key = f"{dossiers.digest}|{crime_type}|{image_catalog.digest}|{image_base}"
+    etag = f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    body = _suspect_lists.get(etag)
+    if body is None:
+        try:
+            images = image_catalog.assign(case_id or "sample", [item.get("gender", "") for item in dossiers.suspects])
+            body = suspect_list_body(crime_type, dossiers.suspects, images, image_base)
+        except Exception as e:
+            logger.exception("Unexpected error building the suspects list: %s", e)
+            raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
+        _suspect_lists[etag] = body
+        while len(_suspect_lists) > SUSPECT_LIST_CACHE_SIZE:
+            _suspect_lists.popitem(last=False)
+    else:
+        _suspect_lists.move_to_end(etag)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/user_inputs_stream", tags=["experimental"])
@@ -215,9 +423,243 @@ async def run_stream_endpoint(request: Request, payload: RunRequest):
     Experimental endpoint for streaming the story generation.
     """
     settings = payload.to_settings()
+    # Answer 429 up front; the ticket itself is taken once the stream starts, since a client
+    # disconnecting before that would never run the generator's cleanup and leak the slot.
+    admission.check()
     async def event_generator(req: Request):
-        async for chunk in run_plot_flow_stream(settings):
-            if await req.is_disconnected():
-                break
-            yield {"data": chunk}
+        try:
+            ticket = admission.enqueue()
+        except Overloaded as e:
+            yield {"data": json.dumps({"event": "overloaded", "detail": str(e), "retry_after": e.retry_after})}
+            return
+        stream = run_plot_flow_stream(settings, use_cache=payload.use_cache, ticket=ticket)
+        try:
+            async for chunk in stream:
+                if await req.is_disconnected():
+                    break
+                yield {"data": chunk}
+        finally:
+            # Closing the stream cancels the pipeline and its in-flight LLM work.
+            await stream.aclose()
+            ticket.release()
+    return EventSourceResponse(event_generator(request))
+
+
+# --- Background job API ---
+
+@app.post("/cases", status_code=202, tags=["Cases"])
+async def create_case(payload: RunRequest) -> Dict[str, Any]:
+    """
+    Queues a full story generation and returns its case ID right away.
+    """
+    job = jobs.submit(payload.to_settings(), use_cache=payload.use_cache)
+    return {"case_id": job.case_id, "status": job.status, "queue_position": jobs.queue_position(job.case_id)}
+
+
+def ready_artifacts(case_id: str) -> List[str]:
+    store = open_case_store(case_id)
+    return [name for name, artifact in CASE_ARTIFACTS.items() if store.exists(artifact)]
+
+
+@app.get("/cases/{case_id}", tags=["Cases"])
+async def get_case(case_id: str) -> Dict[str, Any]:
+    """
+    Returns the status of a case and of each of its pipeline stages.
+    """
+    job = await jobs.lookup(case_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    ready = await run_blocking(ready_artifacts, case_id)
+    return {**job.model_dump(), "queue_position": jobs.queue_position(case_id), "artifacts": ready}
+
+
+@app.get("/cases/{case_id}/artifacts/{artifact}", tags=["Cases"])
+async def get_case_artifact(case_id: str, artifact: str) -> Dict[str, Any]:
+    """
+    Returns one generated artifact of a case (plot, briefing, dossiers, clues, timeline, solution).
+    """
+    if artifact not in CASE_ARTIFACTS:
+        raise HTTPException(status_code=404, detail=f"Unknown artifact '{artifact}'. Expected one of {list(CASE_ARTIFACTS)}.")
+    if await jobs.lookup(case_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    try:
+        data = await open_case_store(case_id).read_async(CASE_ARTIFACTS[artifact])
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Artifact '{artifact}' is not ready for case {case_id}.")
+    return {"case_id": case_id, "artifact": artifact, "data": data}
+
+
+@app.post("/cases/{case_id}/cancel", tags=["Cases"])
+async def cancel_case(case_id: str) -> Dict[str, Any]:
+    """
+    Cancels a queued or running case. Stages that already finished keep their artifacts.
+    """
+    # Only the worker running a case can stop it; elsewhere this reports the shared status.
+    job = jobs.cancel(case_id) or await jobs.lookup(case_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    return {"case_id": case_id, "status": job.status, "stages": job.stages}
+
+
+@app.post("/cases/{case_id}/resume", status_code=202, tags=["Cases"])
+async def resume_case(case_id: str) -> Dict[str, Any]:
+    """
+    Re-queues a failed or cancelled case. Stages (and crew tasks) that already finished are
+    restored from their checkpoints; generation restarts at the first one that did not.
+    """
+    job = await jobs.resume(case_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    return {"case_id": case_id, "status": job.status, "queue_position": jobs.queue_position(case_id)}
+
+
+class RegenerateRequest(BaseModel):
+    artifact: str
+    item: Optional[str] = None
+
+
+@app.post("/cases/{case_id}/regenerate", tags=["Cases"])
+async def regenerate_artifact(case_id: str, payload: RegenerateRequest) -> Dict[str, Any]:
+    """
+    Rebuilds one artifact of a finished case (or one suspect or clue of it, by ID) and the artifacts
+    depending on it. Everything else is reused from the case store.
+    """
+    try:
+        return await regenerator.regenerate(case_id, payload.artifact, payload.item)
+    except RegenerationError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+
+
+# --- Interrogation: one session per detective and suspect, answers streamed over SSE ---
+
+class InterrogationRequest(BaseModel):
+    case_id: str
+    characterID: str
+
+
+class QuestionRequest(BaseModel):
+    question: str
+
+
+@app.post("/interrogations", status_code=201, tags=["Interrogation"])
+async def open_interrogation(payload: InterrogationRequest) -> Dict[str, Any]:
+    """
+    Starts interrogating one suspect of a case once its dossiers are generated.
+    """
+    try:
+        session = await interrogations.open(payload.case_id, payload.characterID)
+    except InterrogationError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return session.model_dump()
+
+
+@app.get("/interrogations/{session_id}", tags=["Interrogation"])
+async def get_interrogation(session_id: str) -> Dict[str, Any]:
+    """
+    Returns an interrogation session with its remembered conversation.
+    """
+    session = await interrogations.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown interrogation: {session_id}")
+    return session.model_dump()
+
+
+@app.post("/interrogations/{session_id}/questions", tags=["Interrogation"])
+async def ask_question(session_id: str, payload: QuestionRequest, request: Request):
+    """
+    Asks the suspect a question. The answer streams as "answer_chunk" events, followed by
+    the full "answer". An "answer_reset" event means the answer was re-asked: drop the chunks
+    received so far. Failures end the stream with an "error" event.
+    """
+    if not payload.question.strip():
+        raise HTTPException(status_code=422, detail="The question is empty.")
+    if await interrogations.get(session_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown interrogation: {session_id}")
+
+    async def event_generator(req: Request):
+        stream = interrogations.ask(session_id, payload.question)
+        try:
+            async for event in stream:
+                if await req.is_disconnected():
+                    break
+                yield {"data": json.dumps(event)}
+        except InterrogationError as e:
+            yield {"data": json.dumps({"event": "error", "session_id": session_id, "error": str(e)})}
+        except Exception as e:
+            logger.exception("Interrogation %s failed", session_id)
+            yield {"data": json.dumps({"event": "error", "session_id": session_id, "error": str(e)})}
+        finally:
+            # Closing the stream stops the suspect's remaining LLM work.
+            await stream.aclose()
     return EventSourceResponse(event_generator(request))
+
+
+@app.delete("/interrogations/{session_id}", tags=["Interrogation"])
+async def close_interrogation(session_id: str) -> Dict[str, Any]:
+    """
+    Ends an interrogation session.
+    """
+    if not await interrogations.close(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown interrogation: {session_id}")
+    return {"session_id": session_id, "closed": True}
+
+
+@app.get("/llm_cache", tags=["Ops"])
+async def llm_cache_stats() -> Dict[str, Any]:
+    """
+    Returns hit and miss counts of the LLM response cache.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/story_pool", tags=["Ops"])
+async def story_pool_stats() -> Dict[str, Any]:
+    """
+    Returns the number of pre-generated cases per (location, crimeType) bucket.
+    """
+    if story_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, "size": story_pool.size, "buckets": story_pool.counts()}
+
+
+@app.get("/coalescing", tags=["Ops"])
+async def coalescing_stats() -> Dict[str, Any]:
+    """
+    Returns whether request coalescing is on, the waiters per case in flight and how many requests attached.
+    """
+    return coalescer.stats()
+
+
+@app.get("/rate_limits", tags=["Ops"])
+async def rate_limits() -> Dict[str, Any]:
+    """
+    Returns the admission queue and the per-provider LLM rate limiter state.
+    """
+    return {"admission": admission.stats(), "providers": rate_limiter_stats()}
+
+
+@app.get("/event_loop", tags=["Ops"])
+async def event_loop_stats() -> Dict[str, Any]:
+    """
+    Returns event loop lag percentiles (seconds) over the recent window and the worker pool sizes.
+    """
+    return {"lag": loop_lag.stats(), "crew_workers": CREW_WORKERS, "io_workers": IO_WORKERS}
+
+
+@app.get("/metrics", tags=["Ops"], response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Returns request, stage, crew and LLM metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/prompt_stats", tags=["Ops"])
+async def prompt_token_stats() -> Dict[str, Any]:
+    """
+    Returns prompt and completion token counts per crew task, and the tokens saved by prompt compaction.
+    """
+    return {"tasks": prompt_stats.snapshot()}
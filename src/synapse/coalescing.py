@@ -0,0 +1,128 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from synapse.main import Settings, States
+from synapse.pipeline import StageScheduler
+from synapse.utils.case_store import open_case_store
+from synapse.utils.logging_config import get_logger
+from synapse.utils.metrics import registry
+from synapse.utils.progress import ProgressReporter
+
+logger = get_logger(__name__)
+
+coalesced_requests = registry.counter(
+    "synapse_coalesced_requests_total", "Story requests served by attaching to an identical generation in flight."
+)
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+
+def flight_key(settings: Settings, use_cache: bool) -> str:
+    """Requests with the same key get the same story."""
+    return json.dumps(
+        [_normalize(settings.location), _normalize(settings.crimeType), _normalize(settings.region), use_cache]
+    )
+
+
+class Flight:
+    """One story generation in flight, shared by every request that attached to it.
+
+    The pipeline keeps running after its last waiter detached if any waiter
+    asked for that (``/generate_story`` leaves the rest of the case running in
+    the background); otherwise it is cancelled, as a closed stream would.
+    """
+
+    def __init__(self, key: str, scheduler: StageScheduler) -> None:
+        self.key = key
+        self.scheduler = scheduler
+        self.waiters = 0
+        self.keep_running = False
+
+    @property
+    def case_id(self) -> str:
+        return self.scheduler.store.case_id
+
+    @property
+    def reporter(self) -> ProgressReporter:
+        return self.scheduler.reporter
+
+    def attach(self, keep_running: bool = False) -> None:
+        self.waiters += 1
+        self.keep_running = self.keep_running or keep_running
+
+    def detach(self) -> None:
+        """Drop a waiter; cancels the pipeline when it was the last one and nobody asked to keep it."""
+        self.waiters -= 1
+        if self.waiters <= 0 and not self.keep_running and not self.scheduler.start().done():
+            self.scheduler.cancel()
+
+    async def briefing(self) -> Dict[str, Any]:
+        state = await self.scheduler.wait_for("briefing")
+        return state.Briefing.model_dump()
+
+
+class StoryCoalescer:
+    """Singleflight for story generation: identical in-flight requests share one pipeline.
+
+    ``join()`` returns the flight of an identical request (same normalized
+    location, crime type, region and cache setting) whose pipeline is still
+    running, and ``lead()`` starts a new one. Flights are forgotten once their
+    pipeline finishes. Attaching needs no admission slot, so a burst of
+    duplicates costs one pipeline's LLM calls and one slot. When disabled,
+    ``join()`` finds nothing and every request leads its own flight.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.coalesced = 0
+        self._flights: Dict[str, Flight] = {}
+        registry.gauge(
+            "synapse_coalesced_flights", "Story generations other requests can attach to.", callback=lambda: len(self._flights)
+        )
+
+    def join(self, settings: Settings, use_cache: bool = True) -> Optional[Flight]:
+        if not self.enabled:
+            return None
+        flight = self._flights.get(flight_key(settings, use_cache))
+        if flight is not None:
+            self.coalesced += 1
+            coalesced_requests.inc()
+            logger.debug("Attached to case %s (%d waiters)", flight.case_id, flight.waiters + 1)
+        return flight
+
+    def lead(
+        self,
+        settings: Settings,
+        case_id: Optional[str] = None,
+        use_cache: bool = True,
+        reporter: Optional[ProgressReporter] = None,
+    ) -> Flight:
+        """Start generating a case and, when enabled, let identical requests attach to it."""
+        store = open_case_store(case_id)
+        reporter = reporter or ProgressReporter(store.case_id, replay=self.enabled)
+        scheduler = StageScheduler(
+            store, States(settings=settings, case_id=store.case_id), reporter=reporter, use_llm_cache=use_cache
+        )
+        flight = Flight(flight_key(settings, use_cache), scheduler)
+        pipeline = scheduler.start()
+        if self.enabled:
+            self._flights[flight.key] = flight
+            pipeline.add_done_callback(lambda _: self._land(flight))
+        return flight
+
+    def _land(self, flight: Flight) -> None:
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": {flight.case_id: flight.waiters for flight in self._flights.values()},
+            "coalesced": self.coalesced,
+        }
+
+
+coalescer = StoryCoalescer(enabled=os.getenv("SYNAPSE_COALESCE", "").lower() in ("1", "true", "yes"))
@@ -3,12 +3,16 @@ from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
 from synapse.utils.llm import llm
+from synapse.utils.logging_config import crew_verbose
 from pydantic import BaseModel
 from synapse.utils.llm import gemini_creative
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
 
 class Briefing(BaseModel):
     CrimeSceneInvestigator : str
 
+@compiled_crew
 @CrewBase
 class BriefingCrew():
     """BriefingCrew crew"""
@@ -24,14 +28,17 @@ class BriefingCrew():
     def Case_briefing_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['Case_briefing_agent'],
-            llm=gemini_creative()
+            # Streamed so the briefing can be segmented while it is generated.
+            llm=gemini_creative(stream=True)
         )
 
     @task
     def Case_briefing(self) -> Task:
         return Task(
             config=self.tasks_config['Case_briefing_task'],
-            output_json=Briefing
+            output_json=Briefing,
+            guardrail=artifact_guardrail(Briefing),
+            guardrail_max_retries=ARTIFACT_REASKS
         )
 
     @crew
@@ -42,5 +49,5 @@ class BriefingCrew():
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=crew_verbose(),
         )
@@ -1,13 +1,20 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from synapse.utils.case_store import CaseStore, default_case_store
+from synapse.utils.save_json import SaveJson
 from synapse.utils.json_cleaner import JSONCleaner
 from synapse.utils import JSONExtractor
 from synapse.utils.llm import llm
+from synapse.utils.logging_config import crew_verbose, get_logger
 from synapse.utils.llm import gemini_creative
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
 from pathlib import Path
 
+logger = get_logger(__name__)
+
 class Tool(BaseModel):
     toolName: str
     purpose: str
@@ -46,6 +53,7 @@ class CrimeCoverUP(BaseModel):
     coverUpPlan: CoverUpPlan
 
 
+@compiled_crew
 @CrewBase
 class CrimeCrew:
     """CrimeCrew crew"""
@@ -56,6 +64,9 @@ class CrimeCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, store: Optional[CaseStore] = None) -> None:
+        self.store = store or default_case_store()
+
     @agent
     def Criminal_master_mind_agent(self) -> Agent:
         return Agent(
@@ -66,13 +77,14 @@ class CrimeCrew:
     @task
     def Crime_execution_design(self) -> Task:
         def save_to_json(result):
-            with open("Execution_plan.json", "w") as f:
-                f.write(result.raw)
-            print("Crime execution plan saved to crime_execution.json")
+            SaveJson.save_json(result, "Execution_plan.json", self.store)
+            logger.debug("Crime execution plan saved to Execution_plan.json")
 
         return Task(
             config=self.tasks_config['Crime_execution_design_task'],
             output_json=CrimeExecution,
+            guardrail=artifact_guardrail(CrimeExecution),
+            guardrail_max_retries=ARTIFACT_REASKS,
             callback=save_to_json
         )
 
@@ -81,6 +93,8 @@ class CrimeCrew:
         return Task(
             config=self.tasks_config['Crime_coverup_plan_task'],
             output_json=CrimeCoverUP,
+            guardrail=artifact_guardrail(CrimeCoverUP),
+            guardrail_max_retries=ARTIFACT_REASKS,
         )
 
     @crew
@@ -91,7 +105,7 @@ class CrimeCrew:
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=crew_verbose(),
         )
 
 
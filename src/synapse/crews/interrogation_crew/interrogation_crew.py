@@ -0,0 +1,58 @@
+from crewai import Agent, Crew, Process, Task
+from crewai.project import CrewBase, agent, crew, task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from typing import List
+from pydantic import BaseModel
+from synapse.utils.llm import gemini_creative
+from synapse.utils.logging_config import crew_verbose
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
+
+
+class InterrogationAnswer(BaseModel):
+    answer: str
+
+
+@compiled_crew
+@CrewBase
+class InterrogationCrew():
+    """Answers one interrogation question in character as a suspect.
+
+    The agent is seeded from the suspect's dossier; the task only gets the
+    suspect's slice of the clue manifest and timeline, the compacted
+    conversation so far and the new question (see ``synapse.interrogation``).
+    """
+
+    agents: List[BaseAgent]
+    tasks: List[Task]
+
+    agents_config = 'config/agents.yaml'
+    tasks_config = 'config/tasks.yaml'
+
+    @agent
+    def Suspect_agent(self) -> Agent:
+        return Agent(
+            config=self.agents_config['Suspect_agent'],
+            # Streamed so answers can be relayed to the player while they are generated.
+            llm=gemini_creative(stream=True)
+        )
+
+    @task
+    def Interrogation_answer(self) -> Task:
+        return Task(
+            config=self.tasks_config['Interrogation_answer_task'],
+            output_json=InterrogationAnswer,
+            guardrail=artifact_guardrail(InterrogationAnswer),
+            guardrail_max_retries=ARTIFACT_REASKS
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        """Creates the InterrogationCrew crew"""
+
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            process=Process.sequential,
+            verbose=crew_verbose(),
+        )
@@ -4,7 +4,11 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from synapse.utils.llm import gemini_creative
+from synapse.utils.logging_config import crew_verbose
 from synapse.utils.save_json import SaveJson
+from synapse.utils.case_store import CaseStore, default_case_store
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
 
 
 class SuspectDossier(BaseModel):
@@ -22,6 +26,16 @@ class SuspectDossier(BaseModel):
 class SuspectDossiersOutput(BaseModel):
     suspectDossiers: List[SuspectDossier]
 
+class CastMember(BaseModel):
+    characterID: str
+    name: str
+    gender: str
+    roleInStory: str
+    connectionToCase: str
+
+class SuspectCast(BaseModel):
+    cast: List[CastMember]
+
 class Clue(BaseModel):
     clueID: str
     clueTitle: str
@@ -54,6 +68,7 @@ class MasterTimeline(BaseModel):
     postCrime: List[PrePostCrimeEvent]
 
 
+@compiled_crew
 @CrewBase
 class NarrativeCrew():
     """NarrativeCrew crew"""
@@ -64,6 +79,9 @@ class NarrativeCrew():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, store: Optional[CaseStore] = None) -> None:
+        self.store = store or default_case_store()
+
     @agent
     def Narrative_weaver_agent(self) -> Agent:
         return Agent(
@@ -76,7 +94,9 @@ class NarrativeCrew():
         return Task(
             config=self.tasks_config['Suspect_dossiers_task'],
             output_json=SuspectDossiersOutput,
-            callback=lambda result: SaveJson.save_json(result, "Suspect_dossiers.json")
+            guardrail=artifact_guardrail(SuspectDossiersOutput),
+            guardrail_max_retries=ARTIFACT_REASKS,
+            callback=lambda result: SaveJson.save_json(result, "Suspect_dossiers.json", self.store)
         )
 
     @task
@@ -85,8 +105,10 @@ class NarrativeCrew():
         return Task(
             config=self.tasks_config['Clue_manifest_task'],
             output_json=ClueManifest,
+            guardrail=artifact_guardrail(ClueManifest),
+            guardrail_max_retries=ARTIFACT_REASKS,
             depends_on=[self.Suspect_dossiers],
-            callback=lambda result: SaveJson.save_json(result, "Clue_manifest.json")
+            callback=lambda result: SaveJson.save_json(result, "Clue_manifest.json", self.store)
         )
 
     @task
@@ -95,8 +117,10 @@ class NarrativeCrew():
         return Task(
             config=self.tasks_config['Master_timeline_task'],
             output_json=MasterTimeline,
+            guardrail=artifact_guardrail(MasterTimeline),
+            guardrail_max_retries=ARTIFACT_REASKS,
             depends_on=[self.Suspect_dossiers, self.Clue_manifest],
-            callback=lambda result: SaveJson.save_json(result, "Master_timeline.json")
+            callback=lambda result: SaveJson.save_json(result, "Master_timeline.json", self.store)
         )
 
     @task
@@ -115,5 +139,60 @@ class NarrativeCrew():
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
-        )
\ No newline at end of file
+            verbose=crew_verbose(),
+        )
+
+
+@compiled_crew
+@CrewBase
+class NarrativeFanoutCrew():
+    """Narrative crew split into small single-task crews for the parallel narrative mode.
+
+    The cast is designed first, then each dossier is written by its own crew
+    so they can run concurrently, followed by the clue manifest and the
+    master timeline. Each crew only gets the (pruned) context its task
+    references; build one instance per crew that runs at the same time.
+    """
+
+    agents: List[BaseAgent]
+    tasks: List[Task]
+
+    agents_config = 'config/fanout_agents.yaml'
+    tasks_config = 'config/fanout_tasks.yaml'
+
+    @agent
+    def Case_writer_agent(self) -> Agent:
+        return Agent(
+            config=self.agents_config['Case_writer_agent'],
+            llm=gemini_creative()
+        )
+
+    def _single_task_crew(self, name: str, model: type) -> Crew:
+        task = Task(
+            name=name,
+            config=self.tasks_config[f'{name}_task'],
+            output_json=model,
+            guardrail=artifact_guardrail(model),
+            guardrail_max_retries=ARTIFACT_REASKS,
+        )
+        return Crew(
+            agents=[self.Case_writer_agent()],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=crew_verbose(),
+        )
+
+    def cast_crew(self) -> Crew:
+        return self._single_task_crew('Suspect_cast', SuspectCast)
+
+    def dossier_crew(self) -> Crew:
+        return self._single_task_crew('Suspect_dossier', SuspectDossier)
+
+    def clue_crew(self) -> Crew:
+        return self._single_task_crew('Clue_manifest', ClueManifest)
+
+    def single_clue_crew(self) -> Crew:
+        return self._single_task_crew('Clue', Clue)
+
+    def timeline_crew(self) -> Crew:
+        return self._single_task_crew('Master_timeline', MasterTimeline)
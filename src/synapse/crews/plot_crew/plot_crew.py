@@ -1,10 +1,37 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from typing import List, Optional
+from pydantic import BaseModel
 from synapse.utils.llm import gemini_creative
+from synapse.utils.logging_config import crew_verbose
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
 
+class Character(BaseModel):
+    name: str
+    profile: str
 
+class CrimeDetails(BaseModel):
+    location: Optional[str] = None
+    object: str
+    description: str
+
+class Motive(BaseModel):
+    primary: str
+    description: str
+
+class BullseyeConcept(BaseModel):
+    culprit: Character
+    victim: Character
+    crime: CrimeDetails
+    motive: Motive
+
+class Bullseye(BaseModel):
+    bullseyeConcept: BullseyeConcept
+
+
+@compiled_crew
 @CrewBase
 class PlotCrew:
     """Plot Crew"""
@@ -26,6 +53,8 @@ class PlotCrew:
     def Generate_bullseye(self) -> Task:
         return Task(
             config=self.tasks_config["Generate_bullseye_task"],
+            guardrail=artifact_guardrail(Bullseye),
+            guardrail_max_retries=ARTIFACT_REASKS,
         )
 
     @crew
@@ -36,5 +65,5 @@ class PlotCrew:
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=crew_verbose(),
         )
@@ -2,7 +2,10 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
-from synapse.utils.llm import llm
+from synapse.utils.llm import azure_mini
+from synapse.utils.logging_config import crew_verbose
+from synapse.utils.crew_templates import compiled_crew
+from synapse.utils.artifacts import ARTIFACT_REASKS, artifact_guardrail
 from pydantic import BaseModel
 
 class KeyFlaw(BaseModel):
@@ -19,6 +22,7 @@ class Solution(BaseModel):
     solvablePath: SolvablePath
 
 
+@compiled_crew
 @CrewBase
 class SolutionCrew:
     """Solution Crew"""
@@ -33,14 +37,16 @@ class SolutionCrew:
     def Solution_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["Solution_agent"],
-            llm=llm
+            llm=azure_mini()
         )
 
     @task
     def Generate_solution(self) -> Task:
         return Task(
             config=self.tasks_config["Generate_solution_task"],
-            output_json=Solution
+            output_json=Solution,
+            guardrail=artifact_guardrail(Solution),
+            guardrail_max_retries=ARTIFACT_REASKS
         )
 
     @crew
@@ -51,5 +57,5 @@ class SolutionCrew:
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
-            verbose=True,
+            verbose=crew_verbose(),
         )
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import os
+import textwrap
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, List, NamedTuple, Optional
+
+from pydantic import BaseModel, Field
+
+from synapse.crews.interrogation_crew.interrogation_crew import InterrogationAnswer, InterrogationCrew
+from synapse.utils.artifacts import validate_artifact
+from synapse.utils.briefing_stream import PartialJSONString
+from synapse.utils.case_store import new_case_id, open_case_store
+from synapse.utils.context_pruner import ContextPruner
+from synapse.utils.executor import kickoff_crew, run_blocking
+from synapse.utils.llm import gemini_creative
+from synapse.utils.logging_config import get_logger
+from synapse.utils.metrics import registry
+from synapse.utils.progress import ProgressReporter, current_reporter, current_stage
+from synapse.utils.prompt_stats import count_tokens
+from synapse.utils.rate_limiter import INTERACTIVE, llm_priority
+from synapse.utils.state import get_state
+
+logger = get_logger(__name__)
+
+STAGE = "interrogation"
+# Shared state namespace holding the sessions, so any API worker can continue one.
+NAMESPACE = "interrogations"
+
+# Questions and answers kept verbatim in the prompt; older ones are folded into notes.
+RECENT_TURNS = int(os.getenv("SYNAPSE_INTERROGATION_TURNS", "4"))
+# Token budget of the notes; the oldest notes are dropped beyond it.
+MEMORY_TOKENS = int(os.getenv("SYNAPSE_INTERROGATION_MEMORY_TOKENS", "400"))
+# Most clues and timeline events put in front of a suspect.
+MAX_EVIDENCE = int(os.getenv("SYNAPSE_INTERROGATION_EVIDENCE", "8"))
+
+QUESTION_LENGTH = 500
+NOTE_QUESTION_CHARS = 120
+NOTE_ANSWER_CHARS = 200
+
+# Dossier fields the suspect agent is seeded with.
+PERSONA_FIELDS = (
+    "name", "roleInStory", "biography", "connectionToCase", "initialStatementToPolice",
+    "statedAlibi", "alibiFlaw", "trueAction",
+)
+CONTEXT = {
+    "clue": ["clueID", "clueTitle", "discoveryLocation", "description"],
+    "event": ["timestamp", "action", "event", "location", "relatedClueID"],
+}
+
+interrogation_questions = registry.counter("synapse_interrogation_questions_total", "Questions asked in interrogations.")
+
+
+class InterrogationError(Exception):
+    """Raised when a session cannot be opened or continued (unknown case or suspect)."""
+
+
+class Turn(BaseModel):
+    question: str
+    answer: str
+
+
+class InterrogationSession(BaseModel):
+    """One detective questioning one suspect of a case.
+
+    ``turns`` holds the latest questions and answers verbatim; older turns are
+    folded into one-line ``notes``, so the conversation memory sent with each
+    question stays bounded however long the interrogation runs.
+    """
+
+    session_id: str
+    case_id: str
+    characterID: str
+    name: str
+    notes: List[str] = Field(default_factory=list)
+    turns: List[Turn] = Field(default_factory=list)
+    asked: int = 0
+    created: float = Field(default_factory=time.time)
+
+    def conversation(self) -> str:
+        lines = [f"(earlier) {note}" for note in self.notes]
+        for turn in self.turns:
+            lines.append(f"Detective: {turn.question}")
+            lines.append(f"{self.name}: {turn.answer}")
+        return "\n".join(lines) or "(no questions yet)"
+
+    def remember(self, turn: Turn) -> None:
+        """Add a turn, folding the oldest verbatim turns into notes and trimming notes to the budget."""
+        self.turns.append(turn)
+        self.asked += 1
+        while len(self.turns) > RECENT_TURNS:
+            old = self.turns.pop(0)
+            self.notes.append(
+                f"Q: {textwrap.shorten(old.question, NOTE_QUESTION_CHARS)} "
+                f"A: {textwrap.shorten(old.answer, NOTE_ANSWER_CHARS)}"
+            )
+        model = gemini_creative(stream=True).model
+        while self.notes and count_tokens(model, "\n".join(self.notes)) > MEMORY_TOKENS:
+            self.notes.pop(0)
+
+
+class SuspectContext(NamedTuple):
+    # Case store version the context was built from.
+    version: str
+    persona: Dict[str, str]
+    crime_type: str
+    location: str
+    # Minified JSON of the clues and timeline events concerning the suspect.
+    evidence: str
+
+
+def _mentions(text: Any, suspect: Dict[str, Any]) -> bool:
+    text = str(text or "").casefold()
+    return any(marker and marker.casefold() in text for marker in (suspect.get("name"), suspect.get("characterID")))
+
+
+def suspect_evidence(suspect: Dict[str, Any], clues: Dict[str, Any], timeline: Dict[str, Any]) -> Dict[str, Any]:
+    """The slice of the clue manifest and master timeline concerning one suspect.
+
+    Timeline events count when the suspect is their character or is named in
+    them; clues count when they name the suspect or are referenced by one of
+    the suspect's events.
+    """
+    events = [
+        event for phase in ("preCrime", "postCrime") for event in timeline.get(phase, [])
+        if _mentions(event.get("character"), suspect) or _mentions(event.get("action"), suspect)
+    ]
+    events += [event for event in timeline.get("crimeExecution", []) if _mentions(event.get("event"), suspect)]
+    related = {event.get("relatedClueID") for event in events if event.get("relatedClueID")}
+    found = [
+        clue for clue in clues.get("clueManifest", [])
+        if clue.get("clueID") in related or _mentions(clue.get("description"), suspect) or _mentions(clue.get("clueTitle"), suspect)
+    ]
+    return {
+        "clues": ContextPruner.prune(found[:MAX_EVIDENCE], CONTEXT["clue"]),
+        "events": ContextPruner.prune(events[:MAX_EVIDENCE], CONTEXT["event"]),
+    }
+
+
+class SuspectContexts:
+    """Persona and evidence slice per suspect, built once per case version.
+
+    The clue manifest and timeline are scanned when a case is first
+    interrogated (and again after it changed); every question then reuses
+    the precomputed slices instead of re-sending the case file.
+    """
+
+    def __init__(self, max_cases: int = 256) -> None:
+        self.max_cases = max_cases
+        self._cases: "OrderedDict[str, Dict[str, SuspectContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def suspect(self, case_id: str, character_id: str) -> SuspectContext:
+        """Context of one suspect. Raises InterrogationError for unknown suspects or cases without dossiers."""
+        contexts = await self.case(case_id)
+        if character_id not in contexts:
+            raise InterrogationError(f"Unknown suspect {character_id} in case {case_id}")
+        return contexts[character_id]
+
+    async def case(self, case_id: str) -> Dict[str, SuspectContext]:
+        store = open_case_store(case_id)
+        version = f"{case_id}:{await store.version_async()}"
+        with self._lock:
+            cached = self._cases.get(case_id)
+            if cached and next(iter(cached.values())).version == version:
+                self._cases.move_to_end(case_id)
+                return cached
+        try:
+            settings = await store.read_async("Settings.json")
+            dossiers = await store.read_async("Suspect_dossiers.json")
+        except FileNotFoundError:
+            raise InterrogationError(f"The suspects of case {case_id} are not ready")
+        # Clues and timeline are generated after the dossiers; until then suspects only know their own story.
+        clues = await self._optional(store, "Clue_manifest.json")
+        timeline = await self._optional(store, "Master_timeline.json")
+        contexts = {
+            suspect["characterID"]: SuspectContext(
+                version=version,
+                persona={name: str(suspect.get(name, "")) for name in PERSONA_FIELDS},
+                crime_type=settings.get("crimeType", ""),
+                location=settings.get("location", ""),
+                evidence=json.dumps(suspect_evidence(suspect, clues, timeline), separators=(",", ":")),
+            )
+            for suspect in dossiers.get("suspectDossiers", [])
+        }
+        if contexts:
+            with self._lock:
+                self._cases[case_id] = contexts
+                while len(self._cases) > self.max_cases:
+                    self._cases.popitem(last=False)
+        return contexts
+
+    @staticmethod
+    async def _optional(store: Any, name: str) -> Dict[str, Any]:
+        try:
+            return await store.read_async(name)
+        except FileNotFoundError:
+            return {}
+
+
+class Interrogations:
+    """Interrogation sessions kept in the shared state backend.
+
+    Each question costs one small prompt: the suspect's persona and evidence
+    slice (precomputed per case version), the compacted conversation and the
+    question. Questions of one session are answered one at a time within a
+    worker; clients are expected to wait for an answer before asking again.
+    """
+
+    def __init__(self) -> None:
+        self.contexts = SuspectContexts()
+        # A lock lives as long as a question of its session is being answered or waiting.
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def open(self, case_id: str, character_id: str) -> InterrogationSession:
+        context = await self.contexts.suspect(case_id, character_id)
+        session = InterrogationSession(
+            session_id=new_case_id(), case_id=case_id, characterID=character_id, name=context.persona["name"]
+        )
+        await self.save(session)
+        return session
+
+    async def get(self, session_id: str) -> Optional[InterrogationSession]:
+        data = await get_state().get_async(NAMESPACE, session_id)
+        return InterrogationSession.model_validate(data) if data is not None else None
+
+    async def save(self, session: InterrogationSession) -> None:
+        await get_state().set_async(NAMESPACE, session.session_id, session.model_dump(mode="json"))
+
+    async def close(self, session_id: str) -> bool:
+        """End a session; returns whether it existed."""
+        state = get_state()
+        if await state.get_async(NAMESPACE, session_id) is None:
+            return False
+        if state.blocking:
+            await run_blocking(state.delete, NAMESPACE, session_id)
+        else:
+            state.delete(NAMESPACE, session_id)
+        return True
+
+    async def ask(self, session_id: str, question: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Answer ``question`` in character, yielding "answer_chunk" events while it streams and a final "answer".
+
+        If the answer is re-asked after chunks were streamed, an "answer_reset" event
+        tells the client to discard them; the chunks that follow belong to the new answer.
+
+        Closing the generator early stops the suspect's remaining LLM work.
+        """
+        question = question.strip()[:QUESTION_LENGTH]
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        async with lock:
+            session = await self.get(session_id)
+            if session is None:
+                raise InterrogationError(f"Unknown interrogation: {session_id}")
+            context = await self.contexts.suspect(session.case_id, session.characterID)
+            inputs = {
+                **context.persona,
+                "crimeType": context.crime_type,
+                "location": context.location,
+                "evidence": context.evidence,
+                "conversation": session.conversation(),
+                "question": question,
+            }
+
+            reporter = ProgressReporter(session.case_id)
+            stream = {"decoder": PartialJSONString("answer"), "streamed": False}
+
+            def on_call() -> None:
+                # A re-ask (e.g. after the guardrail rejected the answer) streams a new answer from scratch.
+                if stream["streamed"]:
+                    reporter.emit("answer_reset", session_id=session_id)
+                stream["decoder"] = PartialJSONString("answer")
+                stream["streamed"] = False
+
+            def on_chunk(chunk: str) -> None:
+                text = stream["decoder"].feed(chunk)
+                if text:
+                    stream["streamed"] = True
+                    reporter.emit("answer_chunk", session_id=session_id, text=text)
+
+            reporter.on_llm_call(STAGE, on_call)
+            reporter.on_llm_chunk(STAGE, on_chunk)
+            events = reporter.subscribe()
+            answering = asyncio.create_task(self._answer(reporter, inputs))
+            try:
+                while True:
+                    event = await events.get()
+                    if event is None:
+                        break
+                    if event["event"] in ("answer_chunk", "answer_reset"):
+                        yield event
+                answer = await answering
+            finally:
+                reporter.unsubscribe(events)
+                if not answering.done():
+                    reporter.cancel()
+                    answering.cancel()
+
+            turn = Turn(question=question, answer=answer)
+            session.remember(turn)
+            await self.save(session)
+            interrogation_questions.inc()
+            yield {
+                "event": "answer",
+                "session_id": session_id,
+                "case_id": session.case_id,
+                "time": time.time(),
+                "answer": answer,
+                "asked": session.asked,
+            }
+
+    @staticmethod
+    async def _answer(reporter: ProgressReporter, inputs: Dict[str, Any]) -> str:
+        # Runs in its own task, so the context it sets is inherited by the crew worker thread only.
+        current_reporter.set(reporter)
+        current_stage.set(STAGE)
+        llm_priority.set(INTERACTIVE)
+        try:
+            result = await kickoff_crew(lambda: InterrogationCrew().crew(), inputs)
+            return validate_artifact(InterrogationAnswer, result.raw).answer
+        finally:
+            reporter.close()
+
+
+interrogations = Interrogations()
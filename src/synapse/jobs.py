@@ -0,0 +1,232 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from synapse.admission import Overloaded
+from synapse.main import Settings, States
+from synapse.pipeline import StageScheduler
+from synapse.utils.case_store import new_case_id, open_case_store, pin_case_store, unpin_case_store
+from synapse.utils.rate_limiter import BACKGROUND
+from synapse.utils.state import get_state
+
+
+class Job(BaseModel):
+    """Status record of a story generated in the background."""
+
+    case_id: str
+    settings: Settings
+    status: str = "queued"  # queued | running | completed | failed | cancelled
+    stages: Dict[str, str] = Field(default_factory=dict)
+    error: Optional[str] = None
+    use_cache: bool = True
+    created_at: float = Field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobManager:
+    """Runs full story pipelines on a bounded pool of asyncio workers.
+
+    ``submit()`` returns immediately with a queued ``Job``; at most
+    ``max_workers`` pipelines run at the same time and the rest wait in FIFO
+    order. Artifacts land in the case store of the job's case ID. Once
+    ``max_queued`` jobs are waiting, ``submit()`` raises ``Overloaded``.
+
+    Job records are mirrored to the shared state backend on every status
+    change, so ``lookup()`` answers for jobs running on any API worker.
+    Queues and cancellation stay local to the worker running the job.
+
+    The case store of a job stays pinned open from the moment it is queued
+    until its worker is done with it.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000, max_queued: int = 100) -> None:
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.max_queued = max_queued
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._schedulers: Dict[str, StageScheduler] = {}
+        self._queue: Optional["asyncio.Queue[str]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+
+    def _ensure_workers(self) -> None:
+        # Workers are created lazily so they bind to the running event loop.
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.max_workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    def submit(self, settings: Settings, case_id: Optional[str] = None, use_cache: bool = True) -> Job:
+        """Queue a new story generation and return its job record."""
+        queued = self.queued
+        if queued >= self.max_queued:
+            raise Overloaded("The case queue is full", self.retry_after(queued), queued)
+        self._ensure_workers()
+        job = Job(case_id=case_id or new_case_id(), settings=settings, use_cache=use_cache)
+        self._jobs[job.case_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        pin_case_store(job.case_id)
+        self._queue.put_nowait(job.case_id)
+        self._save(job)
+        return job
+
+    def _save(self, job: Job) -> None:
+        get_state().set_behind("jobs", job.case_id, job.model_dump(mode="json"))
+
+    def get(self, case_id: str) -> Optional[Job]:
+        job = self._jobs.get(case_id)
+        scheduler = self._schedulers.get(case_id)
+        if job is not None and scheduler is not None:
+            job.stages = dict(scheduler.stage_status)
+        return job
+
+    async def lookup(self, case_id: str) -> Optional[Job]:
+        """The job of ``case_id`` as every worker sees it.
+
+        A job running in this process is reported live; otherwise the shared
+        record is returned with the stage progress last published for the case.
+        Cases started outside the job API (``/generate_story``, the stream
+        endpoint, the story pool) have no job record; they are described from
+        their published progress and the settings in their case store.
+        """
+        if case_id in self._schedulers:
+            return self.get(case_id)
+        state = get_state()
+        record = await state.get_async("jobs", case_id)
+        job = Job(**record) if record is not None else self._jobs.get(case_id)
+        progress = await state.get_async("progress", case_id)
+        if job is None:
+            job = await self._from_case(case_id, progress)
+            if job is None:
+                return None
+        if progress is not None:
+            job.stages = progress["stages"]
+        return job
+
+    @staticmethod
+    async def _from_case(case_id: str, progress: Optional[Dict]) -> Optional[Job]:
+        try:
+            settings = await open_case_store(case_id).read_async("Settings.json")
+        except FileNotFoundError:
+            return None
+        # Without published progress the artifacts were stored whole (e.g. served from the story pool).
+        status = progress["status"] if progress is not None else "completed"
+        return Job(case_id=case_id, settings=Settings(**settings), status=status)
+
+    def queue_position(self, case_id: str) -> Optional[int]:
+        """1-based position of a queued job, or None if it is not waiting."""
+        # Jobs are queued in submission order, which is also the order of ``_jobs``.
+        queued = [job_id for job_id, job in self._jobs.items() if job.status == "queued"]
+        return queued.index(case_id) + 1 if case_id in queued else None
+
+    async def resume(self, case_id: str) -> Optional[Job]:
+        """Queue a failed or cancelled case again; it restarts from the first stage that did not finish.
+
+        Cases started outside the job API (e.g. by ``/generate_story``) or by
+        another worker are picked up from the settings in their case store.
+        Returns None for an unknown case, and queued, running or completed
+        jobs unchanged.
+        """
+        job = self._jobs.get(case_id)
+        if job is None:
+            shared = await self.lookup(case_id)
+            if shared is not None and shared.status not in ("failed", "cancelled"):
+                return shared
+            store = open_case_store(case_id)
+            try:
+                settings = await store.read_async("Settings.json")
+            except FileNotFoundError:
+                return None
+            job = Job(case_id=case_id, settings=Settings(**settings), status="failed")
+            self._jobs[case_id] = job
+        if job.status not in ("failed", "cancelled"):
+            return job
+        self._ensure_workers()
+        job.status = "queued"
+        job.error = None
+        job.started_at = job.finished_at = None
+        pin_case_store(case_id)
+        self._queue.put_nowait(case_id)
+        self._save(job)
+        return job
+
+    def retry_after(self, queued: int) -> int:
+        """Seconds until ``queued`` waiting jobs are likely to have started, from recent run times."""
+        durations = [
+            job.finished_at - job.started_at
+            for job in self._jobs.values()
+            if job.status == "completed" and job.started_at and job.finished_at
+        ][-20:]
+        average = sum(durations) / len(durations) if durations else 60.0
+        return max(1, round(average * queued / self.max_workers))
+
+    def cancel(self, case_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Finished jobs are left untouched."""
+        job = self._jobs.get(case_id)
+        if job is None or job.status not in ("queued", "running"):
+            return job
+        scheduler = self._schedulers.get(case_id)
+        if scheduler is not None:
+            scheduler.cancel()
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        job = self.get(case_id)
+        self._save(job)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            case_id = await self._queue.get()
+            try:
+                await self._run(case_id)
+            finally:
+                unpin_case_store(case_id)
+                self._queue.task_done()
+
+    async def _run(self, case_id: str) -> None:
+        job = self._jobs.get(case_id)
+        if job is None or job.status != "queued":
+            return
+        store = open_case_store(case_id)
+        scheduler = StageScheduler(
+            store, States(settings=job.settings, case_id=case_id), use_llm_cache=job.use_cache, priority=BACKGROUND
+        )
+        self._schedulers[case_id] = scheduler
+        job.status = "running"
+        job.started_at = time.time()
+        self._save(job)
+        try:
+            await scheduler.run()
+            job.status = "completed"
+        except asyncio.CancelledError:
+            # A cancelled job is already marked; anything else means the worker is shutting down.
+            if job.status != "cancelled":
+                job.status = "cancelled"
+                scheduler.cancel()
+                raise
+        except Exception as e:
+            if job.status != "cancelled":
+                job.status = "failed"
+                job.error = str(e)
+        finally:
+            job.stages = dict(scheduler.stage_status)
+            job.finished_at = job.finished_at or time.time()
+            self._schedulers.pop(case_id, None)
+            self._save(job)
+
+
+jobs = JobManager(
+    max_workers=int(os.getenv("SYNAPSE_JOB_WORKERS", "2")),
+    max_queued=int(os.getenv("SYNAPSE_MAX_QUEUED_JOBS", "100")),
+)
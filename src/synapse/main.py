@@ -1,18 +1,47 @@
 #!/usr/bin/env python
+import asyncio
 import json
 import os
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from crewai.flow import Flow, listen, start
-from synapse.crews.plot_crew.plot_crew import PlotCrew
-from synapse.crews.briefing_crew.briefing_crew import BriefingCrew
-from synapse.crews.crime_crew.crime_crew import CrimeCrew
-from synapse.crews.solution_crew.solution_crew import SolutionCrew
-from synapse.crews.narrative_crew.narrative_crew import NarrativeCrew
+from synapse.crews.plot_crew.plot_crew import PlotCrew, Bullseye
+from synapse.crews.briefing_crew.briefing_crew import BriefingCrew, Briefing as BriefingModel
+from synapse.crews.crime_crew.crime_crew import CrimeCrew, CrimeExecution, CrimeCoverUP
+from synapse.crews.solution_crew.solution_crew import SolutionCrew, Solution as SolutionModel
+from synapse.crews.narrative_crew.narrative_crew import (
+    NarrativeCrew,
+    NarrativeFanoutCrew,
+    Clue,
+    SuspectCast,
+    SuspectDossier,
+    SuspectDossiersOutput,
+    ClueManifest as ClueManifestModel,
+    MasterTimeline as MasterTimelineModel,
+)
 from synapse.utils.json_cleaner import JSONCleaner
+from synapse.utils.artifacts import validate_artifact
+from synapse.utils.context_pruner import ContextPruner
 from synapse.utils import JSONExtractor
-import json
-from typing import Optional
+from typing import Any, Dict, List, Optional, Set
 from synapse.utils.region_generator import RegionGenerator
+from synapse.utils.case_store import CaseStore, default_case_store
+from synapse.utils.checkpoints import current_checkpoints
+from synapse.utils.consistency import (
+    CONSISTENCY_REPAIRS,
+    InconsistentCaseError,
+    Issue,
+    check_case,
+    consistency_issues,
+    consistency_repairs,
+    feedback,
+    issue_data,
+)
+from synapse.utils.executor import kickoff_crew
+from synapse.utils.llm_cache import llm_cache_enabled
+from synapse.utils.logging_config import Payload, get_logger
+from synapse.utils.progress import current_reporter, current_stage
+
+logger = get_logger(__name__)
 
 class Settings(BaseModel):
     location: str
@@ -20,6 +49,14 @@ class Settings(BaseModel):
     region: Optional[str] = None
 
 class States(BaseModel):
+    """Pipeline state shared by all stages.
+
+    Artifacts with an output model are held as validated model instances;
+    assigning parsed JSON to one of them validates it on the spot.
+    """
+
+    model_config = ConfigDict(validate_assignment=True)
+
     settings: Settings = Field(
         default_factory=lambda: Settings(
             location="",
@@ -27,201 +64,441 @@ class States(BaseModel):
             region="",
         )
     )
-    Plot: str = ""
-    CrimeInputs: str = ""
-    Crime: str = ""
-    BriefingInputs: str = ""
-    Briefing: str = ""
-
-    Bullseye: str = ""
-    ExecutionPlan: str = ""
-    CoverupPlan: str = ""
-    Solution: str = ""
-    Narrative: str = ""
-
-class PlotFlow(Flow[States]):
+    case_id: str = ""
+    Plot: Optional[Bullseye] = None
+    CrimeInputs: Dict[str, Any] = Field(default_factory=dict)
+    BriefingInputs: Dict[str, Any] = Field(default_factory=dict)
+    Briefing: Optional[BriefingModel] = None
+
+    ExecutionPlan: Optional[CrimeExecution] = None
+    CoverupPlan: Optional[CrimeCoverUP] = None
+    Solution: Optional[SolutionModel] = None
+    SuspectDossiers: Optional[SuspectDossiersOutput] = None
+    ClueManifest: Optional[ClueManifestModel] = None
+    MasterTimeline: Optional[MasterTimelineModel] = None
+    Narrative: Dict[str, Any] = Field(default_factory=dict)
+
+class CaseFlow(Flow[States]):
+    """Base flow bound to the case store that receives its output artifacts.
+
+    Stages take their inputs from the pipeline state handed over by ``run()``.
+    When a flow is kicked off standalone, missing inputs are loaded from the
+    store instead; without an explicit store that is the JSON files in the
+    process CWD, as the ``kickoff()`` entry point expects.
+
+    After a stage ran, the case is checked for broken references between its
+    artifacts (``synapse.utils.consistency``). Issues with an artifact listed
+    in ``REPAIRS`` are fixed by re-generating just that artifact, at most
+    ``CONSISTENCY_REPAIRS`` times, before the stage fails.
+    """
+
+    # State fields this flow can re-generate on their own, mapped to the method doing it.
+    REPAIRS: Dict[str, str] = {}
+
+    def __init__(self, store: Optional[CaseStore] = None, **kwargs):
+        self.store = store or default_case_store()
+        super().__init__(**kwargs)
+        self.state.case_id = self.store.case_id
+
+    async def run(self, state: States) -> States:
+        """Run this stage on the pipeline ``state`` and return the updated state."""
+        await self.kickoff_async(inputs=state.model_dump(exclude={"id"}))
+        await self.ensure_consistent()
+        return self.state
+
+    async def ensure_consistent(self) -> Set[str]:
+        """Re-generate the artifacts of this stage that break references, until none do.
+
+        Returns the state fields that were re-generated. Raises
+        InconsistentCaseError when issues remain after ``CONSISTENCY_REPAIRS`` rounds.
+        Warnings left once the case is consistent are only reported.
+        """
+        repaired: Set[str] = set()
+        for attempt in range(CONSISTENCY_REPAIRS + 1):
+            found = [issue for issue in check_case(self.state) if issue.artifact in self.REPAIRS]
+            issues = [issue for issue in found if not issue.warning]
+            if not issues:
+                break
+            for issue in issues:
+                consistency_issues.inc(check=issue.check)
+            logger.warning("Case %s is inconsistent: %s", self.state.case_id, [issue.message for issue in issues])
+            reporter = current_reporter.get()
+            if reporter is not None:
+                reporter.emit("consistency_issues", stage=current_stage.get(), attempt=attempt, issues=issue_data(issues))
+            if attempt == CONSISTENCY_REPAIRS:
+                raise InconsistentCaseError(f"Case {self.state.case_id} is inconsistent: " + "; ".join(issue.message for issue in issues))
+            # Re-generations bypass the response cache and checkpoints, which would replay the answer being replaced.
+            cache_token = llm_cache_enabled.set(False)
+            checkpoints_token = current_checkpoints.set(None)
+            try:
+                for artifact in self.REPAIRS:
+                    if any(issue.artifact == artifact for issue in issues):
+                        consistency_repairs.inc(artifact=artifact)
+                        await getattr(self, self.REPAIRS[artifact])([issue for issue in found if issue.artifact == artifact])
+                        repaired.add(artifact)
+            finally:
+                llm_cache_enabled.reset(cache_token)
+                current_checkpoints.reset(checkpoints_token)
+        warnings = [issue for issue in found if issue.warning]
+        if warnings:
+            for issue in warnings:
+                consistency_issues.inc(check=issue.check)
+            logger.warning("Case %s has consistency warnings: %s", self.state.case_id, [issue.message for issue in warnings])
+            reporter = current_reporter.get()
+            if reporter is not None:
+                reporter.emit("consistency_warnings", stage=current_stage.get(), issues=issue_data(warnings))
+        if repaired:
+            await self.repaired(repaired)
+        return repaired
+
+    async def repaired(self, artifacts: Set[str]) -> None:
+        """Called with the state fields that were re-generated, once the case is consistent."""
+
+    async def require(self, field: str, artifact: str) -> Any:
+        """Return the state artifact ``field``, loading it from the store if the state lacks it."""
+        if not getattr(self.state, field):
+            setattr(self.state, field, await self.store.read_async(artifact))
+        return getattr(self.state, field)
+
+    @staticmethod
+    def prompt_json(data: Any) -> str:
+        """Render an artifact for interpolation into a task prompt."""
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+        return json.dumps(data, indent=2)
+
+    async def save(self, artifact: str, value: Any) -> None:
+        """Write an artifact to the case store as plain JSON data, off the event loop for disk stores."""
+        if isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        await self.store.write_async(artifact, value)
+
+class PlotFlow(CaseFlow):
 
     @start()
     def Start(self):
-        print("Starting Plot Flow")
+        logger.debug("Starting Plot Flow")
     @listen(Start)
-    def generate_Plot(self):
-        print("Generating Plot")
+    async def generate_Plot(self):
+        logger.debug("Generating Plot")
         self.state.settings.region = RegionGenerator.assign_random_region()
         inputs = self.state.settings.model_dump_json()
-        result = (
-            PlotCrew()
-            .crew()
-            .kickoff(inputs={"Settings": inputs})
-        )
+        result = await kickoff_crew(lambda: PlotCrew().crew(), {"Settings": inputs})
 
-        print("Plot generated", result.raw)
-        cleaned_plot = JSONCleaner.clean_json_content(result.raw)
-        self.state.Plot = cleaned_plot
-        print("Plot saved", self.state.Plot)
+        logger.info("Plot generated: %s", Payload(result.raw))
+        self.state.Plot = validate_artifact(Bullseye, result.raw)
+        logger.debug("Plot validated: %s", Payload(self.state.Plot))
 
     @listen(generate_Plot)
-    def save_Plot(self):
-        print("Saving Plot")
-        with open("Plot.json", "w") as f:
-            f.write(self.state.Plot)
+    async def save_Plot(self):
+        logger.debug("Saving Plot")
+        await self.save("Plot.json", self.state.Plot)
 
-class BriefingFlow(Flow[States]):
+class BriefingFlow(CaseFlow):
 
     @start()
     def Start(self):
-        print("Starting Briefing Flow")
+        logger.debug("Starting Briefing Flow")
 
     @listen(Start)
-    def extract_Briefing_inputs(self):
-        print("Extracting Briefing Inputs")
-        # Configure which JSON file to read and which keys/path to extract
-        file_path = "Plot.json"
+    async def extract_Briefing_inputs(self):
+        logger.debug("Extracting Briefing Inputs")
+        # Configure which keys/path to extract from the plot
         nested_path = ["bullseyeConcept"]
         keys_to_extract = ["victim", "crime"]
 
         extractor = JSONExtractor(
-            file_path=file_path,
+            data=(await self.require("Plot", "Plot.json")).model_dump(mode="json"),
             nested_path=nested_path,
         )
-        # Delegate error handling and fallback to extractor
-        self.state.BriefingInputs = extractor.extract_keys_or_fallback(
-            keys=keys_to_extract,
-            fallback_json=self.state.Plot,
-        )
-        print("Briefing inputs extracted and saved", self.state.BriefingInputs)
+        self.state.BriefingInputs = extractor.extract_keys(keys_to_extract)
+        logger.debug("Briefing inputs extracted: %s", Payload(self.state.BriefingInputs))
 
     @listen(extract_Briefing_inputs)
-    def generate_Briefing(self):
-        print("Generating Briefing")
-        result = (
-            BriefingCrew()
-            .crew()
-            .kickoff(inputs={"Plot": self.state.BriefingInputs})
-        )
+    async def generate_Briefing(self):
+        logger.debug("Generating Briefing")
+        result = await kickoff_crew(lambda: BriefingCrew().crew(), {"Plot": self.prompt_json(self.state.BriefingInputs)})
+
+        logger.info("Briefing generated: %s", Payload(result.raw))
+        self.state.Briefing = validate_artifact(BriefingModel, result.raw)
+        logger.debug("Briefing validated: %s", Payload(self.state.Briefing))
 
-        print("Briefing generated", result.raw)
-        cleaned_briefing = JSONCleaner.clean_json_content(result.raw)
-        self.state.Briefing = cleaned_briefing
-        print("Briefing saved", self.state.Briefing)
+    @listen(generate_Briefing)
+    async def save_Briefing(self):
+        logger.debug("Saving Briefing")
+        await self.save("Briefing.json", self.state.Briefing)
 
-class CrimeFlow(Flow[States]):
+class CrimeFlow(CaseFlow):
+
+    REPAIRS = {"ExecutionPlan": "regenerate_Crime"}
 
     @start()
     def Start(self):
-        print("Starting Crime Flow")
+        logger.debug("Starting Crime Flow")
     @listen(Start)
-    def extract_crime_inputs(self):
-        print("Extracting Crime Inputs")
-
-        with open("Plot.json", "r") as f:
-            inputs = json.load(f)
-            self.state.CrimeInputs = json.dumps(inputs["bullseyeConcept"])
-        print("Crime inputs extracted and saved", self.state.CrimeInputs)
+    async def extract_crime_inputs(self):
+        logger.debug("Extracting Crime Inputs")
+        self.state.CrimeInputs = (await self.require("Plot", "Plot.json")).bullseyeConcept.model_dump(mode="json")
+        logger.debug("Crime inputs extracted: %s", Payload(self.state.CrimeInputs))
 
     @listen(extract_crime_inputs)
-    def generate_Crime(self):
-        print("Generating Crime")
-        result = (
-            CrimeCrew()
-            .crew()
-            .kickoff(inputs={"plot": self.state.CrimeInputs})
-        )
-        print("Crime  generated", result.raw)
-        cleaned_crime = JSONCleaner.clean_json_content(result.raw)
-        self.state.Crime = cleaned_crime
-        print("Crime saved", self.state.Crime)
+    async def generate_Crime(self):
+        logger.debug("Generating Crime")
+        await self.write_Crime()
+
+    async def write_Crime(self, issues: Optional[List[Issue]] = None) -> None:
+        result = await kickoff_crew(lambda: CrimeCrew(store=self.store).crew(), {
+            "plot": json.dumps(self.state.CrimeInputs),
+            "feedback": feedback(issues or []),
+        })
+        logger.info("Crime generated: %s", Payload(result.raw))
+        # The execution plan is captured by the Crime_execution_design task callback.
+        self.state.ExecutionPlan = await self.store.read_async("Execution_plan.json")
+        self.state.CoverupPlan = validate_artifact(CrimeCoverUP, result.raw)
+        logger.debug("Coverup plan validated: %s", Payload(self.state.CoverupPlan))
     @listen(generate_Crime)
-    def save_Crime(self):
-        print("Saving Crime")
-        with open("Coverup_plan.json", "w") as f:
-            f.write(self.state.Crime)
+    async def save_Crime(self):
+        logger.debug("Saving Crime")
+        await self.save("Coverup_plan.json", self.state.CoverupPlan)
 
-class SolutionFlow(Flow[States]):
+    async def regenerate_Crime(self, issues: List[Issue]) -> None:
+        # The cover-up is built on the execution plan, so both tasks of the crew run again.
+        await self.write_Crime(issues)
+        await self.save_Crime()
+
+class SolutionFlow(CaseFlow):
     @start()
     def Start(self):
-        print("Starting Solution Flow")
+        logger.debug("Starting Solution Flow")
 
     @listen(Start)
-    def load_json_files(self):
-        print("Loading JSON files")
+    async def load_json_files(self):
+        logger.debug("Loading inputs")
         try:
-            # Read Plot.json and store in Bullseye
-            with open("Plot.json", "r") as f:
-                self.state.Bullseye = f.read()
-
-            # Read Execution_plan.json and store in ExecutionPlan
-            with open("Execution_plan.json", "r") as f:
-                self.state.ExecutionPlan = f.read()
-
-            # Read Coverup_plan.json and store in CoverupPlan
-            with open("Coverup_plan.json", "r") as f:
-                self.state.CoverupPlan = f.read()
-
-            print("JSON files loaded successfully")
+            await self.require("Plot", "Plot.json")
+            await self.require("ExecutionPlan", "Execution_plan.json")
+            await self.require("CoverupPlan", "Coverup_plan.json")
+            logger.debug("Inputs loaded successfully")
         except FileNotFoundError as e:
-            print(f"Error loading JSON files: {e}")
+            logger.error("Error loading JSON files: %s", e)
         except Exception as e:
-            print(f"Unexpected error loading JSON files: {e}")
+            logger.exception("Unexpected error loading JSON files: %s", e)
 
     @listen(load_json_files)
-    def generate_Solution(self):
-        print("Generating Solution")
-        result = (
-            SolutionCrew()
-            .crew()
-            .kickoff(inputs={"Bullseye": self.state.Bullseye, "ExecutionPlan": self.state.ExecutionPlan, "CoverupPlan": self.state.CoverupPlan})
-        )
-        print("Solution generated", result.raw)
-        cleaned_solution = JSONCleaner.clean_json_content(result.raw)
-        self.state.Solution = cleaned_solution
-        print("Solution saved", self.state.Solution)
+    async def generate_Solution(self):
+        logger.debug("Generating Solution")
+        result = await kickoff_crew(lambda: SolutionCrew().crew(), {
+            "Bullseye": self.prompt_json(self.state.Plot),
+            "ExecutionPlan": self.prompt_json(self.state.ExecutionPlan),
+            "CoverupPlan": self.prompt_json(self.state.CoverupPlan),
+        })
+        logger.info("Solution generated: %s", Payload(result.raw))
+        self.state.Solution = validate_artifact(SolutionModel, result.raw)
+        logger.debug("Solution validated: %s", Payload(self.state.Solution))
     @listen(generate_Solution)
-    def save_Solution(self):
-        print("Saving Solution")
-        with open("Solution.json", "w") as f:
-            f.write(self.state.Solution)
+    async def save_Solution(self):
+        logger.debug("Saving Solution")
+        await self.save("Solution.json", self.state.Solution)
+
+class NarrativeFlow(CaseFlow):
+    """Writes the suspect dossiers, clue manifest, master timeline and the merged case file.
+
+    With SYNAPSE_NARRATIVE_MODE=parallel the dossiers are written one call per
+    character, concurrently, and the clue manifest and timeline only get the
+    fields of earlier outputs they reference (``CONTEXT``); the case file is
+    then merged locally instead of being written by another LLM call.
+
+    In both modes, a dossier, clue manifest or timeline that breaks a
+    reference is re-generated on its own by the single-task crews of the
+    parallel mode, told what was wrong with the previous version.
+    """
+
+    REPAIRS = {
+        "SuspectDossiers": "regenerate_Dossiers",
+        "ClueManifest": "regenerate_Clues",
+        "MasterTimeline": "regenerate_Timeline",
+    }
+
+    parallel = os.getenv("SYNAPSE_NARRATIVE_MODE", "sequential").lower() == "parallel"
+
+    # Fields of earlier outputs each parallel-mode prompt gets.
+    CONTEXT = {
+        "clue_suspects": {"suspectDossiers": ["characterID", "name", "roleInStory", "statedAlibi", "alibiFlaw", "trueAction"]},
+        "timeline_suspects": {"suspectDossiers": ["characterID", "name", "roleInStory", "statedAlibi", "trueAction"]},
+        "timeline_clues": {"clueManifest": ["clueID", "clueTitle", "discoveryLocation", "relevance"]},
+    }
 
-class NarrativeFlow(Flow[States]):
     @start()
     def Start(self):
-        print("Starting Narrative Flow")
+        logger.debug("Starting Narrative Flow")
     @listen(Start)
-    def load_json_files(self):
-        print("Loading JSON files")
-        # Read Plot.json and store in Bullseye
-        with open("Plot.json", "r") as f:
-            self.state.Bullseye = f.read()
-
-        # Read Execution_plan.json and store in ExecutionPlan
-        with open("Execution_plan.json", "r") as f:
-            self.state.ExecutionPlan = f.read()
-
-        # Read Coverup_plan.json and store in CoverupPlan
-        with open("Coverup_plan.json", "r") as f:
-            self.state.CoverupPlan = f.read()
-
-        # Read Solution.json and store in Solution
-        with open("Solution.json", "r") as f:
-            self.state.Solution = f.read()
-        print("JSON files loaded successfully")
+    async def load_json_files(self):
+        logger.debug("Loading inputs")
+        await self.require("Plot", "Plot.json")
+        await self.require("ExecutionPlan", "Execution_plan.json")
+        await self.require("CoverupPlan", "Coverup_plan.json")
+        await self.require("Solution", "Solution.json")
+        logger.debug("Inputs loaded successfully")
     @listen(load_json_files)
-    def generate_Narrative(self):
-        print("Generating Narrative")
-        result = (
-            NarrativeCrew()
-            .crew()
-            .kickoff(inputs={"Bullseye": self.state.Bullseye, "ExecutionPlan": self.state.ExecutionPlan, "CoverupPlan": self.state.CoverupPlan,"solution": self.state.Solution})
+    async def generate_Narrative(self):
+        logger.debug("Generating Narrative")
+        if self.parallel:
+            await self.generate_parallel_Narrative()
+            return
+        result = await kickoff_crew(lambda: NarrativeCrew(store=self.store).crew(), {
+            "Bullseye": self.prompt_json(self.state.Plot),
+            "ExecutionPlan": self.prompt_json(self.state.ExecutionPlan),
+            "CoverupPlan": self.prompt_json(self.state.CoverupPlan),
+            "solution": self.prompt_json(self.state.Solution),
+        })
+        logger.info("Narrative generated: %s", Payload(result.raw))
+        # Dossiers, clues and timeline are captured by the NarrativeCrew task callbacks.
+        for field, artifact in (
+            ("SuspectDossiers", "Suspect_dossiers.json"),
+            ("ClueManifest", "Clue_manifest.json"),
+            ("MasterTimeline", "Master_timeline.json"),
+        ):
+            if await self.store.exists_async(artifact):
+                setattr(self.state, field, await self.store.read_async(artifact))
+        self.state.Narrative = JSONCleaner.parse_json_content(result.raw)
+        logger.debug("Narrative parsed: %s", Payload(self.state.Narrative))
+    async def generate_parallel_Narrative(self):
+        await self.generate_Dossiers()
+        await self.generate_Clues()
+        await self.generate_Timeline()
+        self.state.Narrative = self.merged_Narrative()
+
+    def cast(self) -> Dict[str, Any]:
+        """Identities of the characters that have a dossier, as the dossier prompts take them."""
+        return ContextPruner.prune(
+            self.state.SuspectDossiers,
+            {"suspectDossiers": ["characterID", "name", "gender", "roleInStory", "connectionToCase"]},
         )
-        print("Narrative generated", result.raw)
-        cleaned_narrative = JSONCleaner.clean_json_content(result.raw)
-        self.state.Narrative = cleaned_narrative
-        print("Narrative saved", self.state.Narrative)
+
+    async def write_Dossier(self, character: str, cast: Any, issues: Optional[List[Issue]] = None) -> SuspectDossier:
+        """Write the dossier of ``character`` ("C03 (Name)"), one member of ``cast``."""
+        result = await kickoff_crew(lambda: NarrativeFanoutCrew().dossier_crew(), {
+            "Bullseye": self.prompt_json(self.state.Plot),
+            "CoverupPlan": self.prompt_json(self.state.CoverupPlan),
+            "cast": self.prompt_json(cast),
+            "character": character,
+            "feedback": feedback(issues or []),
+        })
+        return validate_artifact(SuspectDossier, result.raw)
+
+    async def generate_Dossiers(self) -> None:
+        """Design the cast, then write every dossier with its own concurrent call."""
+        bullseye = self.prompt_json(self.state.Plot)
+        coverup = self.prompt_json(self.state.CoverupPlan)
+        result = await kickoff_crew(lambda: NarrativeFanoutCrew().cast_crew(), {"Bullseye": bullseye, "CoverupPlan": coverup})
+        cast = validate_artifact(SuspectCast, result.raw)
+        logger.info("Cast generated: %s", Payload(cast))
+
+        results = await asyncio.gather(*(
+            self.write_Dossier(f"{member.characterID} ({member.name})", cast) for member in cast.cast
+        ))
+        dossiers = []
+        for member, dossier in zip(cast.cast, results):
+            # The cast is the source of truth for who each dossier is about.
+            identity = member.model_dump(include={"characterID", "name", "gender", "roleInStory"})
+            dossiers.append(dossier.model_copy(update=identity))
+        self.state.SuspectDossiers = SuspectDossiersOutput(suspectDossiers=dossiers)
+        await self.save("Suspect_dossiers.json", self.state.SuspectDossiers)
+        logger.info("Dossiers generated: %s", Payload(self.state.SuspectDossiers))
+
+    async def generate_Dossier(self, character_id: str) -> None:
+        """Rewrite the dossier of one character, keeping who they are, so references to them stay valid."""
+        dossiers = self.state.SuspectDossiers.suspectDossiers
+        index = next((i for i, dossier in enumerate(dossiers) if dossier.characterID == character_id), None)
+        if index is None:
+            raise KeyError(character_id)
+        current = dossiers[index]
+        dossier = await self.write_Dossier(f"{current.characterID} ({current.name})", self.cast())
+        identity = current.model_dump(include={"characterID", "name", "gender", "roleInStory"})
+        dossiers = [*dossiers[:index], dossier.model_copy(update=identity), *dossiers[index + 1:]]
+        self.state.SuspectDossiers = SuspectDossiersOutput(suspectDossiers=dossiers)
+        await self.save("Suspect_dossiers.json", self.state.SuspectDossiers)
+        logger.info("Dossier of %s generated: %s", character_id, Payload(dossiers[index]))
+
+    async def generate_Clues(self, issues: Optional[List[Issue]] = None) -> None:
+        result = await kickoff_crew(lambda: NarrativeFanoutCrew().clue_crew(), {
+            "solution": self.prompt_json(self.state.Solution),
+            "suspects": self.prompt_json(ContextPruner.prune(self.state.SuspectDossiers, self.CONTEXT["clue_suspects"])),
+            "feedback": feedback(issues or []),
+        })
+        self.state.ClueManifest = validate_artifact(ClueManifestModel, result.raw)
+        await self.save("Clue_manifest.json", self.state.ClueManifest)
+        logger.info("Clues generated: %s", Payload(self.state.ClueManifest))
+
+    async def generate_Clue(self, clue_id: str) -> None:
+        """Rewrite one clue of the manifest under the same clueID."""
+        clues = self.state.ClueManifest.clueManifest
+        index = next((i for i, clue in enumerate(clues) if clue.clueID == clue_id), None)
+        if index is None:
+            raise KeyError(clue_id)
+        result = await kickoff_crew(lambda: NarrativeFanoutCrew().single_clue_crew(), {
+            "clue": self.prompt_json(clues[index]),
+            "clues": self.prompt_json(ContextPruner.prune(self.state.ClueManifest, self.CONTEXT["timeline_clues"])),
+            "solution": self.prompt_json(self.state.Solution),
+            "suspects": self.prompt_json(ContextPruner.prune(self.state.SuspectDossiers, self.CONTEXT["clue_suspects"])),
+        })
+        clue = validate_artifact(Clue, result.raw).model_copy(update={"clueID": clue_id})
+        self.state.ClueManifest = ClueManifestModel(clueManifest=[*clues[:index], clue, *clues[index + 1:]])
+        await self.save("Clue_manifest.json", self.state.ClueManifest)
+        logger.info("Clue %s generated: %s", clue_id, Payload(clue))
+
+    async def generate_Timeline(self, issues: Optional[List[Issue]] = None) -> None:
+        result = await kickoff_crew(lambda: NarrativeFanoutCrew().timeline_crew(), {
+            "Bullseye": self.prompt_json(self.state.Plot),
+            "ExecutionPlan": self.prompt_json(self.state.ExecutionPlan),
+            "CoverupPlan": self.prompt_json(self.state.CoverupPlan),
+            "suspects": self.prompt_json(ContextPruner.prune(self.state.SuspectDossiers, self.CONTEXT["timeline_suspects"])),
+            "clues": self.prompt_json(ContextPruner.prune(self.state.ClueManifest, self.CONTEXT["timeline_clues"])),
+            "feedback": feedback(issues or []),
+        })
+        self.state.MasterTimeline = validate_artifact(MasterTimelineModel, result.raw)
+        await self.save("Master_timeline.json", self.state.MasterTimeline)
+        logger.info("Timeline generated: %s", Payload(self.state.MasterTimeline))
+
+    def merged_Narrative(self) -> Dict[str, Any]:
+        """The case file, merged locally from the dossiers, clues and timeline."""
+        return {
+            **self.state.SuspectDossiers.model_dump(mode="json"),
+            **self.state.ClueManifest.model_dump(mode="json"),
+            "masterTimeline": self.state.MasterTimeline.model_dump(mode="json"),
+        }
+
+    async def merge_Narrative(self) -> None:
+        self.state.Narrative = self.merged_Narrative()
+        await self.save("Narrative.json", self.state.Narrative)
+
+    async def regenerate_Dossiers(self, issues: List[Issue]) -> None:
+        # The only dossier issue is a culprit without a dossier: write just that one and add it to the cast.
+        culprit = self.state.Plot.bullseyeConcept.culprit
+        dossiers = self.state.SuspectDossiers.suspectDossiers
+        # Models do not always number the cast in sequence; take the next number after the highest one.
+        numbers = [int(digits) for digits in ("".join(filter(str.isdigit, dossier.characterID)) for dossier in dossiers) if digits]
+        character_id = f"C{max(numbers, default=0) + 1:02d}"
+        dossier = await self.write_Dossier(f"{character_id} ({culprit.name}, the culprit, a suspect)", self.cast(), issues)
+        dossier = dossier.model_copy(update={"characterID": character_id, "name": culprit.name, "roleInStory": "suspect"})
+        self.state.SuspectDossiers = SuspectDossiersOutput(suspectDossiers=[*dossiers, dossier])
+        await self.save("Suspect_dossiers.json", self.state.SuspectDossiers)
+        logger.info("Culprit dossier generated: %s", Payload(dossier))
+
+    async def regenerate_Clues(self, issues: List[Issue]) -> None:
+        await self.generate_Clues(issues)
+
+    async def regenerate_Timeline(self, issues: List[Issue]) -> None:
+        await self.generate_Timeline(issues)
+
+    async def repaired(self, artifacts: Set[str]) -> None:
+        # The case file written before the repair embeds the replaced artifacts.
+        await self.merge_Narrative()
+
     @listen(generate_Narrative)
-    def save_Narrative(self):
-        print("Saving Narrative")
-        with open("Narrative.json", "w") as f:
-            f.write(self.state.Narrative)
+    async def save_Narrative(self):
+        logger.debug("Saving Narrative")
+        await self.save("Narrative.json", self.state.Narrative)
 
 def kickoff():
     # plot_flow = PlotFlow()
@@ -0,0 +1,303 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+from synapse.main import (
+    CaseFlow,
+    PlotFlow,
+    BriefingFlow,
+    CrimeFlow,
+    SolutionFlow,
+    NarrativeFlow,
+    States,
+)
+from synapse.utils.case_store import CaseStore, pin_case_store, unpin_case_store
+from synapse.utils.checkpoints import CheckpointStore, current_checkpoints, get_checkpoint_store, input_hash
+from synapse.utils.executor import io_executor, run_blocking
+from synapse.utils.llm_cache import llm_cache_enabled
+from synapse.utils.logging_config import get_logger
+from synapse.utils.metrics import stage_latency, stage_runs
+from synapse.utils.progress import ProgressReporter, current_reporter, current_stage
+from synapse.utils.rate_limiter import BACKGROUND, INTERACTIVE, llm_priority
+from synapse.utils.state import get_state
+from synapse.utils.tracing import add_event, end_spans, span, tracer
+
+
+class Stage:
+    """A pipeline stage: the flow to run plus the state fields it reads and fills in.
+
+    ``priority`` is the rate limiter priority of the stage's LLM calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flow: Type[CaseFlow],
+        requires: Tuple[str, ...] = (),
+        provides: Tuple[str, ...] = (),
+        priority: int = BACKGROUND,
+    ) -> None:
+        self.name = name
+        self.flow = flow
+        self.requires = requires
+        self.provides = provides
+        self.priority = priority
+
+
+STAGES: List[Stage] = [
+    Stage("plot", PlotFlow, provides=("settings", "Plot"), priority=INTERACTIVE),
+    Stage("briefing", BriefingFlow, requires=("Plot",), provides=("BriefingInputs", "Briefing"), priority=INTERACTIVE),
+    Stage("crime", CrimeFlow, requires=("Plot",), provides=("CrimeInputs", "ExecutionPlan", "CoverupPlan")),
+    Stage(
+        "solution",
+        SolutionFlow,
+        requires=("Plot", "ExecutionPlan", "CoverupPlan"),
+        provides=("Solution",),
+    ),
+    Stage(
+        "narrative",
+        NarrativeFlow,
+        requires=("Plot", "ExecutionPlan", "CoverupPlan", "Solution"),
+        provides=("SuspectDossiers", "ClueManifest", "MasterTimeline", "Narrative"),
+    ),
+]
+
+# Case store artifact of each state field, as written by the flows.
+STATE_ARTIFACTS: Dict[str, str] = {
+    "settings": "Settings.json",
+    "Plot": "Plot.json",
+    "Briefing": "Briefing.json",
+    "ExecutionPlan": "Execution_plan.json",
+    "CoverupPlan": "Coverup_plan.json",
+    "Solution": "Solution.json",
+    "SuspectDossiers": "Suspect_dossiers.json",
+    "ClueManifest": "Clue_manifest.json",
+    "MasterTimeline": "Master_timeline.json",
+    "Narrative": "Narrative.json",
+}
+
+# Pipelines that outlived the request that started them; kept referenced until done.
+_background: Set["asyncio.Task[States]"] = set()
+
+logger = get_logger(__name__)
+
+
+def running_pipelines() -> int:
+    """Number of pipelines currently running in this process."""
+    return len(_background)
+
+
+class StageScheduler:
+    """Runs pipeline stages as a dependency graph over their declared inputs.
+
+    A stage starts as soon as every stage providing one of its ``requires``
+    fields has finished, so independent branches (briefing and crime after the
+    plot) run concurrently. All stages share one ``States`` object; each stage
+    only writes back the fields it ``provides``.
+
+    Stage and crew task progress is emitted on ``reporter``. With
+    ``use_llm_cache=False`` every LLM call of the case bypasses the response cache.
+    LLM calls are rate limited at their stage's priority, or at ``priority``
+    for every stage when it is given (background jobs, story pool warming).
+
+    Every finished stage is checkpointed under the hash of its inputs (see
+    ``synapse.utils.checkpoints``). Running a scheduler again for the same
+    case restores the stages whose inputs are unchanged instead of running
+    them, so a failed or cancelled pipeline resumes at the first stage that
+    did not finish. Checkpoints are dropped once the whole pipeline completes.
+
+    The case store stays open (pinned) while the pipeline runs, so the
+    store registry never evicts a case that is still being written.
+
+    Stage statuses are published to the shared state backend (namespace
+    ``progress``) on every change, so any API worker can report them.
+
+    The pipeline and each stage it runs are traced as spans, and stage
+    outcomes and latencies are recorded in ``synapse.utils.metrics``.
+    """
+
+    def __init__(
+        self,
+        store: CaseStore,
+        state: States,
+        stages: Optional[Sequence[Stage]] = None,
+        reporter: Optional[ProgressReporter] = None,
+        use_llm_cache: bool = True,
+        priority: Optional[int] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+    ) -> None:
+        self.store = store
+        self.state = state
+        self.reporter = reporter or ProgressReporter(store.case_id)
+        self.use_llm_cache = use_llm_cache
+        self.priority = priority
+        checkpoints = checkpoints or get_checkpoint_store()
+        self.checkpoints = checkpoints.for_case(store.case_id) if checkpoints is not None else None
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in (stages or STAGES)}
+        self.dependencies: Dict[str, List[str]] = self._resolve_dependencies()
+        self.stage_status: Dict[str, str] = {name: "pending" for name in self.stages}
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._pipeline: Optional["asyncio.Task[States]"] = None
+
+    def _resolve_dependencies(self) -> Dict[str, List[str]]:
+        providers: Dict[str, str] = {}
+        for stage in self.stages.values():
+            for field in stage.provides:
+                providers[field] = stage.name
+
+        dependencies: Dict[str, List[str]] = {}
+        for stage in self.stages.values():
+            missing = [field for field in stage.requires if field not in providers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' requires {missing}, which no stage provides")
+            dependencies[stage.name] = sorted({providers[field] for field in stage.requires})
+        return dependencies
+
+    async def _run_stage(self, name: str) -> None:
+        try:
+            await asyncio.gather(*(self._tasks[dep] for dep in self.dependencies[name]))
+        except asyncio.CancelledError:
+            self._set_status(name, "cancelled")
+            raise
+        except Exception:
+            self._set_status(name, "skipped")
+            raise
+        stage = self.stages[name]
+        inputs = input_hash(
+            {"stage": name, **self.state.model_dump(mode="json", include={"settings", *stage.requires})}
+        )
+        if self.checkpoints is not None and await self._restore(stage, inputs):
+            return
+        # Each stage runs in its own task context, inherited by its crew worker threads.
+        current_reporter.set(self.reporter)
+        current_stage.set(name)
+        current_checkpoints.set(self.checkpoints)
+        llm_cache_enabled.set(self.use_llm_cache)
+        llm_priority.set(stage.priority if self.priority is None else self.priority)
+        started = time.perf_counter()
+        with span("stage", stage=name, case_id=self.store.case_id) as current:
+            # crewAI flows build their state model and tracing setup in __init__; keep that off the loop.
+            flow = await run_blocking(stage.flow, store=self.store)
+            try:
+                self._set_status(name, "running")
+                self.reporter.emit("stage_started", stage=name)
+                result = await flow.run(self.state)
+            except asyncio.CancelledError:
+                self._set_status(name, "cancelled")
+                end_spans(flow, "cancelled")
+                self._observe(name, "cancelled", started)
+                current.set_attribute("status", "cancelled")
+                raise
+            except Exception as e:
+                self._set_status(name, "failed")
+                self._observe(name, "failed", started)
+                self.reporter.emit("stage_failed", stage=name, duration=round(time.perf_counter() - started, 3), error=str(e))
+                raise
+            for field in stage.provides:
+                setattr(self.state, field, getattr(result, field))
+            if self.checkpoints is not None:
+                outputs = self.state.model_dump(mode="json", include=set(stage.provides))
+                await run_blocking(self.checkpoints.save_stage, name, inputs, outputs)
+            self._set_status(name, "completed")
+            self._observe(name, "completed", started)
+        self.reporter.emit(
+            "stage_completed",
+            stage=name,
+            duration=round(time.perf_counter() - started, 3),
+            artifact=result.model_dump(mode="json", include={field for field in stage.provides if field != "settings"}),
+        )
+
+    def _set_status(self, name: str, status: str) -> None:
+        self.stage_status[name] = status
+        self._publish_progress("running")
+
+    def _publish_progress(self, status: str) -> None:
+        """Share the pipeline and stage statuses with the other API workers through the state backend."""
+        get_state().set_behind(
+            "progress", self.store.case_id, {"status": status, "stages": dict(self.stage_status), "updated": time.time()}
+        )
+
+    @staticmethod
+    def _observe(name: str, status: str, started: float) -> None:
+        stage_runs.inc(stage=name, status=status)
+        stage_latency.observe(time.perf_counter() - started, stage=name, status=status)
+
+    async def _restore(self, stage: Stage, inputs: str) -> bool:
+        """Fill in the outputs of ``stage`` from its checkpoint, if it has one for these inputs."""
+        outputs = await run_blocking(self.checkpoints.load_stage, stage.name, inputs)
+        if outputs is None:
+            return False
+        for field, value in outputs.items():
+            setattr(self.state, field, value)
+            # The case store may have been evicted or restarted since the checkpoint was taken.
+            artifact = STATE_ARTIFACTS.get(field)
+            if artifact is not None and value and not await self.store.exists_async(artifact):
+                await self.store.write_async(artifact, value)
+        self._set_status(stage.name, "completed")
+        stage_runs.inc(stage=stage.name, status="restored")
+        add_event("stage_restored", stage=stage.name)
+        self.reporter.emit(
+            "stage_completed",
+            stage=stage.name,
+            duration=0.0,
+            restored=True,
+            artifact={field: value for field, value in outputs.items() if field != "settings"},
+        )
+        return True
+
+    async def _run_all(self) -> States:
+        await self.store.write_async("Settings.json", self.state.settings.model_dump())
+        results = await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return self.state
+
+    def start(self) -> "asyncio.Task[States]":
+        """Schedule every stage and return the task completing with the final state."""
+        if self._pipeline is None:
+            # Stage tasks copy the current context, so their spans nest under the pipeline span.
+            self._span = tracer.start_span("pipeline", attributes={"case_id": self.store.case_id})
+            with trace.use_span(self._span, end_on_exit=False):
+                for name in self.stages:
+                    self._tasks[name] = asyncio.create_task(self._run_stage(name), name=f"{self.store.case_id}:{name}")
+            pin_case_store(self.store.case_id)
+            self._pipeline = asyncio.create_task(self._run_all())
+            _background.add(self._pipeline)
+            self._pipeline.add_done_callback(self._finished)
+        return self._pipeline
+
+    def _finished(self, pipeline: "asyncio.Task[States]") -> None:
+        _background.discard(pipeline)
+        unpin_case_store(self.store.case_id)
+        status = "cancelled" if pipeline.cancelled() else ("failed" if pipeline.exception() else "completed")
+        self.reporter.emit("pipeline_finished", status=status, stages=dict(self.stage_status))
+        self._publish_progress(status)
+        self._span.set_attribute("status", status)
+        if status == "failed":
+            self._span.set_status(Status(StatusCode.ERROR, str(pipeline.exception())))
+        self._span.end()
+        if status == "completed" and self.checkpoints is not None:
+            io_executor.submit(self.checkpoints.clear)
+        self.reporter.close()
+        if not pipeline.cancelled() and pipeline.exception() is not None:
+            logger.error("Pipeline for case %s failed: %r", self.store.case_id, pipeline.exception())
+
+    async def wait_for(self, name: str) -> States:
+        """Wait until stage ``name`` (and everything it depends on) has finished."""
+        self.start()
+        await asyncio.shield(self._tasks[name])
+        return self.state
+
+    async def run(self) -> States:
+        """Run the whole graph to completion."""
+        return await asyncio.shield(self.start())
+
+    def cancel(self) -> None:
+        """Cancel every stage that has not finished yet, including LLM work already in flight."""
+        self.reporter.cancel()
+        for task in self._tasks.values():
+            task.cancel()
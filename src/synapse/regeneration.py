@@ -0,0 +1,210 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Type
+
+from synapse.main import BriefingFlow, CaseFlow, CrimeFlow, NarrativeFlow, PlotFlow, SolutionFlow, States
+from synapse.pipeline import STATE_ARTIFACTS
+from synapse.utils.case_store import CaseStore, open_case_store
+from synapse.utils.checkpoints import current_checkpoints
+from synapse.utils.executor import run_blocking
+from synapse.utils.llm_cache import llm_cache_enabled
+from synapse.utils.logging_config import get_logger
+from synapse.utils.metrics import registry
+from synapse.utils.progress import ProgressReporter, current_reporter, current_stage
+from synapse.utils.rate_limiter import INTERACTIVE, llm_priority
+from synapse.utils.state import get_state
+
+logger = get_logger(__name__)
+
+regenerations = registry.counter(
+    "synapse_regenerations_total", "Partial re-generations of stored cases.", ("artifact", "status")
+)
+
+
+class Artifact(NamedTuple):
+    name: str
+    flow: Type[CaseFlow]
+    # State fields the artifact fills in; the first one tells whether it exists.
+    fields: Tuple[str, ...]
+    # Artifacts it is built from.
+    requires: Tuple[str, ...] = ()
+    # Flow method building just this artifact; None runs the whole flow.
+    build: Optional[str] = None
+    # Flow method rewriting one entry of the artifact by ID, keeping the ID.
+    build_item: Optional[str] = None
+    # Built locally from other artifacts, without LLM calls.
+    local: bool = False
+
+
+# The artifact dependency graph, in build order.
+ARTIFACTS: Dict[str, Artifact] = {
+    artifact.name: artifact
+    for artifact in (
+        Artifact("plot", PlotFlow, ("Plot", "settings")),
+        Artifact("briefing", BriefingFlow, ("Briefing", "BriefingInputs"), ("plot",)),
+        Artifact("crime", CrimeFlow, ("ExecutionPlan", "CoverupPlan", "CrimeInputs"), ("plot",)),
+        Artifact("solution", SolutionFlow, ("Solution",), ("plot", "crime")),
+        Artifact(
+            "dossiers", NarrativeFlow, ("SuspectDossiers",), ("plot", "crime", "solution"),
+            build="generate_Dossiers", build_item="generate_Dossier",
+        ),
+        Artifact("clues", NarrativeFlow, ("ClueManifest",), ("solution", "dossiers"), build="generate_Clues", build_item="generate_Clue"),
+        Artifact("timeline", NarrativeFlow, ("MasterTimeline",), ("plot", "crime", "dossiers", "clues"), build="generate_Timeline"),
+        Artifact("casefile", NarrativeFlow, ("Narrative",), ("dossiers", "clues", "timeline"), build="merge_Narrative", local=True),
+    )
+}
+
+# Artifact of each state field, for naming what a consistency repair re-generated.
+FIELD_ARTIFACTS = {field: artifact.name for artifact in ARTIFACTS.values() for field in artifact.fields}
+
+
+class RegenerationError(Exception):
+    """Raised when a regeneration cannot start; ``status`` is the HTTP status the API answers with."""
+
+    def __init__(self, message: str, status: int = 409) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def dependents(name: str) -> List[str]:
+    """``name`` and every artifact built from it, directly or not, in build order."""
+    affected = {name}
+    for artifact in ARTIFACTS.values():
+        if affected & set(artifact.requires):
+            affected.add(artifact.name)
+    return [artifact for artifact in ARTIFACTS if artifact in affected]
+
+
+async def load_state(store: CaseStore) -> States:
+    """Pipeline state of a stored case, with every artifact the store has."""
+    state = States(case_id=store.case_id)
+    for field, name in STATE_ARTIFACTS.items():
+        try:
+            setattr(state, field, await store.read_async(name))
+        except FileNotFoundError:
+            continue
+    return state
+
+
+def _exists(state: States, artifact: Artifact) -> bool:
+    return bool(getattr(state, artifact.fields[0]))
+
+
+class Regenerator:
+    """Rebuilds one artifact of a stored case and what depends on it, reusing everything else.
+
+    ``regenerate("clues")`` rebuilds the clue manifest, the timeline and the
+    case file from the stored plot, crime, solution and dossiers: two LLM
+    calls instead of a pipeline. With ``item``, only that suspect
+    (``characterID``) or clue (``clueID``) is rewritten under the same ID, so
+    the artifacts referencing it stay valid and are kept; the consistency
+    checks re-generate any of them that no longer fit, and local artifacts
+    (the case file) are rebuilt. Regenerations of one case run one at a time
+    and never while its pipeline is running.
+    """
+
+    def __init__(self) -> None:
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def plan(self, artifact: str, item: Optional[str] = None) -> List[str]:
+        """Artifacts rebuilt by a regeneration of ``artifact`` (or of one ``item`` of it), in build order."""
+        if item is None:
+            return dependents(artifact)
+        return [artifact, *(name for name in dependents(artifact)[1:] if ARTIFACTS[name].local)]
+
+    async def regenerate(self, case_id: str, artifact: str, item: Optional[str] = None) -> Dict[str, Any]:
+        spec = ARTIFACTS.get(artifact)
+        if spec is None:
+            raise RegenerationError(f"Unknown artifact '{artifact}'. Expected one of {list(ARTIFACTS)}.", status=404)
+        if item is not None and spec.build_item is None:
+            raise RegenerationError(f"Single entries of '{artifact}' cannot be regenerated.", status=422)
+        lock = self._locks.get(case_id)
+        if lock is None:
+            lock = self._locks[case_id] = asyncio.Lock()
+        async with lock:
+            progress = await get_state().get_async("progress", case_id)
+            if progress is not None and progress["status"] == "running":
+                raise RegenerationError(f"Case {case_id} is still being generated.")
+            store = open_case_store(case_id)
+            state = await load_state(store)
+            if not state.settings.location:
+                raise RegenerationError(f"Unknown case: {case_id}", status=404)
+            needed = [*spec.requires, artifact] if item is not None else list(spec.requires)
+            missing = [name for name in needed if not _exists(state, ARTIFACTS[name])]
+            if missing:
+                raise RegenerationError(f"Case {case_id} has no {missing} to regenerate '{artifact}' from.")
+
+            plan = self.plan(artifact, item)
+            started = time.perf_counter()
+            try:
+                rebuilt = await asyncio.create_task(self._rebuild(store, state, plan, item))
+            except BaseException:
+                regenerations.inc(artifact=artifact, status="failed")
+                raise
+            regenerations.inc(artifact=artifact, status="completed")
+            logger.info("Regenerated %s of case %s: %s", artifact, case_id, rebuilt)
+            return {
+                "case_id": case_id,
+                "artifact": artifact,
+                "item": item,
+                "rebuilt": rebuilt,
+                "reused": [name for name, other in ARTIFACTS.items() if name not in rebuilt and _exists(state, other)],
+                "duration": round(time.perf_counter() - started, 3),
+            }
+
+    async def _rebuild(self, store: CaseStore, state: States, plan: List[str], item: Optional[str]) -> List[str]:
+        # Runs in its own task: the context set here reaches the crew worker threads and nothing else.
+        current_reporter.set(ProgressReporter(store.case_id))
+        llm_priority.set(INTERACTIVE)
+        # Regenerating asks for a new answer, not the cached or checkpointed one.
+        llm_cache_enabled.set(False)
+        current_checkpoints.set(None)
+
+        flows: Dict[Type[CaseFlow], CaseFlow] = {}
+        rebuilt: List[str] = []
+        # Flows rebuilt piecemeal are checked once at the end, when all their pieces are in place.
+        unchecked: Set[Type[CaseFlow]] = set()
+        for name in plan:
+            spec = ARTIFACTS[name]
+            if spec.local and unchecked:
+                for flow_type in list(unchecked):
+                    rebuilt += [FIELD_ARTIFACTS[field] for field in await self._check(flows[flow_type], state)]
+                unchecked.clear()
+            current_stage.set(name)
+            if spec.build is None:
+                flow = await run_blocking(spec.flow, store=store)
+                result = await flow.run(state)
+                for field in spec.fields:
+                    setattr(state, field, getattr(result, field))
+            else:
+                flow = flows.get(spec.flow) or await run_blocking(spec.flow, store=store)
+                flows[spec.flow] = flow
+                for field in States.model_fields:
+                    setattr(flow.state, field, getattr(state, field))
+                if name == plan[0] and item is not None:
+                    try:
+                        await getattr(flow, spec.build_item)(item)
+                    except KeyError:
+                        raise RegenerationError(f"'{name}' of case {store.case_id} has no entry {item}", status=404)
+                else:
+                    await getattr(flow, spec.build)()
+                for field in spec.fields:
+                    setattr(state, field, getattr(flow.state, field))
+                if not spec.local:
+                    unchecked.add(spec.flow)
+            rebuilt.append(name)
+        for flow_type in unchecked:
+            rebuilt += [FIELD_ARTIFACTS[field] for field in await self._check(flows[flow_type], state)]
+        return [name for name in ARTIFACTS if name in rebuilt]
+
+    @staticmethod
+    async def _check(flow: CaseFlow, state: States) -> Set[str]:
+        """Run the flow's consistency checks and repairs; returns the state fields it re-generated."""
+        repaired = await flow.ensure_consistent()
+        for field in States.model_fields:
+            setattr(state, field, getattr(flow.state, field))
+        return repaired
+
+
+regenerator = Regenerator()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from synapse.main import Settings, States
+from synapse.pipeline import StageScheduler, running_pipelines
+from synapse.utils.case_store import InMemoryCaseStore, new_case_id, open_case_store
+from synapse.utils.executor import run_blocking
+from synapse.utils.logging_config import get_logger
+from synapse.utils.rate_limiter import PREFETCH
+
+logger = get_logger(__name__)
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+
+class StoryPool:
+    """Keeps finished cases ready for common settings so requests can skip generation.
+
+    Cases are bucketed by (location, crimeType); the plot stage draws the
+    region of every case at random, as it does for live requests. A background warmer
+    generates cases through the regular pipeline whenever no other pipeline is
+    running, until every bucket holds ``size`` cases. Finished cases are kept
+    in SQLite, so the pool survives restarts. ``take()`` hands out a case and
+    wakes the warmer to refill its bucket.
+    """
+
+    def __init__(
+        self,
+        buckets: List[Settings],
+        size: int = 2,
+        path: str = "story_pool.sqlite3",
+        idle_check: float = 5.0,
+    ) -> None:
+        self.buckets = buckets
+        self.size = size
+        self.idle_check = idle_check
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS story_pool ("
+                "case_id TEXT PRIMARY KEY, bucket TEXT NOT NULL, state TEXT NOT NULL, "
+                "artifacts TEXT NOT NULL, created REAL NOT NULL)"
+            )
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._warmer: Optional["asyncio.Task[None]"] = None
+
+    @staticmethod
+    def bucket_key(location: str, crime_type: str) -> str:
+        return json.dumps([_normalize(location), _normalize(crime_type)])
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT bucket, COUNT(*) FROM story_pool GROUP BY bucket").fetchall()
+        return dict(rows)
+
+    def put(self, state: States, artifacts: Dict[str, object]) -> None:
+        settings = state.settings
+        bucket = self.bucket_key(settings.location, settings.crimeType)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO story_pool (case_id, bucket, state, artifacts, created) VALUES (?, ?, ?, ?, ?)",
+                (state.case_id, bucket, state.model_dump_json(), json.dumps(artifacts), time.time()),
+            )
+
+    def take(self, settings: Settings) -> Optional[States]:
+        """Remove and return a finished case matching ``settings``, or None on a miss.
+
+        The case's artifacts are copied into its case store.
+        """
+        bucket = self.bucket_key(settings.location, settings.crimeType)
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT case_id, state, artifacts FROM story_pool WHERE bucket = ?", (bucket,)
+            ).fetchall()
+            if not rows:
+                return None
+            case_id, state, artifacts = random.choice(rows)
+            self._connection.execute("DELETE FROM story_pool WHERE case_id = ?", (case_id,))
+
+        store = open_case_store(case_id)
+        for name, data in json.loads(artifacts).items():
+            store.write(name, data)
+        if self._wakeup is not None:
+            # take() may run in a worker thread; asyncio events are not thread-safe.
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return States.model_validate_json(state)
+
+    def _next_bucket(self) -> Optional[Settings]:
+        """The configured bucket with the fewest cases, if any is below ``size``."""
+        counts = self.counts()
+        missing: List[Tuple[int, Settings]] = []
+        for settings in self.buckets:
+            count = counts.get(self.bucket_key(settings.location, settings.crimeType), 0)
+            if count < self.size:
+                missing.append((count, settings))
+        return min(missing, key=lambda item: item[0])[1] if missing else None
+
+    async def generate(self, settings: Settings) -> None:
+        """Generate one case for ``settings`` through the regular pipeline and add it to the pool."""
+        case_id = new_case_id()
+        store = InMemoryCaseStore(case_id)
+        scheduler = StageScheduler(store, States(settings=settings.model_copy(), case_id=case_id), priority=PREFETCH)
+        state = await scheduler.run()
+        await run_blocking(self.put, state, store.snapshot())
+
+    async def _warm(self) -> None:
+        while True:
+            settings = self._next_bucket()
+            if settings is None:
+                # Every bucket is full; sleep until a request takes a case.
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if running_pipelines():
+                # Live requests have priority; retry once they are done.
+                await asyncio.sleep(self.idle_check)
+                continue
+            try:
+                await self.generate(settings)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Story pool: generating a case for %s failed: %r", settings.model_dump(), e)
+                await asyncio.sleep(self.idle_check)
+
+    def start(self) -> None:
+        """Start the background warmer on the running event loop."""
+        if self._warmer is None or self._warmer.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._warmer = asyncio.create_task(self._warm())
+
+    async def stop(self) -> None:
+        if self._warmer is not None:
+            self._warmer.cancel()
+            await asyncio.gather(self._warmer, return_exceptions=True)
+            self._warmer = None
+
+
+def _configured_buckets() -> List[Settings]:
+    # SYNAPSE_POOL_SETTINGS: JSON list of {"location", "crimeType"}, one bucket each.
+    return [
+        Settings(location=entry["location"], crimeType=entry["crimeType"])
+        for entry in json.loads(os.getenv("SYNAPSE_POOL_SETTINGS", "[]"))
+    ]
+
+
+def _create_story_pool() -> Optional[StoryPool]:
+    size = int(os.getenv("SYNAPSE_POOL_SIZE", "0"))
+    buckets = _configured_buckets()
+    if size <= 0 or not buckets:
+        return None
+    return StoryPool(
+        buckets=buckets,
+        size=size,
+        path=os.getenv("SYNAPSE_POOL_PATH", "story_pool.sqlite3"),
+        idle_check=float(os.getenv("SYNAPSE_POOL_IDLE_SECONDS", "5")),
+    )
+
+
+# None unless SYNAPSE_POOL_SIZE and SYNAPSE_POOL_SETTINGS are set.
+story_pool = _create_story_pool()
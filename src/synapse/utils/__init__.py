@@ -1,4 +1,9 @@
 from .json_cleaner import JSONCleaner
 from .json_extractor import JSONExtractor
+from .case_store import CaseStore, InMemoryCaseStore, DirectoryCaseStore, open_case_store
+from .llm_cache import LLMCache, MemoryLLMCache, SQLiteLLMCache, get_llm_cache
 
-__all__ = ['JSONCleaner', 'JSONExtractor']
+__all__ = [
+    'JSONCleaner', 'JSONExtractor', 'CaseStore', 'InMemoryCaseStore', 'DirectoryCaseStore', 'open_case_store',
+    'LLMCache', 'MemoryLLMCache', 'SQLiteLLMCache', 'get_llm_cache',
+]
@@ -0,0 +1,113 @@
+import json
+import os
+import typing
+from typing import Any, Callable, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from synapse.utils.json_scanner import JSONScanner
+
+M = TypeVar("M", bound=BaseModel)
+
+# How many times a crew task is re-asked after its output failed validation.
+ARTIFACT_REASKS = int(os.getenv("SYNAPSE_ARTIFACT_REASKS", "1"))
+
+
+class ArtifactValidationError(ValueError):
+    """Raised when an LLM output cannot be turned into its artifact model, even after repair."""
+
+
+def _coerce(annotation: Any, value: Any) -> Any:
+    """Fix common shape slips of LLM output for ``annotation`` without changing any content."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        if value is None:
+            return value
+        return _coerce(next(arg for arg in args if arg is not type(None)), value)
+    if origin in (list, typing.List):
+        if isinstance(value, dict):
+            value = [value]
+        return [_coerce(args[0], item) for item in value] if isinstance(value, list) else value
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _repair_fields(annotation, value)
+    if annotation is str:
+        if value is None:
+            return ""
+        if isinstance(value, (int, float, bool)):
+            return str(value)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return " ".join(value)
+    return value
+
+
+def _repair_fields(model: Type[BaseModel], data: Any) -> Any:
+    fields = model.model_fields
+    if isinstance(data, list) and len(fields) == 1:
+        # A bare list for a model wrapping a single list, e.g. ClueManifest.
+        data = {next(iter(fields)): data}
+    if not isinstance(data, dict):
+        return data
+    if len(fields) == 1:
+        name = next(iter(fields))
+        if name not in data:
+            # Single-field wrapper models: add a missing wrapper key, or replace a misnamed one.
+            data = {name: next(iter(data.values()))} if len(data) == 1 else {name: data}
+    elif len(data) == 1 and not set(data) & set(fields):
+        # The whole object nested under an unexpected key, e.g. {"output": {...}}.
+        inner = next(iter(data.values()))
+        if isinstance(inner, dict) and set(inner) & set(fields):
+            data = inner
+    return {
+        key: _coerce(fields[key].annotation, value) if key in fields else value
+        for key, value in data.items()
+    }
+
+
+def repair_artifact(model: Type[M], data: Any) -> Any:
+    """Cheap local repair of parsed LLM output before validating it against ``model``."""
+    return _repair_fields(model, data)
+
+
+def describe_errors(error: ValidationError, limit: int = 8) -> str:
+    lines = [f"{'.'.join(str(part) for part in item['loc']) or '<root>'}: {item['msg']}" for item in error.errors()[:limit]]
+    return "; ".join(lines)
+
+
+def validate_artifact(model: Type[M], output: Any) -> M:
+    """Turn raw LLM output (text or parsed JSON) into ``model``, repairing small slips locally.
+
+    Raises ArtifactValidationError if the output holds no JSON or does not fit the model.
+    """
+    if isinstance(output, model):
+        return output
+    try:
+        data = JSONScanner.parse(output) if isinstance(output, str) else output
+    except ValueError as e:
+        raise ArtifactValidationError(f"{model.__name__}: {e}") from e
+    try:
+        return model.model_validate(data)
+    except ValidationError:
+        pass
+    try:
+        return model.model_validate(repair_artifact(model, data))
+    except ValidationError as e:
+        raise ArtifactValidationError(f"{model.__name__} is invalid: {describe_errors(e)}") from e
+
+
+def artifact_guardrail(model: Type[BaseModel]) -> Callable[[Any], Tuple[bool, Any]]:
+    """crewAI task guardrail validating the task output against ``model``.
+
+    Valid (or locally repaired) output replaces the raw task output as compact
+    JSON. Otherwise the error is returned so crewAI re-asks only this task, at
+    most ``guardrail_max_retries`` times (set it to ``ARTIFACT_REASKS``).
+    """
+
+    def guardrail(output: Any) -> Tuple[bool, Any]:
+        try:
+            artifact = validate_artifact(model, output.json_dict or output.raw)
+        except ArtifactValidationError as e:
+            return False, f"{e}. Answer with JSON only, matching the expected output exactly."
+        return True, json.dumps(artifact.model_dump(mode="json"))
+
+    return guardrail
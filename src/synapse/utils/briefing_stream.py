@@ -0,0 +1,120 @@
+import json
+from typing import Callable, List, Optional
+
+import regex as re
+
+# A sentence ends at a period followed by whitespace, unless the period closes a title.
+SENTENCE_BREAK = re.compile(r'(?<!\b(?:Dr|Mr|Mrs|Ms|St|Prof))\.\s+')
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class PartialJSONString:
+    """Incrementally decodes the string value of one key from a growing JSON text.
+
+    Feed raw LLM output chunks as they arrive; each call returns the newly
+    decoded part of the value. Anything before the key (e.g. a "Thought:"
+    preamble) and after the closing quote is ignored.
+    """
+
+    def __init__(self, key: str) -> None:
+        self._pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._position: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if self._position is None:
+            match = self._pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._position = match.end()
+
+        decoded: List[str] = []
+        text, i = self._buffer, self._position
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest of it if it is split across chunks.
+            if i + 1 >= len(text):
+                break
+            code = text[i + 1]
+            if code == 'u':
+                if i + 6 > len(text):
+                    break
+                decoded.append(json.loads('"' + text[i:i + 6] + '"'))
+                i += 6
+            else:
+                decoded.append(_ESCAPES.get(code, code))
+                i += 2
+        self._position = i
+        return "".join(decoded)
+
+
+class SentenceSegmenter:
+    """Splits text into sentences as it grows, with the same rules as the batch briefing split."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return every sentence completed by it."""
+        self._buffer += text
+        sentences: List[str] = []
+        while True:
+            match = SENTENCE_BREAK.search(self._buffer)
+            if not match:
+                break
+            sentence = self._buffer[:match.start()].strip()
+            self._buffer = self._buffer[match.end():]
+            if sentence:
+                sentences.append(sentence + ".")
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return the trailing sentence, which keeps its own final punctuation."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class BriefingStreamer:
+    """Turns streamed briefing tokens into sentence segments as soon as each sentence is complete.
+
+    ``on_sentence`` is called with the sentence index and text. Only the first
+    occurrence of the key is used, so a later re-ask or format conversion of the
+    same task does not repeat segments.
+    """
+
+    def __init__(self, on_sentence: Callable[[int, str], None], key: str = "CrimeSceneInvestigator") -> None:
+        self.on_sentence = on_sentence
+        self._value = PartialJSONString(key)
+        self._segmenter = SentenceSegmenter()
+        self._count = 0
+        self._flushed = False
+
+    def _publish(self, sentences: List[str]) -> None:
+        for sentence in sentences:
+            self.on_sentence(self._count, sentence)
+            self._count += 1
+
+    def feed(self, chunk: str) -> None:
+        if self._flushed:
+            return
+        self._publish(self._segmenter.feed(self._value.feed(chunk)))
+        if self._value.done:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._flushed:
+            self._flushed = True
+            self._publish(self._segmenter.flush())
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from synapse.utils.executor import run_blocking
+from synapse.utils.json_cleaner import JSONCleaner
+from synapse.utils.state import StateBackend, get_state, state_backend_name
+
+
+class CaseStore:
+    """In-memory store for the parsed JSON artifacts of a single case.
+
+    Every story generated by the flows gets its own case ID, and all artifacts
+    (``Plot.json``, ``Coverup_plan.json``, ...) are kept in the store bound to
+    that case instead of fixed files in the process CWD. Artifacts are held as
+    parsed JSON values, so reading one back never re-parses text. Subclasses add
+    persistent sinks on top of the in-memory map.
+    """
+
+    # Whether reads and writes may touch disk; async callers then run them off the event loop.
+    blocking = False
+
+    def __init__(self, case_id: str) -> None:
+        self.case_id: str = case_id
+        self._artifacts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def read(self, name: str) -> Any:
+        """Return the parsed artifact. Raises FileNotFoundError if missing."""
+        with self._lock:
+            if name not in self._artifacts:
+                raise FileNotFoundError(f"{name} not found for case '{self.case_id}'")
+            return self._artifacts[name]
+
+    def write(self, name: str, data: Any) -> None:
+        """Create or replace an artifact."""
+        with self._lock:
+            self._artifacts[name] = data
+            self._version += 1
+
+    def _remember(self, name: str, data: Any) -> None:
+        """Cache an artifact read from a persistent sink; it did not change, so the version stays."""
+        with self._lock:
+            self._artifacts[name] = data
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._artifacts
+
+    @property
+    def version(self) -> int:
+        """Bumped by every write, so views derived from the artifacts can be cached against it."""
+        return self._version
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every artifact held in memory, keyed by name."""
+        with self._lock:
+            return dict(self._artifacts)
+
+    async def read_async(self, name: str) -> Any:
+        """``read()`` for coroutines: runs in the I/O pool when the store is blocking."""
+        if self.blocking:
+            return await run_blocking(self.read, name)
+        return self.read(name)
+
+    async def exists_async(self, name: str) -> bool:
+        """``exists()`` for coroutines: runs in the I/O pool when the store is blocking."""
+        if self.blocking:
+            return await run_blocking(self.exists, name)
+        return self.exists(name)
+
+    async def version_async(self) -> int:
+        if self.blocking:
+            return await run_blocking(lambda: self.version)
+        return self.version
+
+    async def write_async(self, name: str, data: Any) -> None:
+        """``write()`` for coroutines: runs in the I/O pool when the store is blocking."""
+        if self.blocking:
+            await run_blocking(self.write, name, data)
+        else:
+            self.write(name, data)
+
+
+class InMemoryCaseStore(CaseStore):
+    """Keeps the artifacts of a case in process memory only."""
+
+
+class DirectoryCaseStore(CaseStore):
+    """Writes the artifacts of a case through to JSON files in ``<root>/<case_id>/``.
+
+    Reads are served from memory; files are only parsed for artifacts this
+    process has not written itself (e.g. when a flow runs standalone).
+    """
+
+    blocking = True
+
+    def __init__(self, case_id: str, root: str = "cases") -> None:
+        super().__init__(case_id)
+        self.directory: Path = Path(root) / case_id
+
+    def read(self, name: str) -> Any:
+        try:
+            return super().read(name)
+        except FileNotFoundError:
+            with open(self.directory / name, "r") as f:
+                data = JSONCleaner.parse_json_content(f.read())
+            self._remember(name, data)
+            return data
+
+    def write(self, name: str, data: Any) -> None:
+        super().write(name, data)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / name, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def exists(self, name: str) -> bool:
+        return super().exists(name) or (self.directory / name).is_file()
+
+
+class SharedCaseStore(CaseStore):
+    """Keeps the artifacts of a case in the shared state backend, so every API worker sees them.
+
+    Artifacts are cached in memory after the first read and dropped as soon
+    as the case's write counter in the backend moves, i.e. once any worker
+    wrote to the case.
+    """
+
+    def __init__(self, case_id: str, state: StateBackend) -> None:
+        super().__init__(case_id)
+        self.state = state
+        self.blocking = state.blocking
+        self._namespace = f"case:{case_id}"
+        self._synced = 0
+
+    @property
+    def version(self) -> int:
+        return self.state.get("case_versions", self.case_id) or 0
+
+    def _sync(self) -> None:
+        version = self.version
+        with self._lock:
+            if version != self._synced:
+                self._artifacts.clear()
+                self._synced = version
+
+    def read(self, name: str) -> Any:
+        self._sync()
+        try:
+            return super().read(name)
+        except FileNotFoundError:
+            data = self.state.get(self._namespace, name)
+            if data is None:
+                raise
+        self._remember(name, data)
+        return data
+
+    def write(self, name: str, data: Any) -> None:
+        self.state.set(self._namespace, name, data)
+        version = self.state.incr("case_versions", self.case_id)
+        with self._lock:
+            if version != self._synced + 1:
+                # Another worker wrote in between; its artifacts are not cached here.
+                self._artifacts.clear()
+            self._artifacts[name] = data
+            self._synced = version
+
+    def exists(self, name: str) -> bool:
+        return self.state.get(self._namespace, name) is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: self.read(name) for name in self.state.keys(self._namespace)}
+
+
+def new_case_id() -> str:
+    return uuid.uuid4().hex
+
+
+def default_case_store() -> CaseStore:
+    """Store rooted at the process CWD, matching the original single-case file layout."""
+    return DirectoryCaseStore(case_id="", root=".")
+
+
+# --- Process-wide registry of open case stores ---
+# The backend is selected with SYNAPSE_CASE_STORE ("memory", "directory" or
+# "shared"); directory stores live under SYNAPSE_CASE_DIR, shared stores in
+# the SYNAPSE_STATE backend (the default unless that is "memory"). Only the
+# most recent SYNAPSE_MAX_CASES stores are kept open, not counting the stores
+# of cases a pipeline is still writing to, which stay pinned until it finishes.
+_stores: "OrderedDict[str, CaseStore]" = OrderedDict()
+_pins: Dict[str, int] = {}
+_stores_lock = threading.Lock()
+
+
+def _create_case_store(case_id: str) -> CaseStore:
+    default = "memory" if state_backend_name() == "memory" else "shared"
+    backend = os.getenv("SYNAPSE_CASE_STORE", default).lower()
+    if backend == "shared":
+        return SharedCaseStore(case_id, get_state())
+    if backend == "directory":
+        return DirectoryCaseStore(case_id, root=os.getenv("SYNAPSE_CASE_DIR", "cases"))
+    if backend == "memory":
+        return InMemoryCaseStore(case_id)
+    raise ValueError(f"Unknown case store backend: {backend}")
+
+
+def open_case_store(case_id: Optional[str] = None) -> CaseStore:
+    """Return the store for ``case_id``, creating it (and a new case ID) if needed."""
+    case_id = case_id or new_case_id()
+    max_cases = int(os.getenv("SYNAPSE_MAX_CASES", "128"))
+    with _stores_lock:
+        store = _stores.get(case_id)
+        if store is None:
+            store = _create_case_store(case_id)
+            _stores[case_id] = store
+            # Evict the least recently used stores that no pipeline holds.
+            for old in [old for old in _stores if not _pins.get(old)][: max(0, len(_stores) - max_cases)]:
+                del _stores[old]
+        else:
+            _stores.move_to_end(case_id)
+        return store
+
+
+def pin_case_store(case_id: str) -> None:
+    """Keep the store of ``case_id`` open until a matching ``unpin_case_store()``; pins are counted."""
+    with _stores_lock:
+        _pins[case_id] = _pins.get(case_id, 0) + 1
+
+
+def unpin_case_store(case_id: str) -> None:
+    with _stores_lock:
+        count = _pins.pop(case_id, 0) - 1
+        if count > 0:
+            _pins[case_id] = count
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+def input_hash(data: Any) -> str:
+    """Stable hash of the JSON data a stage or task was run on."""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """Stage and crew task checkpoints of every case, kept in SQLite.
+
+    A stage checkpoint holds the state fields a stage produced, keyed by case
+    ID, stage name and the hash of the stage's inputs. A task checkpoint
+    holds the answer an LLM gave to one crew task prompt, keyed by case ID and
+    the hash of that prompt (see ``SynapseLLM``). A resumed pipeline restores
+    every stage whose inputs are unchanged, and inside the first unfinished
+    stage replays the answers of the tasks that already completed, so work
+    restarts at the first task that did not finish.
+
+    ``path`` defaults to a private in-memory database; point it at a file to
+    resume cases after a restart. Checkpoints older than ``ttl`` seconds, and
+    those of all but the ``max_cases`` most recently checkpointed cases, are
+    dropped at most once a minute. Failed and cancelled cases are never
+    cleared, so the cap is what bounds the store under client disconnects.
+    """
+
+    def __init__(self, path: str = ":memory:", ttl: Optional[float] = None, max_cases: Optional[int] = None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_cases = max_cases
+        self._pruned = 0.0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "case_id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, input_hash TEXT NOT NULL, "
+                "value TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (case_id, kind, name, input_hash))"
+            )
+
+    def load(self, case_id: str, kind: str, name: str, inputs: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM checkpoints WHERE case_id = ? AND kind = ? AND name = ? AND input_hash = ?",
+                (case_id, kind, name, inputs),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, case_id: str, kind: str, name: str, inputs: str, value: Any) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            if (self.ttl or self.max_cases) and now - self._pruned > 60:
+                self._prune(case_id, now)
+                self._pruned = now
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (case_id, kind, name, input_hash, value, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (case_id, kind, name, inputs, json.dumps(value), now),
+            )
+
+    def _prune(self, case_id: str, now: float) -> None:
+        if self.ttl:
+            self._connection.execute("DELETE FROM checkpoints WHERE created < ?", (now - self.ttl,))
+        if self.max_cases:
+            # The case being saved is always kept, along with the max_cases - 1 most recent others.
+            self._connection.execute(
+                "DELETE FROM checkpoints WHERE case_id IN ("
+                "SELECT case_id FROM checkpoints WHERE case_id != ? GROUP BY case_id "
+                "ORDER BY MAX(created) DESC LIMIT -1 OFFSET ?)",
+                (case_id, self.max_cases - 1),
+            )
+
+    def clear(self, case_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM checkpoints WHERE case_id = ?", (case_id,))
+
+    def for_case(self, case_id: str) -> "CaseCheckpoints":
+        return CaseCheckpoints(self, case_id)
+
+
+class CaseCheckpoints:
+    """The checkpoints of one case."""
+
+    def __init__(self, store: CheckpointStore, case_id: str) -> None:
+        self.store = store
+        self.case_id = case_id
+
+    def load_stage(self, name: str, inputs: str) -> Optional[Dict[str, Any]]:
+        return self.store.load(self.case_id, "stage", name, inputs)
+
+    def save_stage(self, name: str, inputs: str, outputs: Dict[str, Any]) -> None:
+        self.store.save(self.case_id, "stage", name, inputs, outputs)
+
+    def load_task(self, name: str, prompt_hash: str) -> Optional[str]:
+        return self.store.load(self.case_id, "task", name, prompt_hash)
+
+    def save_task(self, name: str, prompt_hash: str, answer: str) -> None:
+        self.store.save(self.case_id, "task", name, prompt_hash, answer)
+
+    def clear(self) -> None:
+        self.store.clear(self.case_id)
+
+
+# Checkpoints of the case whose stage runs in the current context; crew worker
+# threads inherit it, so LLM calls can checkpoint and replay task answers.
+current_checkpoints: ContextVar[Optional[CaseCheckpoints]] = ContextVar("current_checkpoints", default=None)
+
+_checkpoints: Optional[CheckpointStore] = None
+_checkpoints_configured = False
+_checkpoints_lock = threading.Lock()
+
+
+def _create_checkpoint_store() -> Optional[CheckpointStore]:
+    backend = os.getenv("SYNAPSE_CHECKPOINTS", "memory").lower()
+    ttl = float(os.getenv("SYNAPSE_CHECKPOINT_TTL", str(7 * 24 * 3600))) or None
+    max_cases = int(os.getenv("SYNAPSE_CHECKPOINT_MAX_CASES", "256")) or None
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return CheckpointStore(":memory:", ttl=ttl, max_cases=max_cases)
+    if backend == "sqlite":
+        return CheckpointStore(path=os.getenv("SYNAPSE_CHECKPOINT_PATH", "checkpoints.sqlite3"), ttl=ttl, max_cases=max_cases)
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Process-wide checkpoint store selected by SYNAPSE_CHECKPOINTS ("memory", "sqlite" or "off")."""
+    global _checkpoints, _checkpoints_configured
+    with _checkpoints_lock:
+        if not _checkpoints_configured:
+            _checkpoints = _create_checkpoint_store()
+            _checkpoints_configured = True
+        return _checkpoints
@@ -0,0 +1,191 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import regex as re
+
+from synapse.utils.artifacts import ArtifactValidationError
+from synapse.utils.metrics import registry
+
+# How many rounds of targeted re-generation a stage gets before an inconsistent case fails it.
+CONSISTENCY_REPAIRS = int(os.getenv("SYNAPSE_CONSISTENCY_REPAIRS", "2"))
+
+consistency_issues = registry.counter(
+    "synapse_consistency_issues_total", "Broken cross-artifact references and orderings found in cases.", ("check",)
+)
+consistency_repairs = registry.counter(
+    "synapse_consistency_repairs_total", "Artifacts re-generated because of consistency issues.", ("artifact",)
+)
+
+# Words that do not identify a person on their own.
+_TITLES = {"mr", "mrs", "ms", "miss", "dr", "prof", "sir", "madam", "the", "and", "von", "van", "de"}
+_WORD = re.compile(r"\p{L}[\p{L}\p{M}'-]*")
+_TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %I:%M %p", "%Y-%m-%d, %I:%M %p", "%Y-%m-%d, %H:%M",
+    "%d %B %Y %H:%M", "%d %B %Y, %H:%M", "%d %B %Y, %I:%M %p", "%B %d, %Y %I:%M %p", "%B %d, %Y, %I:%M %p",
+)
+_TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p")
+# What models write in an ID field that refers to nothing.
+_NO_ID = {"", "none", "null", "n/a", "na", "-"}
+
+
+class InconsistentCaseError(ArtifactValidationError):
+    """Raised when a case still has broken references after its re-generations."""
+
+
+class Issue(NamedTuple):
+    # Name of the check that failed, e.g. "dangling_clue".
+    check: str
+    # State field of the artifact at fault, which gets re-generated.
+    artifact: str
+    message: str
+    # Warnings are reported, and passed on when their artifact is re-generated anyway,
+    # but never cause a re-generation or fail a stage on their own.
+    warning: bool = False
+
+
+def _words(text: Any) -> Set[str]:
+    return {word for word in _WORD.findall(str(text or "").casefold()) if len(word) > 2 and word not in _TITLES}
+
+
+def referenced_ids(value: Optional[str]) -> List[str]:
+    """IDs in a reference field, which may list several ("CM01, CM03") or none ("N/A")."""
+    text = str(value or "").strip()
+    if text.casefold() in _NO_ID:
+        return []
+    return [part for part in re.split(r"[\s,;&]+", text) if part.casefold() not in _NO_ID]
+
+
+def parse_timestamp(value: str) -> Optional[Tuple[bool, datetime]]:
+    """Parse a timeline timestamp; returns (has_date, value), or None for free-form text like "Late evening"."""
+    text = re.sub(r"\s+", " ", str(value or "").strip()).upper().replace(".", "")
+    try:
+        return True, datetime.fromisoformat(text.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for formats, has_date in ((_TIMESTAMP_FORMATS, True), (_TIME_FORMATS, False)):
+        for fmt in formats:
+            try:
+                return has_date, datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+    return None
+
+
+def out_of_order(timestamps: Iterable[str]) -> List[Tuple[str, str]]:
+    """Consecutive pairs of timestamps that go backwards in time.
+
+    Only comparable pairs are checked: two full dates, or two times of day.
+    A time of day going back by more than twelve hours is taken to cross
+    midnight. Timestamps that cannot be parsed are skipped.
+    """
+    pairs: List[Tuple[str, str]] = []
+    previous: Optional[Tuple[str, Tuple[bool, datetime]]] = None
+    for text in timestamps:
+        parsed = parse_timestamp(text)
+        if parsed is None:
+            continue
+        if previous is not None and previous[1][0] == parsed[0]:
+            step = (parsed[1] - previous[1][1]).total_seconds()
+            if step < 0 and (parsed[0] or step > -12 * 3600):
+                pairs.append((previous[0], text))
+        previous = (text, parsed)
+    return pairs
+
+
+class CaseIndex:
+    """IDs and names of the characters and clues of a case, for resolving references between artifacts."""
+
+    def __init__(self, state: Any) -> None:
+        dossiers = state.SuspectDossiers.suspectDossiers if state.SuspectDossiers else []
+        clues = state.ClueManifest.clueManifest if state.ClueManifest else []
+        self.character_ids = {dossier.characterID.strip() for dossier in dossiers}
+        self.names = [dossier.name for dossier in dossiers]
+        self.clue_ids = [clue.clueID.strip() for clue in clues]
+        self.people = list(self.names)
+        if state.Plot is not None:
+            concept = state.Plot.bullseyeConcept
+            self.people += [concept.culprit.name, concept.victim.name]
+
+    def is_character(self, name: str) -> bool:
+        """Whether ``name`` is one of the dossiers (by full name, or by their first or last name)."""
+        words = _words(name)
+        return bool(words) and any(words <= _words(known) or _words(known) <= words for known in self.names)
+
+    def refers_to_person(self, text: str) -> bool:
+        """Whether ``text`` (a timeline ``character``) names a known person or character ID."""
+        if {token.strip("()[]{}.:") for token in referenced_ids(text)} & self.character_ids:
+            return True
+        words = _words(text)
+        return any(words & _words(person) for person in self.people)
+
+
+def check_case(state: Any) -> List[Issue]:
+    """Local consistency checks over the typed artifacts of a case (``States``).
+
+    Every check whose artifacts exist runs; each issue names the artifact to
+    re-generate to fix it. No LLM calls are made.
+    """
+    index = CaseIndex(state)
+    issues: List[Issue] = []
+
+    if state.ExecutionPlan is not None:
+        timeline = state.ExecutionPlan.ExecutionPlan.crimeTimeline
+        for earlier, later in out_of_order(event.timeStamp for event in timeline):
+            issues.append(Issue("crime_timeline_order", "ExecutionPlan", f"Crime timeline goes back from {earlier} to {later}"))
+
+    if state.SuspectDossiers is not None and state.Plot is not None:
+        culprit = state.Plot.bullseyeConcept.culprit.name
+        if not index.is_character(culprit):
+            issues.append(Issue("missing_culprit", "SuspectDossiers", f"The culprit {culprit} has no suspect dossier"))
+
+    if state.ClueManifest is not None:
+        seen: Set[str] = set()
+        for clue_id in index.clue_ids:
+            if clue_id in seen:
+                issues.append(Issue("duplicate_clue", "ClueManifest", f"Clue ID {clue_id} is used by more than one clue"))
+            seen.add(clue_id)
+        if state.Solution is not None:
+            for flaw in state.Solution.solvablePath.keyFlaws:
+                if flaw.clueID.strip() not in seen:
+                    # Cases written before the solution and clue prompts agreed on 'CM' IDs (like the sample
+                    # case, whose key flaws are CF1..CF14) never resolve; the clues are still there by content.
+                    issues.append(Issue(
+                        "unresolved_key_flaw", "ClueManifest",
+                        f"Key flaw {flaw.clueID} of the solution ({flaw.description}) has no clue with that clueID",
+                        warning=True,
+                    ))
+
+    if state.MasterTimeline is not None and state.SuspectDossiers is not None:
+        timeline = state.MasterTimeline
+        for phase in ("preCrime", "postCrime"):
+            for event in getattr(timeline, phase):
+                for clue_id in referenced_ids(event.relatedClueID):
+                    if clue_id not in index.clue_ids:
+                        issues.append(Issue(
+                            "dangling_clue", "MasterTimeline",
+                            f"{phase} event at {event.timestamp} refers to clue {clue_id}, which does not exist",
+                        ))
+                if not index.refers_to_person(event.character):
+                    # Often a minor figure (a maid, the first officer on the scene) rather than a broken reference.
+                    issues.append(Issue(
+                        "unknown_character", "MasterTimeline",
+                        f"{phase} event at {event.timestamp} is about {event.character}, who has no suspect dossier",
+                        warning=True,
+                    ))
+        events = [*timeline.preCrime, *timeline.crimeExecution, *timeline.postCrime]
+        for earlier, later in out_of_order(event.timestamp for event in events):
+            issues.append(Issue("timeline_order", "MasterTimeline", f"Master timeline goes back from {earlier} to {later}"))
+    return issues
+
+
+def feedback(issues: Iterable[Issue]) -> str:
+    """Prompt text asking a re-generated task to fix ``issues``."""
+    lines = [f"- {issue.message}" for issue in issues]
+    if not lines:
+        return ""
+    return "The previous version of this output had these problems; avoid them:\n" + "\n".join(lines)
+
+
+def issue_data(issues: Iterable[Issue]) -> List[Dict[str, str]]:
+    return [issue._asdict() for issue in issues]
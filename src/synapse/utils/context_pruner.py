@@ -0,0 +1,31 @@
+from typing import Any, Dict, Iterable, Union
+
+from pydantic import BaseModel
+
+# A spec names the fields to keep: a list of field names, or a dict mapping
+# field names to a nested spec (or True to keep the whole value).
+PruneSpec = Union[Iterable[str], Dict[str, Any]]
+
+
+class ContextPruner:
+    """Cuts artifacts down to the fields a task prompt actually references.
+
+    Example:
+        ContextPruner.prune(dossiers, {"suspectDossiers": ["characterID", "name", "statedAlibi"]})
+
+    Lists are pruned item by item, and models are dumped to JSON data first,
+    so the result can be rendered straight into a prompt.
+    """
+
+    @staticmethod
+    def prune(data: Any, spec: Union[PruneSpec, bool]) -> Any:
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+        if spec is True:
+            return data
+        if isinstance(data, list):
+            return [ContextPruner.prune(item, spec) for item in data]
+        if not isinstance(data, dict):
+            return data
+        fields = spec if isinstance(spec, dict) else {name: True for name in spec}
+        return {name: ContextPruner.prune(data[name], sub) for name, sub in fields.items() if name in data}
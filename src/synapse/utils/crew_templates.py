@@ -0,0 +1,40 @@
+import copy
+import threading
+from pathlib import Path
+from typing import Any, Dict, Type, TypeVar
+
+import yaml
+
+T = TypeVar("T")
+
+_configs: Dict[Path, Any] = {}
+_lock = threading.Lock()
+
+
+def load_crew_config(config_path: Path) -> Any:
+    """Return the parsed agents/tasks YAML at ``config_path``, parsing each file once per process.
+
+    Every caller gets its own deep copy, because ``@CrewBase`` replaces agent
+    and task names in the config with the objects of the crew instance.
+    """
+    path = Path(config_path).resolve()
+    with _lock:
+        if path not in _configs:
+            with open(path, "r", encoding="utf-8") as file:
+                _configs[path] = yaml.safe_load(file)
+        config = _configs[path]
+    return copy.deepcopy(config)
+
+
+def compiled_crew(crew_class: Type[T]) -> Type[T]:
+    """Class decorator, applied on top of ``@CrewBase``, that compiles a crew template once.
+
+    The YAML configs are parsed when the crew module is imported; building the
+    crew for a request then only instantiates agents and tasks from the parsed
+    template.
+    """
+    crew_class.load_yaml = staticmethod(load_crew_config)
+    for config_path in (crew_class.original_agents_config_path, crew_class.original_tasks_config_path):
+        if isinstance(config_path, str):
+            load_crew_config(crew_class.base_directory / config_path)
+    return crew_class
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from synapse.utils.case_store import open_case_store
+from synapse.utils.executor import run_blocking
+
+
+class Dossiers(NamedTuple):
+    # Changes whenever the artifacts the dossiers were read from change; local to this process.
+    version: str
+    # Crime type from the case settings; None for the sample dossiers.
+    crime_type: Optional[str]
+    suspects: List[Dict[str, Any]]
+    # Hash of the suspects and crime type: the same on every worker and across restarts, for ETags.
+    digest: str
+
+
+def _digest(crime_type: Optional[str], suspects: List[Dict[str, Any]]) -> str:
+    payload = json.dumps([crime_type, suspects], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _read_sample(path: Path) -> Dossiers:
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    suspects = data.get("suspectDossiers", [])
+    return Dossiers(version=f"sample:{mtime}", crime_type=None, suspects=suspects, digest=_digest(None, suspects))
+
+
+class DossierIndex:
+    """Parsed suspect dossiers per case, re-read only when the case changes.
+
+    Case entries are keyed by the case store version, so a regenerated
+    dossier is picked up on the next read; the sample dossiers used before
+    any story exists are keyed by the file's mtime. Both only decide when to
+    re-read: ``digest`` is taken from the content.
+    """
+
+    def __init__(self, sample_path: Path, max_cases: int = 256) -> None:
+        self.sample_path = sample_path
+        self.max_cases = max_cases
+        self._cases: "OrderedDict[str, Dossiers]" = OrderedDict()
+        self._sample: Optional[Dossiers] = None
+        self._lock = threading.Lock()
+
+    async def case(self, case_id: str) -> Dossiers:
+        """Dossiers and crime type of ``case_id``. Raises FileNotFoundError until they are generated."""
+        store = open_case_store(case_id)
+        version = f"{case_id}:{await store.version_async()}"
+        with self._lock:
+            cached = self._cases.get(case_id)
+            if cached is not None and cached.version == version:
+                self._cases.move_to_end(case_id)
+                return cached
+        settings = await store.read_async("Settings.json")
+        dossiers = await store.read_async("Suspect_dossiers.json")
+        crime_type = settings.get("crimeType")
+        suspects = dossiers.get("suspectDossiers", [])
+        entry = Dossiers(version=version, crime_type=crime_type, suspects=suspects, digest=_digest(crime_type, suspects))
+        with self._lock:
+            self._cases[case_id] = entry
+            while len(self._cases) > self.max_cases:
+                self._cases.popitem(last=False)
+        return entry
+
+    async def sample(self) -> Dossiers:
+        """The sample dossiers shipped with the repository, reloaded when the file changes."""
+        mtime = (await run_blocking(os.stat, self.sample_path)).st_mtime_ns
+        cached = self._sample
+        if cached is not None and cached.version == f"sample:{mtime}":
+            return cached
+        self._sample = await run_blocking(_read_sample, self.sample_path)
+        return self._sample
@@ -0,0 +1,95 @@
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from synapse.utils.metrics import registry
+
+T = TypeVar("T")
+
+# Crew kickoffs block a thread for the whole crew run, mostly waiting on the
+# provider, so the pool is sized for concurrent crews rather than CPUs.
+# crewAI's kickoff_async() uses asyncio's default executor instead, which has
+# min(32, CPUs + 4) threads shared with every other to_thread() call.
+CREW_WORKERS = int(os.getenv("SYNAPSE_CREW_WORKERS", "64"))
+IO_WORKERS = int(os.getenv("SYNAPSE_IO_WORKERS", "4"))
+
+crew_executor = ThreadPoolExecutor(CREW_WORKERS, thread_name_prefix="synapse-crew")
+io_executor = ThreadPoolExecutor(IO_WORKERS, thread_name_prefix="synapse-io")
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, executor: Optional[Executor] = None, **kwargs: Any) -> T:
+    """Run blocking ``fn`` off the event loop (the I/O pool by default), in a copy of the caller's context."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor or io_executor, call)
+
+
+async def kickoff_crew(build: Callable[[], Any], inputs: Dict[str, Any]) -> Any:
+    """Build a crew with ``build()`` and kick it off in the crew pool.
+
+    Building the crew (agents, tasks, interpolated prompts) is CPU work too, so
+    it happens in the worker thread along with the run.
+    """
+    return await run_blocking(lambda: build().kickoff(inputs=inputs), executor=crew_executor)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task sleeping ``interval`` seconds.
+
+    Lag is time the loop spent running something else; anything above a few
+    milliseconds delays every request and SSE stream served by the process.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600) -> None:
+        self.interval = interval
+        self.window = window
+        self.recent: list = []
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._histogram = registry.histogram(
+            "synapse_event_loop_lag_seconds",
+            "How late the event loop ran a task scheduled to wake up.",
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+        )
+        registry.gauge("synapse_event_loop_lag_max_seconds", "Largest event loop lag of the recent window.", callback=self.max_lag)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.observe(max(0.0, time.perf_counter() - started - self.interval))
+
+    def observe(self, lag: float) -> None:
+        self._histogram.observe(lag)
+        self.recent.append(lag)
+        if len(self.recent) > self.window:
+            del self.recent[: len(self.recent) - self.window]
+
+    def max_lag(self) -> float:
+        return max(self.recent, default=0.0)
+
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {"samples": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "samples": len(ordered),
+            "p50": round(ordered[len(ordered) // 2], 4),
+            "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4),
+            "max": round(ordered[-1], 4),
+        }
+
+
+loop_lag = LoopLagMonitor(interval=float(os.getenv("SYNAPSE_LOOP_LAG_INTERVAL", "0.1")))
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+import typing
+from typing import Any, Dict, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from pydantic import BaseModel
+
+from synapse.utils.llm import SynapseLLM
+
+LIST_LENGTH = 3
+
+BRIEFING_TEXT = (
+    "Detective, the call came in just after midnight. Dr. Mira Kapoor was found alone in her study. "
+    "The window was latched from the inside and the safe stood open. Her assistant swears the house was "
+    "locked all evening. Three people had keys, and each of them has a story ready."
+)
+
+# The cast of the canned case: the culprit, the victim and a witness of "Generate_bullseye".
+CAST = ("Elias Vance", "Mira Kapoor", "Anita Rao")
+
+
+def example(annotation: Any, name: str, index: int = 0) -> Any:
+    """Deterministic placeholder value for a field of the given type annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        return example(next(arg for arg in args if arg is not type(None)), name, index)
+    if origin in (list, typing.List):
+        return [example(args[0], name, i) for i in range(LIST_LENGTH)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {field: example(info.annotation, field, index) for field, info in annotation.model_fields.items()}
+    if annotation is int:
+        return index + 1
+    if annotation is float:
+        return float(index + 1)
+    if annotation is bool:
+        return index % 2 == 0
+    if name == "gender":
+        return ("Male", "Female")[index % 2]
+    if name.endswith("ID"):
+        return f"{name[0].upper()}{index + 1:02d}"
+    if name.lower().endswith("timestamp") or name == "timeStamp":
+        return f"2024-05-0{index + 1}T2{index}:00"
+    return f"{name} {index + 1}"
+
+
+def fixture(model: type, **overrides: Any) -> Dict[str, Any]:
+    """Schema-valid instance of ``model`` as plain JSON data."""
+    data = example(model, model.__name__)
+    data.update(overrides)
+    return model.model_validate(data).model_dump(mode="json")
+
+
+_fixtures: Optional[Dict[str, Any]] = None
+_fixtures_lock = threading.Lock()
+
+
+def task_fixtures() -> Dict[str, Any]:
+    """Canned answers keyed by crew task name, built from the crews' output models."""
+    global _fixtures
+    with _fixtures_lock:
+        if _fixtures is None:
+            # Imported here: the crew modules import synapse.utils.llm themselves.
+            from synapse.crews.briefing_crew.briefing_crew import Briefing
+            from synapse.crews.crime_crew.crime_crew import CrimeCoverUP, CrimeExecution
+            from synapse.crews.interrogation_crew.interrogation_crew import InterrogationAnswer
+            from synapse.crews.narrative_crew.narrative_crew import (
+                Clue,
+                ClueManifest,
+                MasterTimeline,
+                SuspectCast,
+                SuspectDossier,
+                SuspectDossiersOutput,
+            )
+            from synapse.crews.solution_crew.solution_crew import Solution
+
+            # Cross-references agree, so the canned case passes the consistency checks.
+            dossiers = fixture(SuspectDossiersOutput)
+            cast = fixture(SuspectCast)
+            for members in (dossiers["suspectDossiers"], cast["cast"]):
+                for member, name in zip(members, CAST):
+                    member["name"] = name
+            clues = fixture(ClueManifest)
+            clue_ids = [clue["clueID"] for clue in clues["clueManifest"]]
+            timeline = fixture(MasterTimeline)
+            for day, phase in enumerate(("preCrime", "crimeExecution", "postCrime"), start=1):
+                for index, event in enumerate(timeline[phase]):
+                    event["timestamp"] = f"2024-05-0{day}T2{index}:00"
+                    if phase != "crimeExecution":
+                        event["character"] = CAST[index % len(CAST)]
+                        event["relatedClueID"] = clue_ids[index % len(clue_ids)]
+            _fixtures = {
+                "Generate_bullseye": {
+                    "bullseyeConcept": {
+                        "culprit": {"name": "Elias Vance", "profile": "The victim's estranged son."},
+                        "victim": {"name": "Mira Kapoor", "profile": "A retired surgeon and art collector."},
+                        "crime": {"location": "Her study", "object": "A sapphire brooch", "description": "Stolen from a locked safe."},
+                        "motive": {"primary": "Resentment", "description": "He believes the brooch was his mother's."},
+                    }
+                },
+                "Case_briefing": fixture(Briefing, CrimeSceneInvestigator=BRIEFING_TEXT),
+                "Crime_execution_design": fixture(CrimeExecution),
+                "Crime_coverup_plan": fixture(CrimeCoverUP),
+                "Generate_solution": fixture(Solution),
+                "Suspect_dossiers": dossiers,
+                "Clue_manifest": clues,
+                "Clue": fixture(Clue),
+                "Master_timeline": timeline,
+                "Final_case_file": {**dossiers, **clues, "masterTimeline": timeline},
+                "Suspect_cast": cast,
+                "Suspect_dossier": fixture(SuspectDossier),
+                "Interrogation_answer": fixture(
+                    InterrogationAnswer, answer="I was at home all evening, Detective. You can ask my neighbour."
+                ),
+            }
+        return _fixtures
+
+
+class FakeLLM(SynapseLLM):
+    """Offline stand-in for the provider: answers every crew task with its canned fixture.
+
+    Each call sleeps ``SYNAPSE_FAKE_LLM_LATENCY`` seconds (default 0) to model
+    provider latency; streaming clients emit the answer in small chunks spread
+    over that time. Cancellation and the response cache still apply.
+    """
+
+    CHUNK_SIZE = 16
+
+    def complete(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        latency = float(os.getenv("SYNAPSE_FAKE_LLM_LATENCY", "0"))
+        data = task_fixtures().get(getattr(from_task, "name", None), {"result": "ok"})
+        answer = "Thought: I now can give a great answer\nFinal Answer: " + json.dumps(data)
+        if not self.stream:
+            time.sleep(latency)
+            return answer
+        chunks = [answer[i:i + self.CHUNK_SIZE] for i in range(0, len(answer), self.CHUNK_SIZE)]
+        for chunk in chunks:
+            time.sleep(latency / len(chunks))
+            crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=chunk, from_task=from_task, from_agent=from_agent))
+        return answer
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from synapse.utils.executor import run_blocking
+from synapse.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Image folders suspects are drawn from, one per dossier gender.
+SUSPECT_FOLDERS = ("Male", "Female")
+
+
+class ImageCatalog:
+    """In-memory index of the suspect portraits under ``root``.
+
+    The folders are scanned once at startup and again whenever the watcher
+    sees a change, so requests never list directories. ``version`` increases
+    with every change of the index; responses derived from it can be cached
+    against it. ``digest`` hashes the indexed file names, so unlike the
+    version it is the same on every worker and across restarts.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.version = 0
+        self.digest = ""
+        self._images: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def indexed(self) -> bool:
+        return self.version > 0
+
+    def images(self, folder: str) -> Tuple[str, ...]:
+        return self._images.get(folder, ())
+
+    def missing(self) -> List[str]:
+        """Suspect folders that did not exist at the last scan."""
+        return [folder for folder in SUSPECT_FOLDERS if folder not in self._images]
+
+    def refresh(self) -> bool:
+        """Rescan the image folders (blocking); returns whether the index changed."""
+        scanned: Dict[str, Tuple[str, ...]] = {}
+        for folder in SUSPECT_FOLDERS:
+            directory = self.root / folder
+            if directory.is_dir():
+                scanned[folder] = tuple(sorted(entry.name for entry in os.scandir(directory) if entry.is_file()))
+        with self._lock:
+            if self.indexed and scanned == self._images:
+                return False
+            self._images = scanned
+            self.digest = hashlib.sha1(json.dumps(scanned, sort_keys=True).encode("utf-8")).hexdigest()
+            self.version += 1
+        logger.info("Image catalog v%d: %s", self.version, {folder: len(files) for folder, files in scanned.items()})
+        return True
+
+    async def ensure_indexed(self) -> None:
+        if not self.indexed:
+            await run_blocking(self.refresh)
+
+    def assign(self, case_id: str, genders: Sequence[str]) -> List[Optional[str]]:
+        """Image path (``"Male/<file>"``) for each suspect gender, or None when the pool ran out.
+
+        Each folder is shuffled with a seed derived from the case ID, so repeat
+        calls for a case agree and no image repeats within a case. Adding an
+        image to one folder leaves the other folder's assignment unchanged.
+        """
+        pools: Dict[str, List[str]] = {}
+        assigned: List[Optional[str]] = []
+        for gender in genders:
+            folder = gender.capitalize()
+            if folder not in SUSPECT_FOLDERS:
+                assigned.append(None)
+                continue
+            if folder not in pools:
+                files = self.images(folder)
+                pools[folder] = random.Random(f"{case_id}:{folder}").sample(files, len(files))
+            pool = pools[folder]
+            assigned.append(f"{folder}/{pool.pop()}" if pool else None)
+        return assigned
+
+    def start(self) -> None:
+        """Start watching ``root`` for added, removed or renamed images."""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+
+    async def _watch(self) -> None:
+        from watchfiles import awatch
+
+        await self.ensure_indexed()
+        if not self.root.is_dir():
+            logger.warning("Image directory %s not found; not watching it", self.root)
+            return
+        async for _ in awatch(self.root):
+            try:
+                await run_blocking(self.refresh)
+            except OSError as e:
+                logger.warning("Image catalog refresh failed: %s", e)
@@ -1,6 +1,8 @@
 import json
 import re
-from typing import Optional
+from typing import Any, Optional
+
+from synapse.utils.json_scanner import JSONScanner
 
 
 class JSONCleaner:
@@ -12,26 +14,21 @@ class JSONCleaner:
         Extract valid JSON object from raw LLM output, removing instructions, explanations,
         markdown code fences, and whitespace.
         """
-        # Remove markdown fences
-        content = re.sub(r'```json', '', raw_content, flags=re.IGNORECASE)
-        content = re.sub(r'```', '', content)
-
-        # Try to find JSON object by matching braces
-        match = re.search(r'(\{.*\}|\[.*\])', content, flags=re.DOTALL)
-        if not match:
+        try:
+            parsed_json = JSONScanner.parse(raw_content)
+        except ValueError:
             # fallback: return stripped content if no JSON found
-            return content.strip()
+            return re.sub(r'```(json)?', '', raw_content, flags=re.IGNORECASE).strip()
+        # return pretty-printed JSON
+        return json.dumps(parsed_json, indent=2)
 
-        json_str = match.group(0).strip()
-
-        # Try parsing to validate JSON
-        try:
-            parsed_json = json.loads(json_str)
-            # return pretty-printed JSON
-            return json.dumps(parsed_json, indent=2)
-        except json.JSONDecodeError:
-            # fallback: return what we extracted
-            return json_str
+    @staticmethod
+    def parse_json_content(raw_content: str) -> Any:
+        """
+        Extract and parse the first JSON value from raw LLM output in a single pass.
+        Raises ValueError if the output contains no valid JSON.
+        """
+        return JSONScanner.parse(raw_content)
 
     @staticmethod
     def is_valid_json(content: str) -> bool:
@@ -3,6 +3,8 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, Iterable, List, Optional
 
+from synapse.utils.case_store import CaseStore
+
 
 class JSONExtractor:
     """Utility for reading a JSON file and extracting specific keys from a nested object path.
@@ -11,13 +13,28 @@ class JSONExtractor:
         extractor = JSONExtractor(file_path="Plot.json", nested_path=["bullseyeConcept"])
         data = extractor.extract_keys(["victim", "crime"])  # returns dict
         text = extractor.extract_keys_or_fallback(["victim", "crime"], fallback_json="{}")  # returns JSON string
+
+    When a case store is given, ``file_path`` names an artifact in that store instead of a file.
+    Already parsed data can be passed as ``data`` to skip reading altogether.
     """
 
-    def __init__(self, file_path: str, nested_path: Optional[Iterable[str]] = None) -> None:
+    def __init__(
+        self,
+        file_path: str = "",
+        nested_path: Optional[Iterable[str]] = None,
+        store: Optional[CaseStore] = None,
+        data: Any = None,
+    ) -> None:
         self.file_path: str = file_path
         self.nested_path: List[str] = list(nested_path or [])
+        self.store: Optional[CaseStore] = store
+        self.data: Any = data
 
     def _read_json(self) -> Any:
+        if self.data is not None:
+            return self.data
+        if self.store is not None:
+            return self.store.read(self.file_path)
         with open(self.file_path, "r") as file_handle:
             return json.load(file_handle)
 
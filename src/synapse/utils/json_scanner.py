@@ -0,0 +1,112 @@
+import json
+import re
+from typing import Any, List
+
+# Characters that matter while inside a JSON value but outside a string.
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+# Characters that matter inside a JSON string.
+_STRING = re.compile(r'["\\]')
+_OPENER = re.compile(r'[\[{]')
+_CLOSER = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder()
+
+
+class JSONScanner:
+    """Finds and parses the first balanced JSON object or array in LLM output.
+
+    The scanner is brace- and string-aware and can be fed the output in
+    chunks as they stream in; ``feed()`` returns True once a complete value
+    has been parsed into ``value``. Only the text of the current candidate
+    value is buffered. Text around the value (a "Thought:" preamble, markdown
+    fences, trailing remarks) is skipped. A balanced span that is not valid
+    JSON, e.g. ``{placeholder}`` in prose, is skipped and scanning resumes
+    right after its opening bracket.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self.done = False
+        self.value: Any = None
+
+    @classmethod
+    def parse(cls, text: str) -> Any:
+        """Return the first JSON value in ``text``. Raises ValueError if there is none."""
+        # Fast path: the value usually starts at the first bracket, and the C
+        # decoder stops at its end without looking at the trailing text.
+        match = _OPENER.search(text)
+        if match is not None:
+            try:
+                return _DECODER.raw_decode(text, match.start())[0]
+            except ValueError:
+                pass
+        scanner = cls()
+        if not scanner.feed(text):
+            raise ValueError("No JSON object found in LLM output")
+        return scanner.value
+
+    def feed(self, chunk: str) -> bool:
+        if not self.done:
+            self._scan(chunk)
+        return self.done
+
+    def _restart(self, text: str, pos: int) -> str:
+        """Drop the current candidate and return the text to rescan, starting after its opener."""
+        candidate = "".join(self._chunks) + text[:pos]
+        self._chunks = []
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        return candidate[1:] + text[pos:]
+
+    def _scan(self, text: str) -> None:
+        pos = 0
+        while True:
+            if not self._stack:
+                match = _OPENER.search(text, pos)
+                if match is None:
+                    return
+                text, pos = text[match.start():], 1
+                self._stack = [_CLOSER[text[0]]]
+
+            if self._escape:
+                # Skip the escaped character, which may start this chunk.
+                if pos >= len(text):
+                    break
+                pos += 1
+                self._escape = False
+
+            if self._in_string:
+                match = _STRING.search(text, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append(_CLOSER[char])
+            elif char != self._stack.pop():
+                text, pos = self._restart(text, pos), 0
+            elif not self._stack:
+                candidate = "".join(self._chunks) + text[:pos]
+                try:
+                    self.value = json.loads(candidate)
+                except ValueError:
+                    text, pos = self._restart(text, pos), 0
+                    continue
+                self._chunks = []
+                self.done = True
+                return
+        self._chunks.append(text)
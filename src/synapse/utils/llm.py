@@ -3,21 +3,237 @@ from langchain_litellm import ChatLiteLLM
 from dotenv import load_dotenv
 from langchain_litellm import ChatLiteLLM
 import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.events.types.llm_guardrail_events import LLMGuardrailCompletedEvent
+from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent
+
+from synapse.utils.checkpoints import CaseCheckpoints, current_checkpoints
+from synapse.utils.llm_cache import LLMCache, cache_key, get_llm_cache, llm_cache_enabled
+from synapse.utils.metrics import llm_calls, llm_errors, llm_latency, llm_tokens
+from synapse.utils.progress import current_reporter
+from synapse.utils.prompt_compaction import compact_messages, compaction_policy
+from synapse.utils.prompt_stats import count_tokens, prompt_stats
+from synapse.utils.rate_limiter import estimate_tokens, get_rate_limiter, llm_priority
+from synapse.utils.tracing import set_attributes, span
 
 load_dotenv()
 
-def gemini_creative():
-    return LLM(
+class SynapseLLM(LLM):
+    """crewAI LLM client used by every crew.
+
+    Calls made on behalf of a cancelled case are refused before they reach the
+    provider, which stops the remaining work of a crew running in a worker thread.
+
+    Plain text completions go through the LLM response cache (see
+    ``synapse.utils.llm_cache``) unless caching is disabled for the request,
+    and are checkpointed per case so a resumed pipeline can replay them (see
+    ``synapse.utils.checkpoints``). Answers given to a crew task are only
+    written once the task accepted them, i.e. passed its guardrail; a cached
+    answer the guardrail rejects is evicted. Prompts are compacted per task when
+    configured (``synapse.utils.prompt_compaction``), and prompt and
+    completion tokens are recorded per task in ``prompt_stats``.
+    Calls that reach the provider are admitted by its rate limiter (see
+    ``synapse.utils.rate_limiter``) at the priority of the calling stage.
+    Every call is traced as an ``llm.call`` span and counted in ``/metrics``.
+    """
+
+    # Expected completion size used for the tokens-per-minute budget when max_tokens is not set.
+    COMPLETION_TOKENS = int(os.getenv("SYNAPSE_RATE_COMPLETION_TOKENS", "1024"))
+
+    CACHE_PARAMS = (
+        "temperature", "top_p", "max_tokens", "max_completion_tokens", "seed", "stop",
+        "presence_penalty", "frequency_penalty", "reasoning_effort", "response_format",
+    )
+
+    def cache_namespace(self, from_task=None, from_agent=None) -> str:
+        crew = getattr(from_agent, "crew", None)
+        return "/".join(
+            str(part or "") for part in (
+                getattr(crew, "name", None),
+                getattr(from_task, "name", None),
+                getattr(from_agent, "role", None),
+            )
+        )
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        task_name = getattr(from_task, "name", None)
+        with span("llm.call", model=self.model, task=task_name) as current:
+            started = time.perf_counter()
+            try:
+                result, source = self.answer(messages, tools, callbacks, available_functions, from_task, from_agent)
+            except Exception:
+                llm_errors.inc(model=self.model, task=task_name or "unknown")
+                raise
+            current.set_attribute("cache", source)
+            llm_calls.inc(model=self.model, task=task_name or "unknown", source=source)
+            if source == "provider":
+                llm_latency.observe(time.perf_counter() - started, model=self.model)
+            return result
+
+    def answer(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        """Answer a call; returns the result and where it came from: checkpoint, cache or provider."""
+        reporter = current_reporter.get()
+        if reporter is not None:
+            reporter.raise_if_cancelled()
+            reporter.llm_call_started()
+
+        task_name = getattr(from_task, "name", None)
+        messages, saved_tokens = compact_messages(messages, compaction_policy(task_name), self.model)
+
+        cache = get_llm_cache() if llm_cache_enabled.get() else None
+        checkpoints = current_checkpoints.get()
+        key = None
+        if not tools and (cache is not None or checkpoints is not None):
+            namespace = self.cache_namespace(from_task, from_agent)
+            key = cache_key(namespace, self.model, {name: getattr(self, name, None) for name in self.CACHE_PARAMS}, messages)
+            # A resumed case replays the answers its finished tasks already got.
+            source = "checkpoint"
+            answer = checkpoints.load_task(namespace, key) if checkpoints is not None else None
+            if answer is None and cache is not None:
+                source = "cache"
+                answer = cache.get(key)
+                if answer is not None:
+                    _hold(from_task, _PendingAnswer(cache, checkpoints, namespace, key, answer, source))
+            if answer is not None:
+                if self.stream:
+                    # Replay the answer as one chunk so streaming consumers still see it.
+                    crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=answer, from_task=from_task, from_agent=from_agent))
+                prompt_stats.record(task_name, cached=True)
+                return answer, source
+
+        result = self.limited_complete(messages, tools, callbacks, available_functions, from_task, from_agent)
+        prompt_tokens = count_tokens(self.model, messages)
+        completion_tokens = count_tokens(self.model, result) if isinstance(result, str) else 0
+        prompt_stats.record(task_name, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, saved_tokens=saved_tokens)
+        llm_tokens.inc(prompt_tokens, model=self.model, kind="prompt")
+        llm_tokens.inc(completion_tokens, model=self.model, kind="completion")
+        set_attributes(**{"tokens.prompt": prompt_tokens, "tokens.completion": completion_tokens, "tokens.saved": saved_tokens})
+        if key is not None and isinstance(result, str) and result.strip():
+            _hold(from_task, _PendingAnswer(cache, checkpoints, namespace, key, result, "provider"))
+        return result, "provider"
+
+    def limited_complete(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        """``complete()`` behind the provider's rate limiter, retrying rate-limit answers."""
+        reporter = current_reporter.get()
+        completion_tokens = self.max_tokens or self.max_completion_tokens or self.COMPLETION_TOKENS
+        return get_rate_limiter(self.model).call(
+            lambda: self.complete(messages, tools, callbacks, available_functions, from_task, from_agent),
+            tokens=estimate_tokens(messages, completion_tokens),
+            priority=llm_priority.get(),
+            check=reporter.raise_if_cancelled if reporter is not None else None,
+        )
+
+    def complete(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        """Send the request to the provider. Overridden by the offline ``FakeLLM``."""
+        return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+
+class _PendingAnswer(NamedTuple):
+    cache: Optional[LLMCache]
+    checkpoints: Optional[CaseCheckpoints]
+    namespace: str
+    key: str
+    answer: str
+    # "cache" or "provider"
+    source: str
+
+    def commit(self) -> None:
+        if self.source == "provider" and self.cache is not None:
+            self.cache.set(self.key, self.answer)
+        if self.checkpoints is not None:
+            self.checkpoints.save_task(self.namespace, self.key, self.answer)
+
+
+# Answers given to running crew tasks, by task ID, until the task accepts or rejects them.
+_pending: Dict[str, List[_PendingAnswer]] = {}
+_pending_lock = threading.Lock()
+
+
+def _hold(task: Any, entry: _PendingAnswer) -> None:
+    if task is None:
+        # Not part of a crew task: there is no guardrail to wait for.
+        entry.commit()
+        return
+    with _pending_lock:
+        _pending.setdefault(str(task.id), []).append(entry)
+
+
+def _release(task_id: Any) -> List[_PendingAnswer]:
+    with _pending_lock:
+        return _pending.pop(str(task_id), []) if task_id is not None else []
+
+
+def _on_task_completed(source: Any, event: TaskCompletedEvent) -> None:
+    # Earlier answers of the task, if any, were ones its agent could not parse.
+    entries = _release(event.task.id)
+    if entries:
+        entries[-1].commit()
+
+
+def _on_task_failed(source: Any, event: TaskFailedEvent) -> None:
+    _release(event.task.id)
+
+
+def _on_guardrail_completed(source: Any, event: LLMGuardrailCompletedEvent) -> None:
+    if event.success:
+        return
+    # The task is re-asked; a cached answer would be rejected again on every replay.
+    for entry in _release(event.task_id):
+        if entry.source == "cache":
+            entry.cache.delete(entry.key)
+
+
+crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_completed)
+crewai_event_bus.register_handler(TaskFailedEvent, _on_task_failed)
+crewai_event_bus.register_handler(LLMGuardrailCompletedEvent, _on_guardrail_completed)
+
+
+def fake_llm_enabled() -> bool:
+    return os.getenv("SYNAPSE_FAKE_LLM", "").lower() in ("1", "true", "yes")
+
+
+def create_llm(**kwargs) -> SynapseLLM:
+    """Build a crew LLM client, or the offline stand-in when SYNAPSE_FAKE_LLM is set."""
+    if fake_llm_enabled():
+        from synapse.utils.fake_llm import FakeLLM
+
+        return FakeLLM(**kwargs)
+    return SynapseLLM(**kwargs)
+
+# Clients are pooled: each factory returns one shared instance per configuration,
+# so crews built per request reuse the same client and its provider connections.
+
+@lru_cache(maxsize=None)
+def gemini_creative(stream: bool = False):
+    return create_llm(
         api_key=os.getenv("GEMINI_API_KEY"),
         model="gemini/gemini-2.5-flash",
         temperature = 0.7,
         top_p=0.8,
+        stream=stream,
     )
 
+@lru_cache(maxsize=None)
 def gemini():
-    return LLM(
+    return create_llm(
         api_key=os.getenv("GEMINI_API_KEY"),
         model="gemini/gemini-2.5-flash",
     )
 
-llm = ChatLiteLLM(model="azure/gpt-5-mini")
+@lru_cache(maxsize=None)
+def azure_mini():
+    return create_llm(model="azure/gpt-5-mini")
+
+def __getattr__(name):
+    # ``llm`` is built on first use, so that synapse.utils.fake_llm can import this module.
+    if name == "llm":
+        client = create_llm(model="azure/gpt-5-mini") if fake_llm_enabled() else ChatLiteLLM(model="azure/gpt-5-mini")
+        globals()["llm"] = client
+        return client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
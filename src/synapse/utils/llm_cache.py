@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+
+class LLMCache:
+    """Content-addressed cache of LLM completions with hit/miss counters.
+
+    Keys are built by ``cache_key()`` from the crew task, the model and its
+    sampling parameters, and the fully rendered prompt messages, so any change
+    to the inputs of a task produces a different key.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _load(self, key: str) -> Optional[Tuple[str, float]]:
+        raise NotImplementedError
+
+    def _store(self, key: str, value: str, created: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._load(key)
+        fresh = entry is not None and (self.ttl is None or time.time() - entry[1] < self.ttl)
+        with self._stats_lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry[0] if fresh else None
+
+    def set(self, key: str, value: str) -> None:
+        self._store(key, value, time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class MemoryLLMCache(LLMCache):
+    """In-process LRU cache with an optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, value: str, created: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, created)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteLLMCache(LLMCache):
+    """On-disk cache shared by every process pointing at the same SQLite file."""
+
+    def __init__(self, path: str = "llm_cache.sqlite3", ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def _load(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._connection.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _store(self, key: str, value: str, created: float) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created) VALUES (?, ?, ?)",
+                (key, value, created),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+
+def cache_key(namespace: str, model: str, params: Dict[str, Any], messages: Any) -> str:
+    """Stable hash of everything that determines an LLM completion."""
+    payload = json.dumps(
+        {"namespace": namespace, "model": model, "params": params, "messages": messages},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Per-request switch; set to False to bypass the cache for one pipeline run.
+llm_cache_enabled: ContextVar[bool] = ContextVar("llm_cache_enabled", default=True)
+
+_cache: Optional[LLMCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _create_llm_cache() -> Optional[LLMCache]:
+    backend = os.getenv("SYNAPSE_LLM_CACHE", "off").lower()
+    ttl = float(os.getenv("SYNAPSE_LLM_CACHE_TTL", "0")) or None
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return MemoryLLMCache(max_entries=int(os.getenv("SYNAPSE_LLM_CACHE_SIZE", "1024")), ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteLLMCache(path=os.getenv("SYNAPSE_LLM_CACHE_PATH", "llm_cache.sqlite3"), ttl=ttl)
+    raise ValueError(f"Unknown LLM cache backend: {backend}")
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Process-wide cache selected by SYNAPSE_LLM_CACHE ("off", "memory" or "sqlite")."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        if not _cache_configured:
+            _cache = _create_llm_cache()
+            _cache_configured = True
+        return _cache
+
+
+def set_llm_cache(cache: Optional[LLMCache]) -> None:
+    """Replace the process-wide cache (``None`` disables caching)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
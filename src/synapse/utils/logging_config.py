@@ -0,0 +1,164 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+# development (default): readable text logs at DEBUG and verbose crews.
+# production: JSON logs at INFO, crew and crewAI console output switched off.
+PROFILE = os.getenv("SYNAPSE_PROFILE", "development").lower()
+PRODUCTION = PROFILE == "production"
+
+LOG_LEVEL = os.getenv("SYNAPSE_LOG_LEVEL", "INFO" if PRODUCTION else "DEBUG").upper()
+LOG_FORMAT = os.getenv("SYNAPSE_LOG_FORMAT", "json" if PRODUCTION else "text").lower()
+# Longest artifact payload written to a log line.
+PAYLOAD_CHARS = int(os.getenv("SYNAPSE_LOG_PAYLOAD_CHARS", "500"))
+
+
+def crew_verbose() -> bool:
+    """Whether crews are built with ``verbose=True``: SYNAPSE_CREW_VERBOSE, else off in production."""
+    value = os.getenv("SYNAPSE_CREW_VERBOSE")
+    if value is None:
+        return not PRODUCTION
+    return value.lower() in ("1", "true", "yes")
+
+
+class Payload:
+    """Log argument that renders an artifact truncated to ``limit`` characters.
+
+    Rendering is deferred until a handler formats the record, so payloads of
+    disabled levels are never serialised.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None) -> None:
+        self.value = value
+        self.limit = PAYLOAD_CHARS if limit is None else limit
+
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, BaseModel):
+            text = value.model_dump_json()
+        elif isinstance(value, str):
+            text = value
+        else:
+            text = json.dumps(value, ensure_ascii=False, default=str)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... ({len(text)} chars)"
+
+
+class _ContextFilter(logging.Filter):
+    """Stamps records with the case, stage and trace they were logged from.
+
+    Runs in the logging thread before the record is queued, where the
+    context variables of the case are still visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        from opentelemetry import trace
+
+        from synapse.utils.progress import current_reporter, current_stage
+
+        reporter = current_reporter.get()
+        record.case_id = reporter.case_id if reporter is not None else "-"
+        record.stage = current_stage.get() or "-"
+        span_context = trace.get_current_span().get_span_context()
+        record.trace_id = format(span_context.trace_id, "032x") if span_context.is_valid else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "case_id": getattr(record, "case_id", "-"),
+            "stage": getattr(record, "stage", "-"),
+            "trace_id": getattr(record, "trace_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queues records unformatted, so messages and ``Payload`` arguments are rendered on the listener thread.
+
+    The stdlib ``prepare()`` formats each record in the calling thread (the
+    event loop, for flows) to make it picklable; these records never leave
+    the process.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(case_id)s %(stage)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """Route the ``synapse`` loggers through a queue to stderr; idempotent.
+
+    Callers only enqueue records, a listener thread formats and writes them,
+    so a slow or blocked stderr never stalls a request or a crew worker, and
+    large payloads are never rendered on the event loop. Log arguments are
+    therefore rendered after the call returns and must not be mutated.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(records)
+        handler.addFilter(_ContextFilter())
+        root = logging.getLogger("synapse")
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(handler)
+        root.propagate = False
+        _listener = QueueListener(records, output)
+        _listener.start()
+        atexit.register(_listener.stop)
+        if not crew_verbose():
+            _quiet_crewai()
+
+
+def _quiet_crewai() -> None:
+    """Silence crewAI's console output (flow panels and event trees print even for non-verbose crews).
+
+    The formatter's ``print`` is disabled as well: even on a quiet console it
+    drives a ``rich.Live`` display (a refresh thread plus terminal checks) on
+    the event loop for every flow event.
+    """
+    from crewai.events.event_listener import event_listener
+    from crewai.flow.flow import Flow
+    from rich.console import Console
+
+    class QuietPrinter:
+        def print(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    event_listener.formatter.verbose = False
+    event_listener.formatter.console = Console(quiet=True)
+    event_listener.formatter.print = QuietPrinter().print
+    Flow._printer = QuietPrinter()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the ``synapse`` hierarchy, configuring logging on first use."""
+    configure_logging()
+    return logging.getLogger(name if name.startswith("synapse") else f"synapse.{name}")
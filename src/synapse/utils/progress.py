@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.events.types.task_events import (
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+
+from synapse.utils.json_cleaner import JSONCleaner
+
+
+class PipelineCancelled(Exception):
+    """Raised inside crew execution once the case it belongs to was cancelled."""
+
+
+class ProgressReporter:
+    """Collects the progress events of one case and fans them out to subscribers.
+
+    Events can be emitted from any thread (crew tasks run in worker threads);
+    each subscriber receives them on its own asyncio queue, followed by ``None``
+    once the reporter is closed. The reporter also carries the cancellation
+    flag checked before every LLM call of the case.
+
+    With ``replay=True`` the reporter keeps every event it published, and new
+    subscribers first receive those, so clients attaching to a case that is
+    already running (see ``synapse.coalescing``) see its whole history.
+    """
+
+    def __init__(self, case_id: str, replay: bool = False) -> None:
+        self.case_id = case_id
+        self.replay = replay
+        self._history: List[Optional[Dict[str, Any]]] = []
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[Optional[Dict[str, Any]]]"]] = []
+        self._task_started: Dict[int, float] = {}
+        self._chunk_listeners: Dict[str, Callable[[str], None]] = {}
+        self._call_listeners: Dict[str, Callable[[], None]] = {}
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> "asyncio.Queue[Optional[Dict[str, Any]]]":
+        """Return a queue receiving every event emitted from now on (or all of them with ``replay``).
+
+        Must be called on a running loop.
+        """
+        queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        with self._lock:
+            for payload in self._history:
+                queue.put_nowait(payload)
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue[Optional[Dict[str, Any]]]") -> None:
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if entry[1] is not queue]
+
+    def _publish(self, payload: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            if self.replay:
+                self._history.append(payload)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    def emit(self, event: str, **data: Any) -> None:
+        self._publish({"event": event, "case_id": self.case_id, "time": time.time(), **data})
+
+    def close(self) -> None:
+        """Signal subscribers that no more events will follow."""
+        self._publish(None)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise PipelineCancelled(f"Case {self.case_id} was cancelled")
+
+    def on_llm_chunk(self, stage: str, listener: Callable[[str], None]) -> None:
+        """Call ``listener`` with every streamed LLM token chunk produced by ``stage``."""
+        self._chunk_listeners[stage] = listener
+
+    def on_llm_call(self, stage: str, listener: Callable[[], None]) -> None:
+        """Call ``listener`` before every LLM call made by ``stage``, including re-asks and cached replays."""
+        self._call_listeners[stage] = listener
+
+    # --- Crew task and LLM events, forwarded from the crewAI event bus ---
+
+    def llm_chunk(self, chunk: str) -> None:
+        listener = self._chunk_listeners.get(current_stage.get())
+        if listener is not None:
+            listener(chunk)
+
+    def llm_call_started(self) -> None:
+        listener = self._call_listeners.get(current_stage.get())
+        if listener is not None:
+            listener()
+
+    def task_started(self, task: Any) -> None:
+        self._task_started[id(task)] = time.perf_counter()
+        self.emit("task_started", stage=current_stage.get(), task=getattr(task, "name", None))
+
+    def task_finished(self, task: Any, raw: Optional[str] = None, error: Optional[str] = None) -> None:
+        started = self._task_started.pop(id(task), None)
+        duration = round(time.perf_counter() - started, 3) if started is not None else None
+        name = getattr(task, "name", None)
+        if error is not None:
+            self.emit("task_failed", stage=current_stage.get(), task=name, duration=duration, error=error)
+            return
+        try:
+            artifact = JSONCleaner.parse_json_content(raw or "")
+        except ValueError:
+            artifact = None
+        self.emit("task_completed", stage=current_stage.get(), task=name, duration=duration, artifact=artifact)
+
+
+# The reporter and stage of the case being executed. Crew kickoffs run in
+# worker threads that inherit these through the copied context.
+current_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("current_reporter", default=None)
+current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    reporter = current_reporter.get()
+    if reporter is not None:
+        reporter.task_started(event.task)
+
+
+def _on_task_completed(source: Any, event: TaskCompletedEvent) -> None:
+    reporter = current_reporter.get()
+    if reporter is not None:
+        reporter.task_finished(event.task, raw=event.output.raw)
+
+
+def _on_task_failed(source: Any, event: TaskFailedEvent) -> None:
+    reporter = current_reporter.get()
+    if reporter is not None:
+        reporter.task_finished(event.task, error=event.error)
+
+
+def _on_llm_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    reporter = current_reporter.get()
+    if reporter is not None:
+        reporter.llm_chunk(event.chunk)
+
+
+crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_completed)
+crewai_event_bus.register_handler(TaskFailedEvent, _on_task_failed)
+crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_llm_stream_chunk)
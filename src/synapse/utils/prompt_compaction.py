@@ -0,0 +1,161 @@
+import json
+import os
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from synapse.utils.prompt_stats import count_tokens
+
+_OPENER = re.compile(r'[\[{]')
+_DECODER = json.JSONDecoder()
+# Shortest string value the token budget may truncate to.
+MIN_STRING_LENGTH = 80
+
+
+class CompactionPolicy:
+    """How the rendered prompt of one crew task is compacted before it is sent.
+
+    ``minify`` re-serialises every JSON value embedded in the prompt without
+    indentation; ``drop_fields`` removes keys of those values by name, at any
+    depth; ``token_budget`` shortens their longest string values until the
+    prompt fits (instructions outside JSON are never changed).
+    """
+
+    def __init__(self, minify: bool = True, drop_fields: Optional[List[str]] = None, token_budget: Optional[int] = None) -> None:
+        self.minify = minify
+        self.drop_fields: FrozenSet[str] = frozenset(drop_fields or ())
+        self.token_budget = token_budget
+
+
+def _drop(value: Any, fields: FrozenSet[str]) -> Any:
+    if isinstance(value, dict):
+        return {key: _drop(item, fields) for key, item in value.items() if key not in fields}
+    if isinstance(value, list):
+        return [_drop(item, fields) for item in value]
+    return value
+
+
+def _truncate(value: Any, limit: int) -> Any:
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit].rstrip() + "..."
+    if isinstance(value, dict):
+        return {key: _truncate(item, limit) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_truncate(item, limit) for item in value]
+    return value
+
+
+def _longest_string(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    items = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    return max((_longest_string(item) for item in items), default=0)
+
+
+def _split(text: str) -> List[Any]:
+    """Split prompt text into plain text pieces (str) and embedded JSON objects/arrays (wrapped in a list)."""
+    parts: List[Any] = []
+    pos = 0
+    for match in _OPENER.finditer(text):
+        start = match.start()
+        if start < pos:
+            continue
+        try:
+            value, end = _DECODER.raw_decode(text, start)
+        except ValueError:
+            continue
+        if not value:
+            continue
+        parts.append(text[pos:start])
+        parts.append([value])
+        pos = end
+    parts.append(text[pos:])
+    return parts
+
+
+def _render(parts: List[Any], policy: CompactionPolicy, limit: Optional[int] = None) -> str:
+    rendered = []
+    for part in parts:
+        if isinstance(part, str):
+            rendered.append(part)
+            continue
+        value = part[0]
+        if limit is not None:
+            value = _truncate(value, limit)
+        if policy.minify:
+            rendered.append(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+        else:
+            rendered.append(json.dumps(value, ensure_ascii=False, indent=2))
+    return "".join(rendered)
+
+
+def compact_text(text: str, policy: CompactionPolicy) -> str:
+    parts = _split(text)
+    if policy.drop_fields:
+        parts = [part if isinstance(part, str) else [_drop(part[0], policy.drop_fields)] for part in parts]
+    return _render(parts, policy)
+
+
+def compact_messages(messages: Any, policy: Optional[CompactionPolicy], model: str = "") -> Tuple[Any, int]:
+    """Return the compacted messages and the number of prompt tokens saved.
+
+    System and user messages are compacted; earlier assistant answers are
+    kept verbatim. The input is never modified in place.
+    """
+    if policy is None:
+        return messages, 0
+    if isinstance(messages, str):
+        compacted: Any = compact_text(messages, policy)
+    else:
+        compacted = [
+            {**message, "content": compact_text(message["content"], policy)}
+            if message.get("role") in ("system", "user") and isinstance(message.get("content"), str)
+            else message
+            for message in messages
+        ]
+    if policy.token_budget:
+        compacted = _fit_budget(compacted, policy, model)
+    return compacted, max(0, count_tokens(model, messages) - count_tokens(model, compacted))
+
+
+def _fit_budget(messages: Any, policy: CompactionPolicy, model: str) -> Any:
+    """Shorten the longest embedded JSON strings until the prompt fits ``policy.token_budget``."""
+    if count_tokens(model, messages) <= policy.token_budget:
+        return messages
+    texts = [messages] if isinstance(messages, str) else [message.get("content") for message in messages]
+    splits = [_split(text) if isinstance(text, str) else None for text in texts]
+    longest = max(
+        (_longest_string(part[0]) for parts in splits if parts for part in parts if not isinstance(part, str)),
+        default=0,
+    )
+    limit = longest // 2
+    fitted = messages
+    while limit >= MIN_STRING_LENGTH:
+        rendered = [_render(parts, policy, limit) if parts is not None else text for parts, text in zip(splits, texts)]
+        if isinstance(messages, str):
+            fitted = rendered[0]
+        else:
+            fitted = [
+                {**message, "content": content} if message.get("role") in ("system", "user") else message
+                for message, content in zip(messages, rendered)
+            ]
+        if count_tokens(model, fitted) <= policy.token_budget:
+            break
+        limit //= 2
+    return fitted
+
+
+_policies: Optional[Dict[str, CompactionPolicy]] = None
+
+
+def compaction_policy(task_name: Optional[str]) -> Optional[CompactionPolicy]:
+    """Policy of a crew task from SYNAPSE_PROMPT_COMPACTION, or None when compaction is off for it.
+
+    SYNAPSE_PROMPT_COMPACTION is a JSON object of task name (or "*" for every
+    task) to ``{"minify", "drop_fields", "token_budget"}``, e.g.
+    ``{"*": {}, "Master_timeline": {"drop_fields": ["initialStatementToPolice"], "token_budget": 12000}}``.
+    """
+    global _policies
+    if _policies is None:
+        config = json.loads(os.getenv("SYNAPSE_PROMPT_COMPACTION", "{}"))
+        _policies = {name: CompactionPolicy(**options) for name, options in config.items()}
+    return _policies.get(task_name or "", _policies.get("*"))
@@ -0,0 +1,73 @@
+import threading
+from typing import Any, Dict, Optional
+
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(model: str, messages: Any) -> int:
+    """Prompt tokens of ``messages`` (a string or chat messages) for ``model``.
+
+    Uses litellm's tokenizer for the model and falls back to a
+    characters-per-token estimate when it cannot count.
+    """
+    try:
+        import litellm
+
+        if isinstance(messages, str):
+            return litellm.token_counter(model=model, text=messages)
+        return litellm.token_counter(model=model, messages=messages)
+    except Exception:
+        if isinstance(messages, str):
+            return len(messages) // CHARS_PER_TOKEN
+        return sum(len(str(message.get("content") or "")) for message in messages or []) // CHARS_PER_TOKEN
+
+
+class PromptStats:
+    """Process-wide prompt and completion token counts per crew task.
+
+    Only calls answered by the provider count towards the token totals;
+    answers served from the response cache or a checkpoint are counted as
+    ``cached_calls``. ``saved_tokens`` is what prompt compaction removed.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        task: Optional[str],
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        saved_tokens: int = 0,
+        cached: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._tasks.setdefault(
+                task or "unknown",
+                {"calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "saved_tokens": 0, "max_prompt_tokens": 0},
+            )
+            if cached:
+                stats["cached_calls"] += 1
+                return
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["saved_tokens"] += saved_tokens
+            stats["max_prompt_tokens"] = max(stats["max_prompt_tokens"], prompt_tokens)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            tasks = {name: dict(stats) for name, stats in self._tasks.items()}
+        for stats in tasks.values():
+            calls = stats["calls"] or 1
+            stats["avg_prompt_tokens"] = round(stats["prompt_tokens"] / calls)
+            stats["avg_completion_tokens"] = round(stats["completion_tokens"] / calls)
+        return tasks
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tasks.clear()
+
+
+prompt_stats = PromptStats()
@@ -0,0 +1,238 @@
+import email.utils
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from synapse.utils.tracing import add_event, set_attributes
+
+# Priorities of LLM calls; lower values are served first.
+INTERACTIVE = 0  # the plot -> briefing path a user is waiting for
+BACKGROUND = 1  # remaining stages of a live request, and background jobs
+PREFETCH = 2  # story pool warming
+
+# Priority of the LLM calls made in the current context, set per pipeline stage.
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Refills ``capacity`` units per minute, up to ``capacity``."""
+
+    def __init__(self, capacity: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimited(Exception):
+    """Raised when a provider keeps answering 429 after every retry."""
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds to back off if ``error`` is a provider rate-limit response, else None.
+
+    Looks through the exception chain (crewAI wraps streaming errors) for a
+    429 / RateLimitError and honours its Retry-After header when present.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError":
+            headers: Dict[str, Any] = dict(getattr(error, "litellm_response_headers", None) or {})
+            response = getattr(error, "response", None)
+            headers.update(getattr(response, "headers", None) or {})
+            headers = {str(key).lower(): value for key, value in headers.items()}
+            for name in ("retry-after-ms", "retry-after"):
+                value = headers.get(name)
+                if value is None:
+                    continue
+                try:
+                    seconds = float(value)
+                except ValueError:
+                    parsed = email.utils.parsedate_to_datetime(value)
+                    seconds = parsed.timestamp() - time.time() if parsed else 0.0
+                return max(0.0, seconds / 1000 if name == "retry-after-ms" else seconds)
+            return 0.0
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class ProviderLimiter:
+    """Admits the LLM calls of one provider within its request and token budgets.
+
+    Calls wait in a priority queue (lower ``priority`` first, FIFO within a
+    priority) until the requests-per-minute and tokens-per-minute buckets
+    have room and fewer than ``max_concurrency`` calls are in flight. Only the
+    head of the queue may take budget, so background work never overtakes an
+    interactive call. A 429 answer pauses the whole provider for its
+    Retry-After (or an exponential backoff) and re-queues the call, so
+    throttling slows every caller down instead of starting a retry storm.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 5,
+        backoff: float = 2.0,
+    ) -> None:
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.active = 0
+        self.admitted = 0
+        self.throttled = 0
+        self._paused_until = 0.0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _wait_time(self, tokens: float, now: float) -> Optional[float]:
+        """Seconds until a call of ``tokens`` may start; None while it waits for a free slot."""
+        if self.max_concurrency and self.active >= self.max_concurrency:
+            return None
+        wait = self._paused_until - now
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                wait = max(wait, bucket.wait_time(amount, now))
+        return wait
+
+    def acquire(self, tokens: float, priority: int = INTERACTIVE, check: Optional[Callable[[], None]] = None) -> None:
+        """Block until the call may start. ``check`` is polled while waiting and may raise to give up."""
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    wait = self._wait_time(tokens, time.monotonic()) if self._waiting[0] == ticket else None
+                    if wait is not None and wait <= 0:
+                        break
+                    if check is not None:
+                        check()
+                    self._condition.wait(timeout=min(wait, 0.5) if wait is not None else 0.5)
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket is not None:
+                        bucket.take(amount)
+                self.active += 1
+                self.admitted += 1
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def release(self) -> None:
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every call of this provider for ``seconds``."""
+        with self._condition:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def call(self, fn: Callable[[], Any], tokens: float, priority: int = INTERACTIVE, check: Optional[Callable[[], None]] = None) -> Any:
+        """Run ``fn`` once admitted, retrying it after rate-limit answers."""
+        for attempt in range(self.max_retries + 1):
+            queued = time.monotonic()
+            self.acquire(tokens, priority, check)
+            set_attributes(retries=attempt, **{"rate_limit.wait": round(time.monotonic() - queued, 3)})
+            try:
+                return fn()
+            except Exception as e:
+                delay = retry_after(e)
+                if delay is None:
+                    raise
+                if attempt == self.max_retries:
+                    raise RateLimited(f"{self.name} is still rate limiting after {self.max_retries} retries") from e
+            finally:
+                self.release()
+            # No Retry-After header: exponential backoff with jitter.
+            delay = delay or self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+            add_event("rate_limited", provider=self.name, attempt=attempt, retry_after=delay)
+            self.pause(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "waiting": len(self._waiting),
+                "active": self.active,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "rpm": self.requests.capacity if self.requests else None,
+                "tpm": self.tokens.capacity if self.tokens else None,
+                "max_concurrency": self.max_concurrency,
+            }
+
+
+def estimate_tokens(messages: Any, completion_tokens: int) -> int:
+    """Rough token count of a call: the prompt text plus the expected completion."""
+    if isinstance(messages, str):
+        prompt = len(messages)
+    else:
+        prompt = sum(len(str(message.get("content") or "")) for message in messages or [])
+    return prompt // CHARS_PER_TOKEN + completion_tokens
+
+
+def provider_name(model: str) -> str:
+    return model.split("/", 1)[0] if "/" in model else "default"
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _create_limiter(provider: str) -> ProviderLimiter:
+    # SYNAPSE_RATE_LIMITS: JSON object of provider -> {"rpm", "tpm", "concurrency"},
+    # e.g. {"gemini": {"rpm": 1000, "tpm": 1000000}}. Missing limits are unbounded.
+    limits = json.loads(os.getenv("SYNAPSE_RATE_LIMITS", "{}")).get(provider, {})
+    return ProviderLimiter(
+        provider,
+        rpm=limits.get("rpm"),
+        tpm=limits.get("tpm"),
+        max_concurrency=limits.get("concurrency", int(os.getenv("SYNAPSE_LLM_CONCURRENCY", "16")) or None),
+        max_retries=int(os.getenv("SYNAPSE_RATE_LIMIT_RETRIES", "5")),
+    )
+
+
+def get_rate_limiter(model: str) -> ProviderLimiter:
+    """Process-wide limiter of the provider serving ``model`` (the prefix before "/")."""
+    provider = provider_name(model)
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = _create_limiter(provider)
+        return _limiters[provider]
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
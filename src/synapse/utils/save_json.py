@@ -1,17 +1,26 @@
+from typing import Optional
+
+from synapse.utils.case_store import CaseStore, default_case_store
 from synapse.utils.json_cleaner import JSONCleaner
+from synapse.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 class SaveJson:
     @staticmethod
-    def save_json(result, filename: str):
+    def save_json(result, filename: str, store: Optional[CaseStore] = None):
         """
         Generic JSON saver for CrewAI task callbacks.
 
         Args:
             result: TaskResult object returned by CrewAI.
             filename: Name of the JSON file (e.g. "Suspect_dossiers.json").
+            store: Case store to write into. Defaults to the process CWD.
         """
-        cleaned_json = JSONCleaner.clean_json_content(result.raw)
-
-        with open(filename, "w") as f:
-            f.write(cleaned_json)
+        try:
+            parsed_json = JSONCleaner.parse_json_content(result.raw)
+        except ValueError as e:
+            logger.warning("Skipping %s: task output is not valid JSON (%s)", filename, e)
+            return
 
+        (store or default_case_store()).write(filename, parsed_json)
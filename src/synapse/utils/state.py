@@ -0,0 +1,329 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from synapse.utils.executor import run_blocking
+from synapse.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class StateBackend:
+    """JSON key-value store for the state every API worker has to agree on.
+
+    Sessions, job records, case progress and (with the ``shared`` case store)
+    case artifacts live here instead of module globals, so any worker behind
+    a load balancer answers a request the same way. Keys are grouped in
+    namespaces (``"sessions"``, ``"jobs"``, ``"case:<id>"``, ...); values are
+    JSON values. Entries not written for ``ttl`` seconds may be dropped.
+    """
+
+    # Whether calls may block on disk or network; async callers then run them off the event loop.
+    blocking = False
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = ttl
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    def incr(self, namespace: str, key: str) -> int:
+        """Atomically add one to the counter at ``key`` (0 when missing) and return the new value."""
+        raise NotImplementedError
+
+    async def get_async(self, namespace: str, key: str) -> Optional[Any]:
+        if self.blocking:
+            return await run_blocking(self.get, namespace, key)
+        return self.get(namespace, key)
+
+    async def set_async(self, namespace: str, key: str, value: Any) -> None:
+        if self.blocking:
+            await run_blocking(self.set, namespace, key, value)
+        else:
+            self.set(namespace, key, value)
+
+    def set_behind(self, namespace: str, key: str, value: Any) -> None:
+        """``set()`` without waiting: blocking backends apply writes in order on one writer thread."""
+        if not self.blocking:
+            self.set(namespace, key, value)
+            return
+        _writer.submit(self.set, namespace, key, value).add_done_callback(_log_failed_write)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "ttl": self.ttl}
+
+
+def _log_failed_write(future: "Future[None]") -> None:
+    if future.exception() is not None:
+        logger.error("State write failed: %r", future.exception())
+
+
+# Single thread, so deferred writes of one process land in the order they were made.
+_writer = ThreadPoolExecutor(1, thread_name_prefix="synapse-state")
+
+
+class InProcessState(StateBackend):
+    """Keeps state in process memory: consistent for one worker only."""
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self._entries: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+
+    def _prune(self, now: float) -> None:
+        if self.ttl and now - self._pruned > 60:
+            self._entries = {k: entry for k, entry in self._entries.items() if now - entry[1] < self.ttl}
+            self._pruned = now
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+        return entry[0] if entry is not None else None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._entries[(namespace, key)] = (value, now)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            return [key for ns, key in self._entries if ns == namespace]
+
+    def incr(self, namespace: str, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            value = (entry[0] if entry is not None else 0) + 1
+            self._entries[(namespace, key)] = (value, time.time())
+        return value
+
+
+class SQLiteState(StateBackend):
+    """State in a SQLite database in WAL mode, shared by every worker process on the host.
+
+    WAL lets readers proceed while one process writes, and ``busy_timeout``
+    makes concurrent writers wait for the lock instead of failing.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = "state.sqlite3", ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self.path = path
+        self._pruned = 0.0
+        self._lock = threading.Lock()
+        # Autocommit; incr() opens its own write transaction.
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS state (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                "value TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            if self.ttl and now - self._pruned > 60:
+                self._connection.execute("DELETE FROM state WHERE updated < ?", (now - self.ttl,))
+                self._pruned = now
+            self._connection.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, updated) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute("SELECT key FROM state WHERE namespace = ?", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def incr(self, namespace: str, key: str) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "INSERT INTO state (namespace, key, value, updated) VALUES (?, ?, '1', ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = CAST(value AS INTEGER) + 1, updated = excluded.updated "
+                "RETURNING value",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return int(row[0])
+
+
+class RedisState(StateBackend):
+    """State in a Redis-like service, shared by workers on any number of hosts.
+
+    ``client`` needs the Redis commands ``get``, ``set`` (with ``ex``),
+    ``delete``, ``incr``, ``expire``, ``sadd`` and ``smembers``; a
+    ``redis.Redis`` client or ``LocalRedis`` both work. Each entry is its own
+    key, so the TTL applies per entry; a set per namespace indexes its keys.
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = "synapse", ttl: Optional[float] = None) -> None:
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+        self._expiry = int(ttl) if ttl else None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _index(self, namespace: str, key: str) -> None:
+        index = f"{self.prefix}:{namespace}"
+        self.client.sadd(index, key)
+        if self._expiry:
+            self.client.expire(index, self._expiry)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        value = self.client.get(self._key(namespace, key))
+        return json.loads(value) if value is not None else None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        self.client.set(self._key(namespace, key), json.dumps(value), ex=self._expiry)
+        self._index(namespace, key)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.client.delete(self._key(namespace, key))
+
+    def keys(self, namespace: str) -> List[str]:
+        # The index may still list entries that expired or were deleted.
+        members = self.client.smembers(f"{self.prefix}:{namespace}")
+        keys = sorted(m.decode() if isinstance(m, bytes) else m for m in members)
+        return [key for key in keys if self.client.get(self._key(namespace, key)) is not None]
+
+    def incr(self, namespace: str, key: str) -> int:
+        name = self._key(namespace, key)
+        value = int(self.client.incr(name))
+        if self._expiry:
+            self.client.expire(name, self._expiry)
+        self._index(namespace, key)
+        return value
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of Redis commands ``RedisState`` uses.
+
+    Lets the Redis backend run without a server (tests, local development);
+    state is not shared beyond the process.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, name: str) -> bool:
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.time():
+            self._values.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._values
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._values[name] if self._live(name) else None
+
+    def set(self, name: str, value: str, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._values[name] = value
+            self._expires.pop(name, None)
+            if ex:
+                self._expires[name] = time.time() + ex
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            deleted = sum(1 for name in names if self._live(name))
+            for name in names:
+                self._values.pop(name, None)
+                self._expires.pop(name, None)
+        return deleted
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._values[name]) + 1 if self._live(name) else 1
+            self._values[name] = str(value)
+        return value
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._live(name):
+                return False
+            self._expires[name] = time.time() + seconds
+        return True
+
+    def sadd(self, name: str, *members: str) -> int:
+        with self._lock:
+            if not self._live(name):
+                self._values[name] = set()
+            members_set: Set[str] = self._values[name]
+            added = len(set(members) - members_set)
+            members_set.update(members)
+        return added
+
+    def smembers(self, name: str) -> Set[str]:
+        with self._lock:
+            return set(self._values[name]) if self._live(name) else set()
+
+
+_state: Optional[StateBackend] = None
+_state_lock = threading.Lock()
+
+
+def state_backend_name() -> str:
+    return os.getenv("SYNAPSE_STATE", "memory").lower()
+
+
+def _create_state() -> StateBackend:
+    backend = state_backend_name()
+    ttl = float(os.getenv("SYNAPSE_STATE_TTL", str(7 * 24 * 3600))) or None
+    if backend == "memory":
+        return InProcessState(ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteState(path=os.getenv("SYNAPSE_STATE_PATH", "state.sqlite3"), ttl=ttl)
+    if backend == "redis":
+        import redis
+
+        return RedisState(redis.Redis.from_url(os.getenv("SYNAPSE_STATE_URL", "redis://localhost:6379/0")), ttl=ttl)
+    if backend == "local-redis":
+        return RedisState(LocalRedis(), ttl=ttl)
+    raise ValueError(f"Unknown state backend: {backend}")
+
+
+def get_state() -> StateBackend:
+    """Process-wide state backend selected by SYNAPSE_STATE ("memory", "sqlite", "redis" or "local-redis")."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = _create_state()
+        return _state
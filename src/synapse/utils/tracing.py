@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.crew_events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.events.types.flow_events import (
+    MethodExecutionFailedEvent,
+    MethodExecutionFinishedEvent,
+    MethodExecutionStartedEvent,
+)
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+
+from synapse.utils.metrics import crew_latency
+
+SERVICE_NAME = "synapse"
+
+
+def _build_tracer() -> trace.Tracer:
+    """Tracer for SYNAPSE_TRACING: off (default), file, console or otlp.
+
+    The provider is private to synapse rather than the global one, so spans
+    never mix with the crewAI telemetry that shares the OpenTelemetry SDK.
+    ``file`` appends one JSON span per line to SYNAPSE_TRACE_FILE
+    (traces.jsonl); ``otlp`` exports over HTTP to a local collector at
+    OTEL_EXPORTER_OTLP_ENDPOINT (http://localhost:4318 by default).
+    """
+    mode = os.getenv("SYNAPSE_TRACING", "off").lower()
+    if mode == "off":
+        return trace.NoOpTracer()
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if mode == "file":
+        out = open(os.getenv("SYNAPSE_TRACE_FILE", "traces.jsonl"), "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    elif mode == "console":
+        exporter = ConsoleSpanExporter()
+    elif mode == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporter = OTLPSpanExporter()
+    else:
+        raise ValueError(f"Unknown SYNAPSE_TRACING mode: {mode}")
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider.get_tracer("synapse")
+
+
+tracer = _build_tracer()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Run the block in a child span of the current one; exceptions mark the span as failed."""
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+@contextmanager
+def server_span(name: str, headers: Mapping[str, str], **attributes: Any) -> Iterator[Span]:
+    """Span of an incoming request, continuing the caller's trace when it sent W3C ``traceparent`` headers."""
+    with tracer.start_as_current_span(
+        name, context=propagate.extract(headers), kind=SpanKind.SERVER, attributes=_clean(attributes)
+    ) as current:
+        yield current
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the current span (a no-op outside of one)."""
+    trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def add_event(name: str, **attributes: Any) -> None:
+    trace.get_current_span().add_event(name, _clean(attributes))
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop None values, which OpenTelemetry attributes do not accept."""
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+# Flow steps and crew kickoffs are traced from their crewAI events. Start and
+# end events of one step are emitted on the same thread and context, so the
+# span is made current in between and everything the step runs nests under it.
+_open: Dict[Tuple[int, str], Tuple[Span, object, float]] = {}
+_open_lock = threading.Lock()
+
+
+def _start(key: Tuple[int, str], name: str, **attributes: Any) -> None:
+    current = tracer.start_span(name, attributes=_clean(attributes))
+    token = otel_context.attach(trace.set_span_in_context(current))
+    with _open_lock:
+        _open[key] = (current, token, time.perf_counter())
+
+
+def _end(key: Tuple[int, str], error: Optional[str] = None) -> Optional[float]:
+    with _open_lock:
+        entry = _open.pop(key, None)
+    if entry is None:
+        return None
+    current, token, started = entry
+    if error is not None:
+        current.set_status(Status(StatusCode.ERROR, error))
+    current.end()
+    otel_context.detach(token)
+    return time.perf_counter() - started
+
+
+def end_spans(source: Any, error: str) -> None:
+    """End the spans still open for ``source``, e.g. the steps of a flow whose task was cancelled.
+
+    Their context tokens are not detached: the cancelled task's context is discarded with it.
+    """
+    with _open_lock:
+        keys = [key for key in _open if key[0] == id(source)]
+        entries = [_open.pop(key) for key in keys]
+    for current, _, _ in entries:
+        current.set_status(Status(StatusCode.ERROR, error))
+        current.end()
+
+
+def _crew_label(source: Any, name: Optional[str]) -> str:
+    # Crews built by @CrewBase keep crewAI's default name; their first task identifies them better.
+    if name and name != "crew":
+        return name
+    tasks = getattr(source, "tasks", None) or []
+    return getattr(tasks[0], "name", None) or "crew" if tasks else "crew"
+
+
+def _on_method_started(source: Any, event: MethodExecutionStartedEvent) -> None:
+    _start((id(source), event.method_name), f"flow.{event.method_name}", flow=event.flow_name, method=event.method_name)
+
+
+def _on_method_finished(source: Any, event: MethodExecutionFinishedEvent) -> None:
+    _end((id(source), event.method_name))
+
+
+def _on_method_failed(source: Any, event: MethodExecutionFailedEvent) -> None:
+    _end((id(source), event.method_name), error=str(event.error))
+
+
+def _on_crew_started(source: Any, event: CrewKickoffStartedEvent) -> None:
+    _start((id(source), "kickoff"), "crew.kickoff", crew=_crew_label(source, event.crew_name))
+
+
+def _on_crew_completed(source: Any, event: CrewKickoffCompletedEvent) -> None:
+    trace.get_current_span().set_attribute("tokens.total", event.total_tokens)
+    duration = _end((id(source), "kickoff"))
+    if duration is not None:
+        crew_latency.observe(duration, crew=_crew_label(source, event.crew_name), status="completed")
+
+
+def _on_crew_failed(source: Any, event: CrewKickoffFailedEvent) -> None:
+    duration = _end((id(source), "kickoff"), error=event.error)
+    if duration is not None:
+        crew_latency.observe(duration, crew=_crew_label(source, event.crew_name), status="failed")
+
+
+crewai_event_bus.register_handler(MethodExecutionStartedEvent, _on_method_started)
+crewai_event_bus.register_handler(MethodExecutionFinishedEvent, _on_method_finished)
+crewai_event_bus.register_handler(MethodExecutionFailedEvent, _on_method_failed)
+crewai_event_bus.register_handler(CrewKickoffStartedEvent, _on_crew_started)
+crewai_event_bus.register_handler(CrewKickoffCompletedEvent, _on_crew_completed)
+crewai_event_bus.register_handler(CrewKickoffFailedEvent, _on_crew_failed)
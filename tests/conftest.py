@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+
+from synapse.utils.json_cleaner import JSONCleaner
+
+# The sample case checked into the repository root.
+SAMPLE_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_ARTIFACTS = {
+    "Plot": "Plot.json",
+    "ExecutionPlan": "Execution_plan.json",
+    "CoverupPlan": "Coverup_plan.json",
+    "Solution": "Solution.json",
+    "SuspectDossiers": "Suspect_dossiers.json",
+    "ClueManifest": "Clue_manifest.json",
+    "MasterTimeline": "Master_timeline.json",
+}
+
+
+@pytest.fixture
+def sample_state():
+    """Pipeline state holding the sample case's typed artifacts."""
+    from synapse.main import States
+
+    return States(**{
+        field: JSONCleaner.parse_json_content((SAMPLE_DIR / name).read_text())
+        for field, name in SAMPLE_ARTIFACTS.items()
+    })
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from synapse.admission import AdmissionGate, Overloaded
+
+
+def test_slots_are_handed_over_in_order():
+    async def scenario():
+        gate = AdmissionGate(max_active=1, max_waiting=2)
+        first, second, third = gate.enqueue(), gate.enqueue(), gate.enqueue()
+        assert first.admitted and (second.position, third.position) == (1, 2)
+        first.release()
+        assert await second.wait(timeout=1)
+        assert third.position == 1 and not await third.wait(timeout=0.01)
+        third.release()
+        second.release()
+        second.release()
+        assert gate.stats()["active"] == 0 and gate.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_with_retry_after():
+    gate = AdmissionGate(max_active=1, max_waiting=1, expected_duration=10)
+    held, queued = gate.enqueue(), gate.enqueue()
+    with pytest.raises(Overloaded) as rejected:
+        gate.check()
+    assert rejected.value.retry_after == 20 and rejected.value.waiting == 1
+    with pytest.raises(Overloaded):
+        gate.enqueue()
+    assert gate.rejected == 2
+    queued.release()
+    gate.check()
+    held.release()
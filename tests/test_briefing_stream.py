@@ -0,0 +1,28 @@
+from synapse.utils.briefing_stream import BriefingStreamer, PartialJSONString, SentenceSegmenter
+
+
+def feed_all(feed, text, size):
+    return [feed(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+def test_partial_json_string_decodes_value_across_chunks():
+    text = 'Thought: ok\n{"other": "x", "answer": "Line one.\\nSay \\"hi\\" \\u00e9", "after": "ignored"}'
+    decoder = PartialJSONString("answer")
+    assert "".join(feed_all(decoder.feed, text, 5)) == 'Line one.\nSay "hi" é'
+    assert decoder.done
+    assert decoder.feed('"answer": "more"') == ""
+
+
+def test_sentence_segmenter_keeps_titles_together():
+    segmenter = SentenceSegmenter()
+    sentences = [s for part in feed_all(segmenter.feed, "Dr. Ray was found. The door was locked. Why", 4) for s in part]
+    assert sentences == ["Dr. Ray was found.", "The door was locked."]
+    assert segmenter.flush() == ["Why"]
+
+
+def test_briefing_streamer_publishes_sentences_once():
+    published = []
+    streamer = BriefingStreamer(lambda index, sentence: published.append((index, sentence)))
+    text = '{"CrimeSceneInvestigator": "It rained. The safe was open."}'
+    feed_all(streamer.feed, text + text, 7)
+    assert published == [(0, "It rained."), (1, "The safe was open.")]
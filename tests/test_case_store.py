@@ -0,0 +1,60 @@
+import asyncio
+
+from synapse.utils import dossier_index
+from synapse.utils.case_store import DirectoryCaseStore, InMemoryCaseStore, SharedCaseStore
+from synapse.utils.dossier_index import DossierIndex
+from synapse.utils.state import InProcessState
+
+DOSSIERS = {"suspectDossiers": [{"characterID": "C01", "name": "Ann Rao", "gender": "Female"}]}
+
+
+def test_write_bumps_version():
+    store = InMemoryCaseStore("c1")
+    store.write("Plot.json", {"a": 1})
+    store.write("Plot.json", {"a": 2})
+    assert store.read("Plot.json") == {"a": 2}
+    assert store.version == 2
+
+
+def test_directory_cold_read_keeps_version(tmp_path):
+    DirectoryCaseStore("c1", root=str(tmp_path)).write("Plot.json", {"a": 1})
+    store = DirectoryCaseStore("c1", root=str(tmp_path))
+    assert store.exists("Plot.json")
+    version = store.version
+    assert store.read("Plot.json") == {"a": 1}
+    assert store.version == version
+
+
+def test_shared_store_sees_other_workers_writes():
+    state = InProcessState()
+    mine, theirs = SharedCaseStore("c1", state), SharedCaseStore("c1", state)
+    mine.write("Plot.json", {"a": 1})
+    assert theirs.read("Plot.json") == {"a": 1}
+    theirs.write("Plot.json", {"a": 2})
+    assert mine.read("Plot.json") == {"a": 2}
+    assert mine.version == theirs.version == 2
+    assert theirs.snapshot() == {"Plot.json": {"a": 2}}
+
+
+def test_dossier_digest_is_stable_across_workers(tmp_path, monkeypatch):
+    # One case written by one worker and read cold by two others.
+    writer = DirectoryCaseStore("c1", root=str(tmp_path))
+    writer.write("Settings.json", {"crimeType": "Theft"})
+    writer.write("Suspect_dossiers.json", DOSSIERS)
+
+    digests = []
+    for _ in range(2):
+        store = DirectoryCaseStore("c1", root=str(tmp_path))
+        monkeypatch.setattr(dossier_index, "open_case_store", lambda case_id: store)
+        index = DossierIndex(tmp_path / "sample.json")
+        first = asyncio.run(index.case("c1"))
+        second = asyncio.run(index.case("c1"))
+        # The cold read did not change the version, so the second call is served from the index.
+        assert second is first
+        digests.append(first.digest)
+    assert digests[0] == digests[1]
+
+    writer.write("Suspect_dossiers.json", {"suspectDossiers": []})
+    store = DirectoryCaseStore("c1", root=str(tmp_path))
+    monkeypatch.setattr(dossier_index, "open_case_store", lambda case_id: store)
+    assert asyncio.run(DossierIndex(tmp_path / "sample.json").case("c1")).digest != digests[0]
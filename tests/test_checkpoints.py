@@ -0,0 +1,29 @@
+from synapse.utils.checkpoints import CheckpointStore, input_hash
+
+
+def test_input_hash_ignores_key_order():
+    assert input_hash({"a": 1, "b": [2]}) == input_hash({"b": [2], "a": 1})
+    assert input_hash({"a": 1}) != input_hash({"a": 2})
+
+
+def test_checkpoints_are_per_case_and_inputs():
+    store = CheckpointStore()
+    case = store.for_case("c1")
+    case.save_stage("plot", "h1", {"Plot": {"x": 1}})
+    case.save_task("/Generate_bullseye/", "p1", "answer")
+    assert case.load_stage("plot", "h1") == {"Plot": {"x": 1}}
+    assert case.load_stage("plot", "h2") is None
+    assert case.load_task("/Generate_bullseye/", "p1") == "answer"
+    assert store.for_case("c2").load_task("/Generate_bullseye/", "p1") is None
+    case.clear()
+    assert case.load_stage("plot", "h1") is None
+
+
+def test_max_cases_drops_the_oldest_cases(tmp_path):
+    store = CheckpointStore(path=str(tmp_path / "checkpoints.sqlite3"), max_cases=2)
+    for case_id in ("c1", "c2", "c3"):
+        store._pruned = 0.0
+        store.save(case_id, "stage", "plot", "h", {"case": case_id})
+    assert store.load("c1", "stage", "plot", "h") is None
+    assert store.load("c2", "stage", "plot", "h") == {"case": "c2"}
+    assert store.load("c3", "stage", "plot", "h") == {"case": "c3"}
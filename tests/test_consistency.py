@@ -0,0 +1,77 @@
+from synapse.utils.consistency import CaseIndex, check_case, feedback, out_of_order, parse_timestamp, referenced_ids
+
+
+def errors(issues):
+    return [issue for issue in issues if not issue.warning]
+
+
+def test_sample_case_has_no_errors(sample_state):
+    assert errors(check_case(sample_state)) == []
+
+
+def test_sample_case_key_flaws_are_warnings(sample_state):
+    # The sample solution predates the CM numbering of key flaws (CF1..CF14).
+    issues = check_case(sample_state)
+    assert {issue.check for issue in issues} <= {"unresolved_key_flaw", "unknown_character"}
+    assert len([issue for issue in issues if issue.check == "unresolved_key_flaw"]) == len(
+        sample_state.Solution.solvablePath.keyFlaws
+    )
+
+
+def test_missing_culprit_is_an_error(sample_state):
+    culprit = sample_state.Plot.bullseyeConcept.culprit.name
+    dossiers = sample_state.SuspectDossiers.suspectDossiers
+    assert CaseIndex(sample_state).is_character(culprit)
+    sample_state.SuspectDossiers = sample_state.SuspectDossiers.model_copy(update={
+        "suspectDossiers": [dossier for dossier in dossiers if dossier.name != culprit]
+    })
+    issues = errors(check_case(sample_state))
+    assert [(issue.check, issue.artifact) for issue in issues] == [("missing_culprit", "SuspectDossiers")]
+
+
+def test_dangling_clue_and_duplicate_clue(sample_state):
+    timeline = sample_state.MasterTimeline.model_copy(deep=True)
+    timeline.preCrime[0].relatedClueID = "CM99"
+    sample_state.MasterTimeline = timeline
+    clues = sample_state.ClueManifest.model_copy(deep=True)
+    clues.clueManifest.append(clues.clueManifest[0])
+    sample_state.ClueManifest = clues
+    checks = {issue.check: issue.artifact for issue in errors(check_case(sample_state))}
+    assert checks == {"dangling_clue": "MasterTimeline", "duplicate_clue": "ClueManifest"}
+
+
+def test_referenced_ids():
+    assert referenced_ids("CM01, CM03") == ["CM01", "CM03"]
+    assert referenced_ids("CM01 & CM02;CM04") == ["CM01", "CM02", "CM04"]
+    assert referenced_ids("N/A") == []
+    assert referenced_ids(None) == []
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2024-05-01T20:30")[0] is True
+    assert parse_timestamp("9:15 p.m.")[0] is False
+    assert parse_timestamp("Late evening") is None
+
+
+def test_out_of_order():
+    assert out_of_order(["2024-05-01 20:00", "2024-05-01 19:00"]) == [("2024-05-01 20:00", "2024-05-01 19:00")]
+    # A time of day going back by more than twelve hours crosses midnight.
+    assert out_of_order(["11:30 PM", "12:15 AM"]) == []
+    assert out_of_order(["9:00 PM", "8:00 PM"]) == [("9:00 PM", "8:00 PM")]
+    # Dates and times of day are not compared with each other; free text is skipped.
+    assert out_of_order(["2024-05-02 10:00", "Late evening", "09:00"]) == []
+
+
+def test_refers_to_person_matches_whole_ids(sample_state):
+    index = CaseIndex(sample_state)
+    index.character_ids = {"C1"}
+    assert not index.refers_to_person("C10")
+    assert index.refers_to_person("C1 (someone)")
+    assert not index.refers_to_person("The maid")
+
+
+def test_feedback(sample_state):
+    assert feedback([]) == ""
+    sample_state.MasterTimeline.preCrime[0].relatedClueID = "CM99"
+    text = feedback(check_case(sample_state))
+    assert "CM99" in text and text.startswith("The previous version")
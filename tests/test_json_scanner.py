@@ -0,0 +1,25 @@
+import pytest
+
+from synapse.utils.json_scanner import JSONScanner
+
+
+def test_parse_skips_preamble_and_fences():
+    text = 'Thought: done\nFinal Answer: ```json\n{"a": [1, {"b": "}"}]}\n``` trailing'
+    assert JSONScanner.parse(text) == {"a": [1, {"b": "}"}]}
+
+
+def test_parse_skips_placeholder_braces_in_prose():
+    assert JSONScanner.parse('Use {name} here: {"ok": true}') == {"ok": True}
+
+
+def test_parse_without_json_raises():
+    with pytest.raises(ValueError):
+        JSONScanner.parse("no json here")
+
+
+def test_feed_across_chunks_with_split_escape():
+    text = 'x {"quote": "a \\" b", "list": [1, 2]} y'
+    scanner = JSONScanner()
+    results = [scanner.feed(text[i:i + 3]) for i in range(0, len(text), 3)]
+    assert results[-1] and not results[0]
+    assert scanner.value == {"quote": 'a " b', "list": [1, 2]}
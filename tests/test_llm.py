@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+
+from synapse.utils import llm
+from synapse.utils.checkpoints import CheckpointStore, current_checkpoints
+from synapse.utils.fake_llm import FakeLLM
+from synapse.utils.llm_cache import MemoryLLMCache, set_llm_cache
+
+MESSAGES = [{"role": "user", "content": "Generate the plot."}]
+
+
+@pytest.fixture
+def cache():
+    cache = MemoryLLMCache()
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(None)
+
+
+@pytest.fixture
+def checkpoints():
+    case = CheckpointStore().for_case("c1")
+    token = current_checkpoints.set(case)
+    yield case
+    current_checkpoints.reset(token)
+
+
+def ask(task):
+    return FakeLLM(model="fake/model").answer(MESSAGES, from_task=task)
+
+
+def test_answer_is_written_once_the_task_accepts_it(cache, checkpoints):
+    task = SimpleNamespace(id="t1", name="Generate_bullseye")
+    answer, source = ask(task)
+    assert source == "provider"
+    assert not cache._entries
+
+    llm._on_task_completed(None, SimpleNamespace(task=task))
+    assert list(cache._entries.values())[0][0] == answer
+    assert ask(task) == (answer, "checkpoint")
+
+
+def test_rejected_answer_is_not_written(cache, checkpoints):
+    task = SimpleNamespace(id="t2", name="Generate_bullseye")
+    ask(task)
+    llm._on_guardrail_completed(None, SimpleNamespace(success=False, task_id=task.id))
+    llm._on_task_failed(None, SimpleNamespace(task=task))
+    assert not cache._entries
+    assert ask(task)[1] == "provider"
+
+
+def test_rejected_cached_answer_is_evicted(cache):
+    task = SimpleNamespace(id="t3", name="Generate_bullseye")
+    ask(task)
+    llm._on_task_completed(None, SimpleNamespace(task=task))
+    assert ask(task)[1] == "cache"
+
+    llm._on_guardrail_completed(None, SimpleNamespace(success=False, task_id=task.id))
+    assert not cache._entries
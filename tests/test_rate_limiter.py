@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from synapse.utils.rate_limiter import ProviderLimiter, RateLimited, TokenBucket, retry_after
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.litellm_response_headers = headers or {}
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1) == 0
+
+
+def test_retry_after_reads_headers_through_the_exception_chain():
+    assert retry_after(ProviderError(429, {"Retry-After": "3"})) == 3
+    assert retry_after(ProviderError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(ProviderError(500)) is None
+    try:
+        try:
+            raise ProviderError(429)
+        except ProviderError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert retry_after(wrapped) == 0.0
+
+
+def test_call_retries_rate_limited_answers():
+    limiter = ProviderLimiter("test", max_retries=2, backoff=0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError(429)
+        return "ok"
+
+    assert limiter.call(flaky, tokens=10) == "ok"
+    assert limiter.stats()["throttled"] == 2
+    assert limiter.active == 0
+
+    def throttled():
+        raise ProviderError(429)
+
+    with pytest.raises(RateLimited):
+        limiter.call(throttled, tokens=10)
+
+
+def test_waiting_call_gives_up_when_check_raises():
+    limiter = ProviderLimiter("test", max_concurrency=1)
+    limiter.acquire(10)
+    cancelled = threading.Event()
+    cancelled.set()
+
+    def check():
+        if cancelled.is_set():
+            raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        limiter.acquire(10, check=check)
+    assert limiter.stats()["waiting"] == 0
+    limiter.release()
+    assert limiter.active == 0
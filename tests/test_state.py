@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from synapse.utils.state import InProcessState, LocalRedis, RedisState, SQLiteState
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def state(request, tmp_path):
+    if request.param == "memory":
+        return InProcessState()
+    if request.param == "sqlite":
+        return SQLiteState(path=str(tmp_path / "state.sqlite3"))
+    return RedisState(LocalRedis())
+
+
+def test_get_set_delete(state):
+    assert state.get("jobs", "j1") is None
+    state.set("jobs", "j1", {"status": "queued", "stages": ["plot"]})
+    state.set("sessions", "j1", "other namespace")
+    assert state.get("jobs", "j1") == {"status": "queued", "stages": ["plot"]}
+    assert state.keys("jobs") == ["j1"]
+    state.delete("jobs", "j1")
+    assert state.get("jobs", "j1") is None
+    assert state.keys("jobs") == []
+    assert state.get("sessions", "j1") == "other namespace"
+
+
+def test_incr(state):
+    assert [state.incr("case:c1", "version") for _ in range(3)] == [1, 2, 3]
+    assert state.get("case:c1", "version") == 3
+
+
+def test_async_and_deferred_writes(state):
+    async def scenario():
+        await state.set_async("jobs", "j1", 1)
+        return await state.get_async("jobs", "j1")
+
+    assert asyncio.run(scenario()) == 1
+    state.set_behind("jobs", "j2", 2)
+    deadline = time.time() + 5
+    while state.get("jobs", "j2") is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert state.get("jobs", "j2") == 2
+
+
+def test_sqlite_state_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    SQLiteState(path=path).set("jobs", "j1", {"status": "running"})
+    assert SQLiteState(path=path).get("jobs", "j1") == {"status": "running"}
+
+
+def test_local_redis_expiry():
+    client = LocalRedis()
+    client.set("a", "1", ex=1)
+    assert client.get("a") == "1"
+    client._expires["a"] = time.time() - 1
+    assert client.get("a") is None
+    assert client.incr("a") == 1
+    assert not client.expire("missing", 10)